@@ -0,0 +1,73 @@
+import os
+from dataclasses import dataclass, field
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_str(name: str, default: str) -> str:
+    return os.getenv(name) or default
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Deployment settings, read from DATASMITH_* environment variables."""
+
+    # Streaming ingestion: total resident memory the accumulators + parse buffers may use
+    stream_memory_budget_mb: int = field(default_factory=lambda: _env_int("DATASMITH_STREAM_MEMORY_MB", 256))
+    # Rows parsed up front to estimate bytes per row before sizing the chunks
+    stream_probe_rows: int = field(default_factory=lambda: _env_int("DATASMITH_STREAM_PROBE_ROWS", 10_000))
+    # mode=approx: entries kept per value table (heavy hitters), independent of the row count
+    approx_table_capacity: int = field(default_factory=lambda: _env_int("DATASMITH_APPROX_TABLE_CAPACITY", 256))
+
+    # Values listed per column in value_distribution / unique_values (0 lists all); the rest is summarized
+    distribution_top_k: int = field(default_factory=lambda: _env_int("DATASMITH_DISTRIBUTION_TOP_K", 100))
+    # Memory for full per-column distinct values, paged through /analyze/{id}/columns/{column}/values (0 disables)
+    value_store_mb: int = field(default_factory=lambda: _env_int("DATASMITH_VALUE_STORE_MB", 256))
+    # Groups listed in group_analysis, largest first (0 lists all)
+    group_analysis_max_groups: int = field(default_factory=lambda: _env_int("DATASMITH_GROUP_ANALYSIS_MAX_GROUPS", 1000))
+    # Duplicate row clusters listed in row_duplicates, largest first, and row positions listed per cluster (0 lists all)
+    duplicate_max_clusters: int = field(default_factory=lambda: _env_int("DATASMITH_DUPLICATE_MAX_CLUSTERS", 100))
+    duplicate_cluster_rows: int = field(default_factory=lambda: _env_int("DATASMITH_DUPLICATE_CLUSTER_ROWS", 20))
+
+    # CSV parsing: pandas engine ("c", or "pyarrow" for multithreaded parsing of whole files)
+    csv_engine: str = field(default_factory=lambda: _env_str("DATASMITH_CSV_ENGINE", "c"))
+    # String columns with at most this many distinct values are parsed as categorical (0 disables)
+    csv_categorical_max_unique: int = field(default_factory=lambda: _env_int("DATASMITH_CSV_CATEGORICAL_MAX_UNIQUE", 0))
+    # Header schemas whose parsed dtypes are reused as dtype hints for the next file (0 disables)
+    csv_dtype_hints: int = field(default_factory=lambda: _env_int("DATASMITH_CSV_DTYPE_HINTS", 0))
+
+    # String columns: "pyarrow" stores them arrow-backed (falls back to "python" without pyarrow), "python" as str objects
+    string_storage: str = field(default_factory=lambda: _env_str("DATASMITH_STRING_STORAGE", "pyarrow"))
+
+    # Processes for per-column analysis; 0 or 1 keeps it on the request thread
+    analysis_workers: int = field(default_factory=lambda: _env_int("DATASMITH_ANALYSIS_WORKERS", 0))
+
+    # Result cache: in-process LRU size, optional on-disk tier (empty dir disables it), entry lifetime
+    cache_memory_mb: int = field(default_factory=lambda: _env_int("DATASMITH_CACHE_MEMORY_MB", 128))
+    cache_dir: str = field(default_factory=lambda: _env_str("DATASMITH_CACHE_DIR", ""))
+    cache_disk_mb: int = field(default_factory=lambda: _env_int("DATASMITH_CACHE_DISK_MB", 1024))
+    cache_ttl_seconds: int = field(default_factory=lambda: _env_int("DATASMITH_CACHE_TTL_SECONDS", 3600))
+
+    # Background analysis jobs: concurrent jobs, extra jobs allowed to wait (429 beyond), how long results are kept
+    job_workers: int = field(default_factory=lambda: _env_int("DATASMITH_JOB_WORKERS", 2))
+    job_queue_limit: int = field(default_factory=lambda: _env_int("DATASMITH_JOB_QUEUE_LIMIT", 8))
+    job_retention_seconds: int = field(default_factory=lambda: _env_int("DATASMITH_JOB_RETENTION_SECONDS", 3600))
+
+    # Incremental analyses: how many appendable states to keep, and how long an unused one lives
+    state_max_entries: int = field(default_factory=lambda: _env_int("DATASMITH_STATE_MAX_ENTRIES", 8))
+    state_ttl_seconds: int = field(default_factory=lambda: _env_int("DATASMITH_STATE_TTL_SECONDS", 24 * 3600))
+
+    # Most data files one /analyze/batch request may analyze (uploads plus archive members)
+    batch_max_files: int = field(default_factory=lambda: _env_int("DATASMITH_BATCH_MAX_FILES", 1000))
+
+    # Warm up (dateparser, CSV parsing, every analyzer) at startup before /health reports ready; 0 skips it
+    warmup: int = field(default_factory=lambda: _env_int("DATASMITH_WARMUP", 1))
+
+    # Directory whose files /analyze/local may read in place (empty disables the endpoint)
+    local_data_dir: str = field(default_factory=lambda: _env_str("DATASMITH_LOCAL_DATA_DIR", ""))
+
+
+settings = Settings()
@@ -1,16 +1,39 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+import asyncio
 import logging
+from .config import settings
+from .models.schemas import HealthCheckResponse
 from .routes import analysis_router
+from .services.executor import shutdown_column_pool
+from .services.jobs import job_manager
+from .services.metrics import registry
+from .services.readiness import health, readiness, warm_up
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # uvicorn accepts connections only once this returns, so no request meets a cold worker
+    if settings.warmup:
+        await asyncio.to_thread(warm_up)
+    else:
+        readiness.skip_warm_up()
+    yield
+    # Stop the job threads and column analysis workers (if any were started) with the server
+    job_manager.shutdown()
+    shutdown_column_pool()
+
 app = FastAPI(
     title="Data Analysis API",
     description="API for analyzing CSV files for duplicates and averages",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -29,9 +52,21 @@ app.include_router(analysis_router, prefix="/api/v1", tags=["analysis"])
 async def root():
     return {"message": "Data Analysis API is running", "version": "1.0.0"}
 
-@app.get("/health")
+@app.get("/health", response_model=HealthCheckResponse, responses={503: {"model": HealthCheckResponse}})
 async def health_check():
-    return {"status": "healthy", "timestamp": "2024-01-01T00:00:00Z"}
+    """Readiness: 200 once the worker is warmed up and can take work, 503 with the failing checks otherwise."""
+    report = health()
+    return JSONResponse(status_code=200 if report["status"] == "ready" else 503, content=report)
+
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness: the process is up and its event loop answers, warmed up or not."""
+    return {"status": "alive", "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")}
+
+@app.get("/metrics")
+def metrics():
+    """Stage and per-column timings, rows and bytes processed, in the Prometheus text format."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
 if __name__ == "__main__":
     import uvicorn
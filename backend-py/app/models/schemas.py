@@ -13,6 +13,8 @@ class ErrorResponse(BaseModel):
 class HealthCheckResponse(BaseModel):
     status: str
     timestamp: str
+    uptime_seconds: float
+    checks: Dict[str, Any] = {}
 
 class SampleAnalysisRequest(BaseModel):
     include_numerical: bool = True
@@ -1,19 +1,55 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, status, Query
-from fastapi.responses import JSONResponse
-from typing import Optional
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, List, Optional, Tuple
 import pandas as pd
+import logging
+import os
+import shutil
+import tempfile
+from ..config import settings
 from ..services.analysis_service import analyze_dataframe
-from ..utils import validate_csv_file, read_csv_from_upload
+from ..services.batch import BatchSource, analyze_batch
+from ..services.instrumentation import AnalysisProfile, timed_iter
+from ..services.sampling import add_sampling, sample_table
+from ..services.streaming import accumulate_csv, accumulated_result, append_csv
+from ..services.state_store import analysis_states
+from ..services.value_store import distinct_values
+from ..services.cache import entry_head, result_cache, result_key, upload_digest
+from ..services.jobs import job_manager, Job, JobQueueFullError, COMPLETED, FAILED
+from ..utils import validate_csv_file, read_table_file, detect_file_format, dumps, loads, FastJSONResponse, streamed_json_response
+from ..utils.file_handlers import extract_archive, is_archive
+from ..utils.json_encoding import iter_json
+
+logger = logging.getLogger(__name__)
 
 analysis_router = APIRouter()
 
-@analysis_router.post("/analyze", summary="Analyze CSV file for duplicates and averages")
-async def upload_file(
-    file: UploadFile = File(..., description="CSV file to analyze"),
-    group_by: Optional[str] = Query(None, description="Column name to group analysis by")
+# Largest page of distinct values served at once
+VALUES_PAGE_LIMIT = 10_000
+
+@analysis_router.post("/analyze", summary="Analyze a data file for duplicates and averages")
+def upload_file(
+    file: UploadFile = File(..., description="CSV (optionally .gz / .zst), Parquet or Arrow IPC / Feather file to analyze"),
+    group_by: Optional[str] = Query(None, description="Column (or comma-separated columns) to group analysis by"),
+    stream: bool = Query(False, description="Parse the file in chunks with bounded memory (for very large files)"),
+    job: bool = Query(False, description="Run in the background and return an analysis_id to poll"),
+    incremental: bool = Query(False, description="Keep mergeable state so rows can be appended later (implies stream)"),
+    mode: str = Query("exact", pattern="^(exact|approx)$", description="approx: fixed-size sketches per column, with error bounds (implies stream)"),
+    top_k: Optional[int] = Query(None, ge=0, description="Values listed per column in value_distribution (0 = all; default from settings)"),
+    columns: Optional[str] = Query(None, description="Comma-separated columns to analyze; the others are not decoded"),
+    max_groups: Optional[int] = Query(None, ge=0, description="Largest groups listed in group_analysis (0 = all; default from settings)"),
+    duplicate_subset: Optional[str] = Query(None, description="Comma-separated key columns rows are compared on in row_duplicates (default all)"),
+    duplicate_normalize: str = Query("none", pattern="^(none|whitespace|text)$", description="row_duplicates: compare text trimmed with whitespace collapsed (whitespace), and also ignoring case (text)"),
+    sample: Optional[float] = Query(None, gt=0, lt=0.5, description="Analyze a random sample sized so percentages are within +/- this fraction (e.g. 0.01), with confidence intervals"),
+    profile: bool = Query(False, description="Add per-stage and per-column timings and peak allocations under `profile`")
 ):
     """
-    Upload a CSV file and get analysis of duplicates and numerical averages.
+    Upload a data file and get analysis of duplicates and numerical averages.
+
+    Accepts CSV, gzip / zstd compressed CSV (`.csv.gz`, `.csv.zst`), Parquet
+    and Arrow IPC / Feather files. Columnar files are memory-mapped and, with
+    `columns=`, only the listed columns (plus `group_by`) are decoded.
     
     Returns:
     - Metadata about the dataset
@@ -21,6 +57,57 @@ async def upload_file(
     - Statistical analysis for numerical columns
     - Categorical analysis for text columns
     - Optional group-wise analysis
+
+    With `stream=true` the upload is parsed chunk by chunk into mergeable
+    accumulators, so memory is capped by the configured budget instead of
+    growing with the file size.
+
+    Results are cached by a hash of the file contents and parameters; a
+    repeated upload is answered from the cache without parsing
+    (`X-Cache: HIT`).
+
+    With `job=true` the request returns 202 with an `analysis_id` right away;
+    poll `/analyze/jobs/{analysis_id}` for progress and fetch the result from
+    `/analyze/jobs/{analysis_id}/result`. Returns 429 when the job queue is full.
+
+    With `incremental=true` the file is accumulated as with `stream=true` and
+    the accumulator state is kept, so new rows can later be added through
+    `/analyze/{analysis_id}/append`. Incremental analyses bypass the cache.
+
+    With `mode=approx` each column is summarized in a few tens of KB whatever
+    the row count: HyperLogLog distinct counts, KLL quantiles and Space-Saving
+    heavy hitters. Estimated fields are flagged `"approximate": true` and come
+    with `error_bounds`.
+
+    With `group_by=a,b` rows are grouped by several columns; each group is
+    reported under its key values joined by " | ". Only the `max_groups`
+    largest groups are listed; `group_analysis_summary` gives the total.
+
+    `row_duplicates` lists clusters of identical rows, largest first, with
+    their 0-based row positions and example values. `duplicate_subset=a,b`
+    compares rows on those columns only; `duplicate_normalize=whitespace`
+    ignores leading/trailing and repeated whitespace in text, `text` also
+    ignores case. Streamed analyses report complete_duplicates_count only.
+
+    With `sample=0.01` a uniform random sample of rows is drawn while the
+    file is read, sized so percentages are within +/- 1 point at 95%
+    confidence (9,604 rows), and analyzed instead of the whole file; the
+    time taken barely grows with the file size. `sampling` describes the
+    sample; means, percentages and quartiles are flagged `"approximate": true`
+    with confidence intervals in `error_bounds`. Duplicate percentages are
+    estimated for the whole file (no interval); counts are counts in the
+    sample, distinct counts being listed in `sample_lower_bounds`;
+    row_duplicates lists file row positions.
+
+    `unique_values` / `value_distribution` list the `top_k` most frequent
+    values of each column, with the rest counted in `value_distribution_other`.
+    Page through all distinct values with `/analyze/{analysis_id}/columns/{column}/values`.
+
+    With `profile=true` the response gets a `profile` object: wall time,
+    rows, bytes and peak traced allocation of each stage (hashing, parsing,
+    analysis, serialization) and a per-step breakdown for every column.
+    Memory is only traced for profiled requests. Timings of every request
+    are exported on `/metrics`.
     """
     print(f"Received file: {file.filename}, Content-Type: {file.content_type}")
     try:
@@ -28,27 +115,48 @@ async def upload_file(
         validation_error = validate_csv_file(file)
         if validation_error:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=validation_error)
-        
-        # Read CSV file
-        df = read_csv_from_upload(file)
-        if df.empty:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, 
-                detail="Uploaded file is empty or could not be parsed"
-            )
-        
-        # Perform analysis
-        analysis_results = analyze_dataframe(df, group_by_column=group_by)
-        
-        return JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content={
-                "filename": file.filename,
-                "analysis_id": analysis_results.get("analysis_id"),
-                "results": analysis_results
-            }
+
+        options = AnalysisOptions(
+            group_by=_parse_columns(group_by),
+            stream=stream,
+            incremental=incremental,
+            mode=mode,
+            top_k=top_k,
+            file_format=detect_file_format(file.filename),
+            columns=_parse_columns(columns),
+            max_groups=max_groups,
+            duplicate_subset=_parse_columns(duplicate_subset),
+            duplicate_normalize=duplicate_normalize,
+            sample=sample
         )
+        _check_options(options)
+        with AnalysisProfile(trace_memory=profile) as timings:
+            # Incremental results change with every append, so they are never cached
+            cache_key = None
+            if not incremental:
+                with timings.stage("hash", nbytes=_file_size(file.file)):
+                    cache_key = result_key(upload_digest(file.file), **options.cache_params())
+            cached = _cache_hit(cache_key)
+            if job:
+                return _submit_job(file, cache_key, cached, options)
+            if cached is not None:
+                file.file.close()
+                return _cached_response(file.filename, cached, cache_status="HIT", profile=_profile(timings, profile))
+
+            try:
+                analysis_results = _analyze_file(file.file, options, profile=timings)
+            finally:
+                file.file.close()
+            if cache_key:
+                # Encoded once for the cache; the response reuses those bytes
+                with timings.stage("serialization"):
+                    payload = result_cache.put(cache_key, analysis_results, _values_stored(analysis_results))
+                return _cached_response(file.filename, payload, profile=_profile(timings, profile))
+
+            return _analysis_response(file.filename, analysis_results, profile=_profile(timings, profile))
         
+    except HTTPException:
+        raise
     except pd.errors.EmptyDataError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -65,8 +173,567 @@ async def upload_file(
             detail=f"An error occurred during analysis: {str(e)}"
         )
 
+@dataclass(frozen=True)
+class AnalysisOptions:
+    """Query options of an /analyze request that shape the result."""
+    group_by: Optional[Tuple[str, ...]] = None
+    stream: bool = False
+    incremental: bool = False
+    mode: str = "exact"
+    top_k: Optional[int] = None
+    file_format: str = "csv"
+    columns: Optional[Tuple[str, ...]] = None
+    max_groups: Optional[int] = None
+    duplicate_subset: Optional[Tuple[str, ...]] = None
+    duplicate_normalize: str = "none"
+    sample: Optional[float] = None
+
+    @property
+    def accumulate(self) -> bool:
+        """Whether the file goes through the chunked accumulators rather than one DataFrame."""
+        # A sample is bounded in size already, so stream / approx have nothing left to bound
+        return not self.sample and (self.stream or self.incremental or self.mode == "approx")
+
+    @property
+    def read_columns(self) -> Optional[list]:
+        """Columns to read from the file: the requested ones, the group_by and the duplicate_subset columns."""
+        if not self.columns:
+            return None
+        extra = [*(self.group_by or ()), *(self.duplicate_subset or ())]
+        return [*self.columns, *dict.fromkeys(column for column in extra if column not in self.columns)]
+
+    def cache_params(self) -> dict:
+        return {
+            "group_by": self.group_by,
+            "stream": self.stream,
+            "mode": self.mode,
+            "top_k": self.top_k,
+            "file_format": self.file_format,
+            "columns": self.columns,
+            "max_groups": self.max_groups,
+            "duplicate_subset": self.duplicate_subset,
+            "duplicate_normalize": self.duplicate_normalize,
+            "sample": self.sample,
+        }
+
+def _check_options(options: AnalysisOptions) -> None:
+    if options.sample and options.incremental:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="sample cannot be combined with incremental: appended rows could not join the sample"
+        )
+
+def _parse_columns(columns: Optional[str]) -> Optional[Tuple[str, ...]]:
+    if not columns:
+        return None
+    names = tuple(name.strip() for name in columns.split(",") if name.strip())
+    return names or None
+
+def _profile(timings: AnalysisProfile, requested: bool) -> Optional[dict]:
+    return timings.to_dict() if requested else None
+
+def _file_size(fileobj: BinaryIO) -> int:
+    position = fileobj.tell()
+    size = fileobj.seek(0, os.SEEK_END)
+    fileobj.seek(position)
+    return size
+
+def _analyze_file(
+    fileobj: BinaryIO,
+    options: AnalysisOptions,
+    job: Optional[Job] = None,
+    profile: Optional[AnalysisProfile] = None
+) -> dict:
+    """
+    Parse and analyze a data file object, reporting progress to `job` if given
+    and stage timings to `profile`. Incremental analyses keep their
+    accumulator under the analysis_id.
+    """
+    profile = profile or AnalysisProfile()
+    if options.accumulate:
+        progress = (lambda rows: job.update_progress(stage="parsing", rows_processed=rows)) if job else None
+        with profile.stage("accumulate", nbytes=_file_size(fileobj)) as stage:
+            accumulator = accumulate_csv(
+                fileobj,
+                group_by_column=options.group_by,
+                progress=progress,
+                approx=options.mode == "approx",
+                file_format=options.file_format,
+                columns=options.read_columns
+            )
+            stage["rows"] = accumulator.rows
+        if accumulator.rows == 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Uploaded file is empty or could not be parsed"
+            )
+        if job:
+            accumulator.analysis_id = job.id
+        if options.incremental:
+            analysis_states.put(accumulator.analysis_id, accumulator)
+        with profile.stage("result"):
+            return accumulated_result(accumulator, options.top_k, options.max_groups)
+
+    # Read the file, or a sample of its rows
+    if job:
+        job.update_progress(stage="parsing")
+    sample = None
+    if options.sample:
+        with profile.stage("sample", nbytes=_file_size(fileobj)) as stage:
+            sample = sample_table(fileobj, options.sample, options.file_format, options.read_columns)
+            df = sample.frame
+            stage["rows"] = len(df)
+    else:
+        with profile.stage("parse", nbytes=_file_size(fileobj)) as stage:
+            df = read_table_file(fileobj, options.file_format, options.read_columns)
+            stage["rows"] = len(df)
+    if df.empty:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, 
+            detail="Uploaded file is empty or could not be parsed"
+        )
+
+    # Perform analysis
+    progress = None
+    if job:
+        job.update_progress(stage="analyzing", rows=len(df), columns_done=0, columns_total=len(df.columns))
+        progress = lambda done, total: job.update_progress(columns_done=done, columns_total=total)
+    results = analyze_dataframe(
+        df,
+        group_by_column=options.group_by,
+        progress=progress,
+        top_k=options.top_k,
+        analysis_id=job.id if job else None,
+        profile=profile,
+        max_groups=options.max_groups,
+        duplicate_subset=options.duplicate_subset,
+        duplicate_normalize=options.duplicate_normalize
+    )
+    return add_sampling(results, sample) if sample is not None else results
+
+def _submit_job(
+    file: UploadFile,
+    cache_key: Optional[str],
+    cached: Optional[bytes],
+    options: AnalysisOptions
+):
+    if cached is not None:
+        file.file.close()
+        return _cached_job_response(cached)
+
+    # The upload is closed once this response is sent, so the job gets its own copy
+    spool = tempfile.TemporaryFile()
+    try:
+        shutil.copyfileobj(file.file, spool)
+    finally:
+        file.file.close()
+    spool.seek(0)
+    return _queue_job(lambda: spool, cache_key, options, discard=spool.close)
+
+def _cached_job_response(cached: bytes) -> JSONResponse:
+    entry = loads(cached)
+    submitted = job_manager.add_completed(entry["results"], entry["analysis_id"])
+    return _job_response(submitted, status.HTTP_200_OK)
+
+def _queue_job(
+    open_source: Callable[[], BinaryIO],
+    cache_key: Optional[str],
+    options: AnalysisOptions,
+    discard: Optional[Callable[[], None]] = None
+) -> JSONResponse:
+    """Run `_analyze_file` on the file returned by `open_source()` as a background job."""
+    def work(current: Job) -> dict:
+        # Timings of background jobs go to /metrics only
+        with open_source() as source:
+            analysis_results = _analyze_file(source, options, job=current)
+        analysis_results["analysis_id"] = current.id
+        if cache_key:
+            result_cache.put(cache_key, analysis_results, _values_stored(analysis_results))
+        current.update_progress(stage="done")
+        return analysis_results
+
+    try:
+        submitted = job_manager.submit(work)
+    except JobQueueFullError as e:
+        if discard is not None:
+            discard()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": "5"}
+        )
+    return _job_response(submitted, status.HTTP_202_ACCEPTED)
+
+def _job_response(current: Job, status_code: int) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={
+            **current.describe(),
+            "status_url": f"/api/v1/analyze/jobs/{current.id}",
+            "result_url": f"/api/v1/analyze/jobs/{current.id}/result"
+        }
+    )
+
+@analysis_router.post("/analyze/local", summary="Analyze a file already on the server, in place")
+def analyze_local_file(
+    path: str = Query(..., description="File path relative to the configured local data directory"),
+    group_by: Optional[str] = Query(None, description="Column (or comma-separated columns) to group analysis by"),
+    stream: bool = Query(False, description="Parse the file in chunks with bounded memory (for very large files)"),
+    job: bool = Query(False, description="Run in the background and return an analysis_id to poll"),
+    incremental: bool = Query(False, description="Keep mergeable state so rows can be appended later (implies stream)"),
+    mode: str = Query("exact", pattern="^(exact|approx)$", description="approx: fixed-size sketches per column, with error bounds (implies stream)"),
+    top_k: Optional[int] = Query(None, ge=0, description="Values listed per column in value_distribution (0 = all; default from settings)"),
+    columns: Optional[str] = Query(None, description="Comma-separated columns to analyze; the others are not decoded"),
+    max_groups: Optional[int] = Query(None, ge=0, description="Largest groups listed in group_analysis (0 = all; default from settings)"),
+    duplicate_subset: Optional[str] = Query(None, description="Comma-separated key columns rows are compared on in row_duplicates (default all)"),
+    duplicate_normalize: str = Query("none", pattern="^(none|whitespace|text)$", description="row_duplicates: compare text trimmed with whitespace collapsed (whitespace), and also ignoring case (text)"),
+    sample: Optional[float] = Query(None, gt=0, lt=0.5, description="Analyze a random sample sized so percentages are within +/- this fraction (e.g. 0.01), with confidence intervals"),
+    profile: bool = Query(False, description="Add per-stage and per-column timings and peak allocations under `profile`")
+):
+    """
+    Analyze a file from the directory set by DATASMITH_LOCAL_DATA_DIR
+    without uploading it. The file is memory-mapped and parsed in place:
+    no upload spool, no temp file. Takes the same options and returns the
+    same response as `/analyze`; results are cached by path, size and
+    modification time.
+    """
+    full_path = _local_path(path)
+    logger.debug("Analyzing local file: %s", full_path)
+    file_format = detect_file_format(full_path)
+    if file_format is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported file type: {path}")
+    options = AnalysisOptions(
+        group_by=_parse_columns(group_by),
+        stream=stream,
+        incremental=incremental,
+        mode=mode,
+        top_k=top_k,
+        file_format=file_format,
+        columns=_parse_columns(columns),
+        max_groups=max_groups,
+        duplicate_subset=_parse_columns(duplicate_subset),
+        duplicate_normalize=duplicate_normalize,
+        sample=sample
+    )
+    _check_options(options)
+    file_stat = os.stat(full_path)
+    if file_stat.st_size == 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File is empty")
+    cache_key = None if incremental else result_key(
+        f"{full_path}:{file_stat.st_size}:{file_stat.st_mtime_ns}", **options.cache_params()
+    )
+    cached = _cache_hit(cache_key)
+    if job:
+        if cached is not None:
+            return _cached_job_response(cached)
+        return _queue_job(lambda: open(full_path, "rb"), cache_key, options)
+    if cached is not None:
+        return _cached_response(path, cached, cache_status="HIT")
+
+    with AnalysisProfile(trace_memory=profile) as timings:
+        try:
+            with open(full_path, "rb") as source:
+                analysis_results = _analyze_file(source, options, profile=timings)
+        except HTTPException:
+            raise
+        except pd.errors.EmptyDataError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The CSV file appears to be empty")
+        except pd.errors.ParserError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Could not parse the CSV file. Please check the format."
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"An error occurred during analysis: {str(e)}"
+            )
+        if cache_key:
+            with timings.stage("serialization"):
+                payload = result_cache.put(cache_key, analysis_results, _values_stored(analysis_results))
+            return _cached_response(path, payload, profile=_profile(timings, profile))
+        return _analysis_response(path, analysis_results, profile=_profile(timings, profile))
+
+def _local_path(path: str) -> str:
+    """Resolve `path` inside the local data directory; symlinks and .. may not leave it."""
+    if not settings.local_data_dir:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Local file analysis is disabled (set DATASMITH_LOCAL_DATA_DIR)"
+        )
+    root = os.path.realpath(settings.local_data_dir)
+    full_path = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, full_path]) != root:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f"{path} is outside the local data directory")
+    if not os.path.isfile(full_path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No file {path} in the local data directory")
+    return full_path
+
+@analysis_router.post("/analyze/batch", summary="Analyze many files with the same columns in one request")
+def analyze_batch_files(
+    files: List[UploadFile] = File(..., description="Data files in any accepted format, or .zip archives of them"),
+    group_by: Optional[str] = Query(None, description="Column (or comma-separated columns) to group analysis by"),
+    mode: str = Query("exact", pattern="^(exact|approx)$", description="approx: fixed-size sketches per column, with error bounds"),
+    top_k: Optional[int] = Query(None, ge=0, description="Values listed per column in value_distribution (0 = all; default from settings)"),
+    columns: Optional[str] = Query(None, description="Comma-separated columns to analyze; the others are not decoded"),
+    max_groups: Optional[int] = Query(None, ge=0, description="Largest groups listed in group_analysis (0 = all; default from settings)")
+):
+    """
+    Analyze the files of one dataset (e.g. its partitions, all with the same
+    columns) together: upload them as several `files` parts, or as .zip
+    archives. Each file is read as with `stream=true`, several at once when
+    DATASMITH_ANALYSIS_WORKERS > 1, with the semantic types inferred from
+    the first file.
+
+    `results` is the dataset-level analysis, merged from the per-file
+    aggregates (complete_duplicates_count counts duplicates across files);
+    its `analysis_id` pages distinct values as for `/analyze`. `files` has
+    each file's own results, or its `error` (unreadable, or columns that
+    differ from the first file's) if it was left out of the merge.
+    Batch results are not cached.
+    """
+    logger.info("Received batch of %d uploads", len(files))
+    workers = settings.analysis_workers
+    options = AnalysisOptions(group_by=_parse_columns(group_by), mode=mode, columns=_parse_columns(columns))
+    try:
+        for file in files:
+            if not is_archive(file.filename or ""):
+                validation_error = validate_csv_file(file)
+                if validation_error:
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"{file.filename}: {validation_error}")
+        with tempfile.TemporaryDirectory() as directory:
+            # Pool workers open the files by path, so uploads are spooled to disk for them
+            sources = _batch_sources(files, directory, spool=workers > 1)
+            if not sources:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No data files in the upload")
+            if len(sources) > settings.batch_max_files:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"{len(sources)} files exceed the limit of {settings.batch_max_files} per batch"
+                )
+            with AnalysisProfile() as timings:
+                with timings.stage("batch", nbytes=sum(_source_size(source) for _, source, _ in sources)):
+                    batch_results = analyze_batch(
+                        sources,
+                        group_by_column=options.group_by,
+                        approx=mode == "approx",
+                        columns=options.read_columns,
+                        top_k=top_k,
+                        max_groups=max_groups,
+                        workers=workers
+                    )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred during analysis: {str(e)}"
+        )
+    finally:
+        for file in files:
+            file.file.close()
+    return streamed_json_response(batch_results)
+
+def _batch_sources(files: List[UploadFile], directory: str, spool: bool) -> List[BatchSource]:
+    """The data files of a batch upload, archives extracted into `directory` (and, with `spool`, uploads copied there)."""
+    sources = []
+    for position, file in enumerate(files):
+        if is_archive(file.filename):
+            sources.extend((name, path, detect_file_format(name)) for name, path in extract_archive(file.file, directory))
+        elif spool:
+            path = os.path.join(directory, f"upload_{position}_{os.path.basename(file.filename)}")
+            with open(path, "wb") as out:
+                shutil.copyfileobj(file.file, out)
+            sources.append((file.filename, path, detect_file_format(file.filename)))
+        else:
+            sources.append((file.filename, file.file, detect_file_format(file.filename)))
+    return sources
+
+def _source_size(source) -> int:
+    return os.path.getsize(source) if isinstance(source, str) else _file_size(source)
+
+@analysis_router.post("/analyze/{analysis_id}/append", summary="Append rows to an incremental analysis")
+def append_rows(
+    analysis_id: str,
+    file: UploadFile = File(..., description="Data file with the new rows (same columns), in any accepted format"),
+    top_k: Optional[int] = Query(None, ge=0, description="Values listed per column in value_distribution (0 = all)"),
+    max_groups: Optional[int] = Query(None, ge=0, description="Largest groups listed in group_analysis (0 = all)")
+):
+    """
+    Add the rows of a delta file to an analysis created with `incremental=true`
+    and return the updated results. Only the new rows are parsed; counts,
+    moments, frequency tables, date ranges and quantiles are updated from the
+    kept state.
+    """
+    logger.info("Received delta for %s: %s", analysis_id, file.filename)
+    validation_error = validate_csv_file(file)
+    if validation_error:
+        file.file.close()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=validation_error)
+
+    entry = analysis_states.get(analysis_id)
+    if entry is None:
+        file.file.close()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No incremental analysis with id {analysis_id} (run /analyze with incremental=true)"
+        )
+    accumulator, state_lock = entry
+
+    with state_lock:
+        rows_before = accumulator.rows
+        try:
+            appended_rows = append_csv(accumulator, file.file, file_format=detect_file_format(file.filename))
+        except Exception as e:
+            if accumulator.rows == rows_before:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Error reading file: {str(e)}")
+            # A later chunk failed after earlier ones were absorbed; the state is no longer consistent
+            analysis_states.discard(analysis_id)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Could not parse the delta file, analysis state discarded: {str(e)}"
+            )
+        finally:
+            file.file.close()
+        analysis_results = accumulated_result(accumulator, top_k, max_groups)
+
+    return streamed_json_response({
+        "filename": file.filename,
+        "analysis_id": analysis_id,
+        "appended_rows": appended_rows,
+        "results": analysis_results
+    })
+
+@analysis_router.get("/analyze/{analysis_id}/columns/{column}/values", summary="Page through a column's distinct values")
+def get_column_values(
+    analysis_id: str,
+    column: str,
+    offset: int = Query(0, ge=0, description="Position of the first value, most frequent first"),
+    limit: int = Query(1000, ge=1, le=VALUES_PAGE_LIMIT, description="Values per page"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="ndjson streams every value from offset on")
+):
+    """
+    Returns a column's distinct values with their counts, most frequent
+    first. `json` returns one page (follow `next_offset`); `ndjson` streams
+    one {"value", "count"} object per line until the end.
+    """
+    values = distinct_values.get(analysis_id, column)
+    if values is None:
+        detail = (
+            f"Column {column} not found in analysis {analysis_id}" if distinct_values.has(analysis_id)
+            else f"Distinct values for analysis {analysis_id} are not available on this server (expired, or too large "
+                 "to keep); re-run the analysis: a cached result whose values are gone is analyzed again"
+        )
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+
+    if format == "json":
+        page = values.page(offset, limit)
+        page["values"] = [_value_entry(entry) for entry in page["values"]]
+        return FastJSONResponse({"analysis_id": analysis_id, "column": column, **page})
+
+    def lines():
+        position = offset
+        while True:
+            page = values.page(position, VALUES_PAGE_LIMIT)
+            for entry in page["values"]:
+                yield dumps(_value_entry(entry)) + b"\n"
+            if page["next_offset"] is None:
+                return
+            position = page["next_offset"]
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+def _value_entry(entry: dict) -> dict:
+    # The missing-value bucket (NaN / None) is reported as null
+    value = entry["value"]
+    return {"value": None if pd.api.types.is_scalar(value) and pd.isna(value) else value, "count": entry["count"]}
+
+@analysis_router.get("/analyze/jobs/{analysis_id}", summary="Status and progress of a background analysis")
+def get_job_status(analysis_id: str):
+    """
+    Returns the job status (queued, running, completed, failed) and progress.
+    """
+    return _get_job(analysis_id).describe()
+
+@analysis_router.get("/analyze/jobs/{analysis_id}/result", summary="Result of a background analysis")
+def get_job_result(analysis_id: str):
+    """
+    Returns the analysis result once the job has completed, 202 with the
+    job status while it is still queued or running.
+    """
+    current = _get_job(analysis_id)
+    if current.status == FAILED:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred during analysis: {current.error}"
+        )
+    if current.status != COMPLETED:
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=current.describe())
+    return streamed_json_response({"analysis_id": current.id, "results": current.result})
+
+def _get_job(analysis_id: str) -> Job:
+    current = job_manager.get(analysis_id)
+    if current is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No analysis job with id {analysis_id}"
+        )
+    return current
+
+def _analysis_response(
+    filename: str,
+    analysis_results: dict,
+    cache_status: str = "MISS",
+    profile: Optional[dict] = None
+) -> StreamingResponse:
+    content = {
+        "filename": filename,
+        "analysis_id": analysis_results.get("analysis_id"),
+        "results": analysis_results
+    }
+    if profile is not None:
+        content["profile"] = profile
+    # Encoded column by column as the body is sent, not into one buffer first
+    return StreamingResponse(
+        timed_iter(iter_json(content), "serialization"),
+        media_type="application/json",
+        headers={"X-Cache": cache_status}
+    )
+
+def _cache_hit(cache_key: Optional[str]) -> Optional[bytes]:
+    """
+    The cached entry for `cache_key`, or None to analyze the file again:
+    also when the entry's distinct values were stored by another worker, or
+    evicted from this one's value store, so its analysis_id would not page
+    through /values. The re-run stores them and replaces the entry.
+    """
+    cached = result_cache.get_raw(cache_key) if cache_key else None
+    if cached is not None and distinct_values.enabled:
+        analysis_id, values_stored = entry_head(cached)
+        if values_stored and not distinct_values.has(analysis_id):
+            return None
+    return cached
+
+def _values_stored(analysis_results: dict) -> bool:
+    # False when the value store is disabled or the values were too large to keep
+    return distinct_values.has(analysis_results["analysis_id"])
+
+def _cached_response(filename: str, cached: bytes, cache_status: str = "MISS", profile: Optional[dict] = None) -> Response:
+    # `cached` is the {"analysis_id", "values_stored", "results"} entry stored by the result cache
+    head = b'{"filename":' + dumps(filename) + b","
+    if profile is not None:
+        head += b'"profile":' + dumps(profile) + b","
+    return Response(content=head + cached[1:], media_type="application/json", headers={"X-Cache": cache_status})
+
+@analysis_router.get("/cache/stats", summary="Result cache hit/miss counters")
+async def get_cache_stats():
+    """
+    Returns hit/miss/eviction counters and current size of the result cache.
+    """
+    return result_cache.info()
+
 @analysis_router.get("/analyze/sample", summary="Get sample analysis data")
-async def get_sample_analysis():
+def get_sample_analysis():
     """
     Returns sample analysis data for testing purposes.
     """
@@ -85,7 +752,7 @@ async def get_sample_analysis():
     df = pd.DataFrame(sample_data)
     analysis_results = analyze_dataframe(df, group_by_column='department')
     
-    return {
+    return FastJSONResponse({
         "filename": "sample_data.csv",
         "results": analysis_results
-    }
\ No newline at end of file
+    })
\ No newline at end of file
@@ -1,10 +1,26 @@
-from .analysis_service import analyze_dataframe
-from .field_detector import infer_column_semantic_type, detect_field_type
-from . import analyzers
-
-__all__ = [
-    "analyze_dataframe",
-    "infer_column_semantic_type",
-    "detect_field_type",
-    *analyzers.__all__,
-]
\ No newline at end of file
+from importlib import import_module
+
+# Re-exported name -> defining module. They are imported on first access, so
+# importing one service (e.g. from a column pool worker) does not load them all.
+_EXPORTS = {
+    "analyze_dataframe": ".analysis_service",
+    "infer_column_semantic_type": ".field_detector",
+    "detect_field_type": ".field_detector",
+    "detect_field_types": ".field_detector",
+    "analyze_currency": ".analyzers",
+    "analyze_numeric": ".analyzers",
+    "analyze_boolean": ".analyzers",
+    "analyze_string": ".analyzers",
+    "date_analysis": ".analyzers",
+    "analyze_id": ".analyzers",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
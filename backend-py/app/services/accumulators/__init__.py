@@ -0,0 +1,13 @@
+from .column import ColumnAccumulator
+from .dataset import DatasetAccumulator
+from .semantic import SEMANTIC_ACCUMULATORS
+from .stats import FrequencyTable, Moments, NumericDistribution
+
+__all__ = [
+    'ColumnAccumulator',
+    'DatasetAccumulator',
+    'SEMANTIC_ACCUMULATORS',
+    'FrequencyTable',
+    'Moments',
+    'NumericDistribution',
+]
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Optional
+
+from ..field_detector import sample_semantic_type, TRUSTED_SEMANTIC_TYPES, ID_UNIQUE_RATIO
+from .semantic import SEMANTIC_ACCUMULATORS
+from .stats import FrequencyTable, NumericDistribution
+
+
+class ColumnAccumulator:
+    """
+    Everything analyze_dataframe reports about one column, accumulated chunk by
+    chunk: the duplicate/frequency profile, the generic numeric summary and the
+    semantic analyzer output.
+
+    The per-value type is sampled from the first chunk that has values. Unless
+    that is one of the trusted types, whether the column is an ID depends on
+    its distinct ratio over all rows, so both the ID analyzer and the sampled
+    type's analyzer are fed and the choice is made in `semantic_type`.
+    A `semantic_type` given up front (see `pin`) is used instead of sampling.
+    """
+
+    def __init__(self, name: str, capacity: int, semantic_type: Optional[str] = None):
+        self.name = name
+        self.capacity = capacity
+        self.rows = 0
+        self.dtype: Optional[np.dtype] = None
+        self.sampled_type: Optional[str] = None
+        self.table = FrequencyTable(capacity)
+        self.numeric = NumericDistribution(capacity, table=self.table)
+        self.analyzers: Dict[str, Any] = {}
+        self.pinned = False
+        if semantic_type is not None:
+            self.pin(semantic_type)
+
+    def update(self, series: pd.Series) -> None:
+        self.rows += len(series)
+        self.dtype = _common_dtype(self.dtype, series.dtype)
+        self.table.update(series)
+        if pd.api.types.is_numeric_dtype(series):
+            self.numeric.update(series.dropna())
+
+        if self.sampled_type is None and series.notna().any():
+            self._start_analyzers(sample_semantic_type(series))
+        self._drop_unlikely_id()
+        for analyzer in self.analyzers.values():
+            analyzer.update(series)
+
+    def _drop_unlikely_id(self) -> None:
+        # Stop paying for the ID analyzer once a column is clearly repetitive
+        if "id" not in self.analyzers or len(self.analyzers) == 1 or self.table.truncated:
+            return
+        non_null = self.rows - self.table.missing
+        if non_null and self.table.distinct_count() / non_null < ID_UNIQUE_RATIO / 2:
+            del self.analyzers["id"]
+
+    def _start_analyzers(self, sampled_type: str) -> None:
+        self.sampled_type = sampled_type
+        candidates = [sampled_type] if sampled_type in TRUSTED_SEMANTIC_TYPES else [sampled_type, "id"]
+        self.analyzers = {
+            semantic_type: SEMANTIC_ACCUMULATORS[semantic_type](self.capacity)
+            for semantic_type in candidates if semantic_type in SEMANTIC_ACCUMULATORS
+        }
+
+    def pin(self, semantic_type: str) -> None:
+        """Fix the semantic type: from now on only its analyzer is fed and semantic_type no longer changes."""
+        analyzer = self.analyzers.get(semantic_type)
+        if analyzer is None and semantic_type in SEMANTIC_ACCUMULATORS:
+            analyzer = SEMANTIC_ACCUMULATORS[semantic_type](self.capacity)
+        self.sampled_type = semantic_type
+        self.analyzers = {semantic_type: analyzer} if analyzer is not None else {}
+        self.pinned = True
+
+    def merge(self, other: "ColumnAccumulator") -> None:
+        self.rows += other.rows
+        self.dtype = _common_dtype(self.dtype, other.dtype)
+        self.table.merge(other.table)
+        self.numeric.merge(other.numeric)
+        if self.sampled_type is None:
+            self.sampled_type, self.analyzers, self.pinned = other.sampled_type, other.analyzers, other.pinned
+            return
+        for semantic_type, analyzer in other.analyzers.items():
+            if semantic_type in self.analyzers:
+                self.analyzers[semantic_type].merge(analyzer)
+
+    @property
+    def semantic_type(self) -> str:
+        """Same decision as field_detector.infer_column_semantic_type, over all rows seen."""
+        if self.sampled_type is None:
+            return "unknown"
+        if self.pinned or self.sampled_type in TRUSTED_SEMANTIC_TYPES:
+            return self.sampled_type
+        non_null = self.rows - self.table.missing
+        if "id" in self.analyzers and non_null and self.table.distinct_count() / non_null > ID_UNIQUE_RATIO:
+            return "id"
+        return self.sampled_type
+
+    @property
+    def is_numeric(self) -> bool:
+        return self.dtype is not None and pd.api.types.is_numeric_dtype(self.dtype)
+
+    def duplicate_profile(self, top_k: Optional[int] = None) -> dict:
+        return self.table.profile(self.rows, top_k)
+
+    def analysis(self) -> Optional[dict]:
+        analyzer = self.analyzers.get(self.semantic_type)
+        if analyzer is None:
+            return None
+        return analyzer.result(self)
+
+    def numeric_summary(self) -> dict:
+        """Same fields as analysis_service._summarize_numeric."""
+        def _safe(val):
+            return None if pd.isna(val) or np.isinf(val) else float(val)
+
+        values = self.numeric
+        moments = values.moments
+        is_bool = self.dtype == np.dtype(bool)
+        summary = {
+            "mean": _safe(moments.mean if moments.count else np.nan),
+            "median": _safe(values.quantile(0.5)),
+            "min": _safe(moments.min),
+            "max": _safe(moments.max),
+            "std": _safe(moments.std),
+            "q1": _safe(values.quantile(0.25)),
+            "q3": _safe(values.quantile(0.75)),
+            "missing_values": self.table.missing,
+            "zero_values": values.zero_count if not is_bool else 0,
+        }
+        bounds = values.error_bounds({"median": 0.5, "q1": 0.25, "q3": 0.75})
+        if bounds is not None:
+            del bounds["unique_values"], bounds["range_counts"]
+            summary["approximate"] = True
+            summary["error_bounds"] = bounds
+        return summary
+
+
+def _common_dtype(current, new):
+    """dtype the concatenated column would have (chunks may infer int, then float)."""
+    if current is None:
+        return new
+    if new is None or current == new:
+        return current
+    if pd.api.types.is_numeric_dtype(current) and pd.api.types.is_numeric_dtype(new) \
+            and current != np.dtype(bool) and new != np.dtype(bool):
+        return np.result_type(current, new)
+    return np.dtype(object)
@@ -0,0 +1,331 @@
+import uuid
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Any, Optional, Sequence, Union
+
+from ...config import settings
+from ..grouping import group_columns, group_label, group_summary, largest_groups
+from ..row_duplicates import row_fingerprints
+from ..sketches import HyperLogLog
+from .column import ColumnAccumulator
+
+# Rough resident cost of one retained frequency-table entry (index value + count + hash slot)
+TABLE_ENTRY_BYTES = 128
+# Share of the memory budget given to each kind of retained state
+TABLE_BUDGET_SHARE = 0.5
+ROW_HASH_BUDGET_SHARE = 0.15
+GROUP_BUDGET_SHARE = 0.1
+
+
+class DatasetAccumulator:
+    """
+    Mergeable state for a whole analysis, fed one DataFrame chunk at a time.
+
+    All retained state is sized from `memory_budget_bytes` when the first chunk
+    shows how many columns there are, so memory stays flat as more rows arrive.
+    A fixed `table_capacity` instead bounds every value table (and the exact
+    row-hash set) to that many entries, so each column is summarized by
+    fixed-size sketches whatever the budget or row count (mode=approx).
+    `result()` returns the same structure as analyze_dataframe, under a
+    stable `analysis_id` so later appends report as the same analysis.
+    Columns named in `semantic_types` get that type instead of one sampled
+    from their values (see ColumnAccumulator.pin).
+    """
+
+    def __init__(
+        self,
+        memory_budget_bytes: int,
+        group_by_column: Optional[Union[str, Sequence[str]]] = None,
+        table_capacity: Optional[int] = None,
+        semantic_types: Optional[Dict[str, str]] = None,
+    ):
+        self.analysis_id = str(uuid.uuid4())
+        self.memory_budget_bytes = memory_budget_bytes
+        self.group_by_columns = group_columns(group_by_column)
+        self.table_capacity = table_capacity
+        self.pinned_types = dict(semantic_types or {})
+        self.rows = 0
+        self.memory_bytes = 0
+        self.columns: Dict[str, ColumnAccumulator] = {}
+        self.row_hashes = _RowHashes(
+            table_capacity if table_capacity else int(memory_budget_bytes * ROW_HASH_BUDGET_SHARE) // 16
+        )
+        self.groups: Optional[_GroupPartials] = None
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        if not self.columns:
+            capacity = self._table_capacity(len(chunk.columns))
+            self.columns = {
+                column: ColumnAccumulator(column, capacity, self.pinned_types.get(column)) for column in chunk.columns
+            }
+            if self.group_by_columns and all(column in self.columns for column in self.group_by_columns):
+                self.groups = _GroupPartials(
+                    self.group_by_columns,
+                    int(self.memory_budget_bytes * GROUP_BUDGET_SHARE) // (TABLE_ENTRY_BYTES * len(chunk.columns)),
+                )
+
+        self.rows += len(chunk)
+        self.memory_bytes += int(chunk.memory_usage(deep=True).sum())
+        self.row_hashes.update(row_fingerprints(chunk))
+        for column, accumulator in self.columns.items():
+            accumulator.update(chunk[column])
+        if self.groups is not None:
+            self.groups.update(chunk)
+
+    def merge(self, other: "DatasetAccumulator") -> None:
+        if not self.columns:
+            self.columns = other.columns
+            self.groups = other.groups
+        else:
+            for column, accumulator in other.columns.items():
+                self.columns[column].merge(accumulator)
+            if self.groups is not None and other.groups is not None:
+                self.groups.merge(other.groups)
+        self.rows += other.rows
+        self.memory_bytes += other.memory_bytes
+        self.row_hashes.merge(other.row_hashes)
+
+    def semantic_types(self) -> Dict[str, str]:
+        """Semantic type of every column that has had values so far."""
+        return {
+            name: accumulator.semantic_type
+            for name, accumulator in self.columns.items() if accumulator.sampled_type is not None
+        }
+
+    def pin_semantic_types(self) -> Dict[str, str]:
+        """
+        Fix the columns' current semantic types (ColumnAccumulator.pin), so
+        accumulators started with the returned types can be merged into this
+        one analyzer for analyzer.
+        """
+        types = self.semantic_types()
+        for name, semantic_type in types.items():
+            self.columns[name].pin(semantic_type)
+        self.pinned_types.update(types)
+        return types
+
+    def _table_capacity(self, column_count: int) -> int:
+        if self.table_capacity:
+            return self.table_capacity
+        # Each column may hold a value table of its own plus one for its semantic analyzer
+        per_table = self.memory_budget_bytes * TABLE_BUDGET_SHARE / max(column_count, 1) / 2
+        return max(int(per_table // TABLE_ENTRY_BYTES), 1000)
+
+    def result(self, top_k: Optional[int] = None, max_groups: Optional[int] = None) -> Dict[str, Any]:
+        columns = list(self.columns)
+        results = {
+            "analysis_id": self.analysis_id,
+            "analysis_timestamp": datetime.utcnow().isoformat(),
+            "metadata": {
+                "total_rows": self.rows,
+                "total_columns": len(columns),
+                "columns": columns,
+                "data_types": {name: str(acc.dtype) for name, acc in self.columns.items()},
+                "memory_usage": f"{self.memory_bytes / 1024 / 1024:.2f} MB",
+            },
+            "duplicate_analysis": {},
+            "numerical_analysis": {},
+            "data_quality": {
+                "complete_duplicates_count": self.rows - self.row_hashes.distinct_count(),
+            },
+            "columns": [],
+        }
+
+        for name, accumulator in self.columns.items():
+            results["duplicate_analysis"][name] = accumulator.duplicate_profile(top_k)
+            analysis = accumulator.analysis()
+            if analysis is not None:
+                results["columns"].append(
+                    {"name": name, "type": accumulator.semantic_type, "analysis": analysis}
+                )
+            if accumulator.is_numeric:
+                results["numerical_analysis"][name] = accumulator.numeric_summary()
+
+        missing_by_column = {name: acc.table.missing for name, acc in self.columns.items()}
+        results["data_quality"]["total_missing_values"] = sum(missing_by_column.values())
+        results["data_quality"]["missing_values_by_column"] = missing_by_column
+        if not self.row_hashes.exact:
+            error = self.row_hashes.sketch.relative_error
+            results["data_quality"]["error_bounds"] = {
+                "complete_duplicates_count": {
+                    "relative_standard_error": error,
+                    "error_95": int(np.ceil(2 * error * self.row_hashes.distinct_count())),
+                }
+            }
+
+        if self.groups is not None:
+            results["group_analysis"], results["group_analysis_summary"] = self.groups.result(self.columns, max_groups)
+
+        return results
+
+
+class _RowHashes:
+    """Distinct full-row count: exact set of row hashes up to `capacity`, then HyperLogLog."""
+
+    def __init__(self, capacity: int):
+        self.capacity = max(capacity, 1)
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.pending = []
+        self.sketch = HyperLogLog()
+        self.exact = True
+        self.rows = 0
+
+    def update(self, hashes: np.ndarray) -> None:
+        self.rows += len(hashes)
+        self.sketch.add_hashes(hashes)
+        if self.exact:
+            self.pending.append(np.unique(hashes))
+            if sum(len(p) for p in self.pending) > max(len(self.hashes), 1 << 16):
+                self._compact()
+
+    def merge(self, other: "_RowHashes") -> None:
+        self.rows += other.rows
+        self.sketch.merge(other.sketch)
+        if self.exact and other.exact:
+            self.pending.extend([other.hashes, *other.pending])
+            self._compact()
+        else:
+            self._drop_exact()
+
+    def _compact(self) -> None:
+        self.hashes = np.unique(np.concatenate([self.hashes, *self.pending]))
+        self.pending = []
+        if len(self.hashes) > self.capacity:
+            self._drop_exact()
+
+    def _drop_exact(self) -> None:
+        self.exact = False
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.pending = []
+
+    def distinct_count(self) -> int:
+        if self.exact:
+            self._compact()
+        if self.exact:
+            return len(self.hashes)
+        return min(int(round(self.sketch.estimate())), self.rows)
+
+
+class _GroupPartials:
+    """
+    Per-group-key partial aggregates (row count, missing cells, and
+    sum/count/min/max of every numeric column) that combine across chunks.
+    A single numeric key is binned into quartiles only at the end, from the
+    exact key distribution.
+    """
+
+    def __init__(self, group_columns: Sequence[str], capacity: int):
+        self.group_columns = list(group_columns)
+        self.capacity = max(capacity, 1000)
+        # Per key: row_count, missing_values
+        self.sizes: Optional[pd.DataFrame] = None
+        self.partials: Optional[pd.DataFrame] = None
+        self.error: Optional[str] = None
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        if self.error:
+            return
+        numeric = chunk.select_dtypes(include=[np.number]).columns.drop(self.group_columns, errors="ignore")
+        keys = [chunk[column] for column in self.group_columns]
+        grouped = chunk.groupby(keys, sort=False, observed=True)
+        sizes = pd.DataFrame({"row_count": grouped.size()})
+        sizes["missing_values"] = chunk.isna().sum(axis=1).groupby(keys, sort=False, observed=True).sum()
+        partials = grouped[list(numeric)].agg(["sum", "count", "min", "max"]) if len(numeric) else None
+        self._combine(sizes, partials)
+
+    def merge(self, other: "_GroupPartials") -> None:
+        self.error = self.error or other.error
+        if not self.error and other.sizes is not None:
+            self._combine(other.sizes, other.partials)
+
+    @property
+    def _levels(self):
+        return list(range(len(self.group_columns)))
+
+    def _combine(self, sizes: pd.DataFrame, partials: Optional[pd.DataFrame]) -> None:
+        if self.sizes is not None:
+            sizes = pd.concat([self.sizes, sizes]).groupby(level=self._levels, sort=False).sum()
+            if partials is not None and self.partials is not None:
+                partials = _combine_partials(pd.concat([self.partials, partials]), level=self._levels)
+            elif partials is None:
+                partials = self.partials
+        self.sizes, self.partials = sizes, partials
+        if len(self.sizes) > self.capacity:
+            self.error = f"Group analysis failed: more than {self.capacity} groups for the streaming memory budget"
+            self.sizes, self.partials = None, None
+
+    def result(self, columns: Dict[str, ColumnAccumulator], max_groups: Optional[int] = None):
+        """group_analysis and group_analysis_summary, as analyze_dataframe reports them."""
+        max_groups = settings.group_analysis_max_groups if max_groups is None else max_groups
+        if self.error:
+            return {"error": self.error}, group_summary(self.group_columns, 0, 0)
+        if self.sizes is None:
+            return {}, group_summary(self.group_columns, 0, 0)
+        try:
+            sizes, partials = self.sizes, self.partials
+            if len(self.group_columns) == 1 and columns[self.group_columns[0]].is_numeric:
+                sizes, partials = self._binned(columns[self.group_columns[0]], sizes, partials)
+            else:
+                order = _sorted_keys(sizes.index)
+                sizes = sizes.loc[order]
+                partials = partials.loc[order] if partials is not None else None
+            positions = largest_groups(sizes["row_count"], max_groups)
+            summary = group_summary(self.group_columns, len(sizes), len(positions))
+            sizes = sizes.iloc[positions]
+            partials = partials.iloc[positions] if partials is not None else None
+
+            numeric_columns = [
+                name for name, acc in columns.items() if acc.is_numeric and name not in self.group_columns
+            ]
+            group_results = {}
+            for position, (key, row_count, missing) in enumerate(sizes.itertuples()):
+                stats = {}
+                for num_col in numeric_columns:
+                    if partials is None or num_col not in partials.columns.get_level_values(0):
+                        continue
+                    part = partials.iloc[position][num_col]
+                    count = int(part["count"])
+                    stats[num_col] = {
+                        "mean": float(part["sum"] / count) if count else float("nan"),
+                        "count": count,
+                        "min": float(part["min"]),
+                        "max": float(part["max"]),
+                    }
+                group_results[group_label(key)] = {
+                    "row_count": int(row_count),
+                    "missing_values": int(missing),
+                    "numerical_stats": stats,
+                }
+            return group_results, summary
+        except Exception as e:
+            return {"error": f"Group analysis failed: {e}"}, group_summary(self.group_columns, 0, 0)
+
+    def _binned(self, key_column: ColumnAccumulator, sizes: pd.DataFrame, partials: Optional[pd.DataFrame]):
+        """Fold per-key partials into the qcut(q=4) / cut(bins=5) bins analyze_dataframe uses."""
+        keys = sizes.index.to_series().astype(np.float64)
+        try:
+            edges = [key_column.numeric.quantile(q) for q in np.linspace(0, 1, 5)]
+            bins = pd.cut(keys, bins=edges, include_lowest=True, duplicates="drop")
+        except Exception:
+            bins = pd.cut(keys, bins=5)
+        categories = bins.cat.categories
+        binned_sizes = sizes.groupby(bins.to_numpy(), observed=False).sum().reindex(categories, fill_value=0)
+        if partials is not None:
+            partials = _combine_partials(partials.set_axis(pd.CategoricalIndex(bins), axis=0), observed=False)
+            partials = partials.reindex(categories)
+            count_columns = [c for c in partials.columns if c[1] in ("sum", "count")]
+            partials[count_columns] = partials[count_columns].fillna(0)
+        return binned_sizes, partials
+
+
+def _combine_partials(partials: pd.DataFrame, observed: bool = True, level=0) -> pd.DataFrame:
+    how = {column: ("sum" if column[1] in ("sum", "count") else column[1]) for column in partials.columns}
+    return partials.groupby(level=level, sort=False, observed=observed).agg(how)
+
+
+def _sorted_keys(index: pd.Index) -> pd.Index:
+    try:
+        return index.sort_values()
+    except TypeError:
+        return index
@@ -0,0 +1,492 @@
+"""
+Mergeable, chunk-at-a-time counterparts of the semantic analyzers.
+
+Each accumulator is fed the raw column chunk by chunk through `update` and
+produces, from `result`, the same dictionary its analyzer returns for the
+full column. `column` gives access to the column-wide value table so that
+statistics derivable from it (distinct counts, modes, sorted values) are not
+tracked twice.
+"""
+import numpy as np
+import pandas as pd
+
+from ...utils.strings import as_strings
+from ..analyzers.analyze_currency import currency_symbols
+from ..analyzers.analyze_id import PATTERN_SHARE, IdProfile, id_profile, is_sequential
+from ..datetimes import DAY_NS, calendar_counts, localize, parse_dates, runs, time_of_day_analysis
+from ..profiler import most_common_value
+from ..sketches import KLLSketch
+from .stats import FrequencyTable, NumericDistribution, weighted_quantile
+
+BOOLEAN_MAP = {"true": True, "false": False, "1": True, "0": False, "yes": True, "no": False}
+EXAMPLE_COUNT = 5
+QUARTILES = {"median": 0.5, "q1": 0.25, "q3": 0.75}
+
+
+def _mode(table: pd.Series):
+    """(most common value, its count) of a non-null value table."""
+    if table.empty:
+        return None, 0
+    top = int(table.max())
+    return most_common_value(table.index, table.to_numpy(), top), top
+
+
+def _sorted_desc(table: pd.Series) -> dict:
+    """The table as value_counts() would order it."""
+    return table.sort_values(ascending=False).to_dict()
+
+
+def _string_table(column) -> pd.Series:
+    """Column value table re-keyed by str(value), as .dropna().astype(str) would see it."""
+    observed = column.table.observed()
+    if observed.empty or pd.api.types.infer_dtype(observed.index, skipna=False) == "string":
+        return observed
+    keys = observed.index.astype(str)
+    return observed.groupby(keys, sort=False).sum()
+
+
+class _Examples:
+    """First few non-null values, in row order."""
+
+    def __init__(self, limit: int = EXAMPLE_COUNT):
+        self.limit = limit
+        self.values = []
+
+    def update(self, series: pd.Series) -> None:
+        if len(self.values) < self.limit:
+            self.values.extend(series.head(self.limit - len(self.values)).tolist())
+
+    def merge(self, other: "_Examples") -> None:
+        self.values.extend(other.values[: self.limit - len(self.values)])
+
+
+class NumericAccumulator:
+    """Streaming form of analyzers.analyze_numeric."""
+
+    def __init__(self, capacity: int):
+        self.values = NumericDistribution(capacity)
+
+    def update(self, series: pd.Series) -> None:
+        self.values.update(pd.to_numeric(series, errors="coerce").dropna())
+
+    def merge(self, other: "NumericAccumulator") -> None:
+        self.values.merge(other.values)
+
+    def result(self, column) -> dict:
+        values = self.values
+        moments = values.moments
+        if moments.count == 0:
+            return {}
+
+        q1, q3 = values.quantile(0.25), values.quantile(0.75)
+        iqr = q3 - q1
+        lower_bound = q1 - 1.5 * iqr
+        upper_bound = q3 + 1.5 * iqr
+        outlier_count = values.count_outside(lower_bound, upper_bound)
+
+        return _with_error_bounds({
+            "count": int(moments.count),
+            "mean": float(moments.mean),
+            "median": float(values.quantile(0.5)),
+            "min": float(moments.min),
+            "max": float(moments.max),
+            "std_dev": float(moments.std),
+            "variance": float(moments.variance),
+            "q1": float(q1),
+            "q3": float(q3),
+            "iqr": float(iqr),
+            "coefficient_of_variation": float(moments.std / moments.mean) if moments.mean != 0 else None,
+            "skewness": float(moments.skewness),
+            "kurtosis": float(moments.kurtosis),
+            "missing_values": 0,
+            "unique_values": int(values.unique_count()),
+            "zero_count": values.zero_count,
+            "positive_count": values.positive_count,
+            "negative_count": values.negative_count,
+            "outlier_count": outlier_count,
+            "outlier_percentage": float(outlier_count / moments.count * 100),
+            "outlier_examples": values.values_outside(lower_bound, upper_bound),
+        }, _numeric_error_bounds(values))
+
+
+class CurrencyAccumulator:
+    """Streaming form of analyzers.analyze_currency."""
+
+    def __init__(self, capacity: int):
+        self.values = NumericDistribution(capacity)
+        self.symbols = FrequencyTable(capacity)
+        self.examples = _Examples()
+        self.rows = 0
+        self.missing = 0
+
+    def update(self, series: pd.Series) -> None:
+        self.rows += len(series)
+        self.missing += int(series.isnull().sum())
+        original = as_strings(series.dropna())
+        self.examples.update(original)
+        self.symbols.update(currency_symbols(original))
+        cleaned = original.str.replace(r"[^\d\.\-]", "", regex=True)
+        self.values.update(pd.to_numeric(cleaned, errors="coerce").dropna())
+
+    def merge(self, other: "CurrencyAccumulator") -> None:
+        self.values.merge(other.values)
+        self.symbols.merge(other.symbols)
+        self.examples.merge(other.examples)
+        self.rows += other.rows
+        self.missing += other.missing
+
+    def result(self, column) -> dict:
+        if self.rows == 0:
+            return {"error": "Empty series"}
+        if not self.examples.values:
+            return {"error": "No valid currency values"}
+
+        symbol, _ = _mode(self.symbols.observed())
+        common_symbol = symbol if symbol is not None else ""
+        values = self.values
+        moments = values.moments
+        if moments.count == 0:
+            return {
+                "error": "No valid currency values",
+                "symbol": common_symbol,
+                "example_values": self.examples.values,
+                "missing_values": self.missing,
+            }
+
+        return _with_error_bounds({
+            "symbol": common_symbol,
+            "count": int(moments.count),
+            "total_sum": float(moments.total),
+            "mean": float(moments.mean),
+            "median": float(values.quantile(0.5)),
+            "min": float(moments.min),
+            "max": float(moments.max),
+            "std_dev": float(moments.std),
+            "q1": float(values.quantile(0.25)),
+            "q3": float(values.quantile(0.75)),
+            "unique_values": int(values.unique_count()),
+            "missing_values": self.missing,
+            "example_values": self.examples.values,
+        }, _numeric_error_bounds(values))
+
+
+class BooleanAccumulator:
+    """Streaming form of analyzers.analyze_boolean."""
+
+    def __init__(self, capacity: int):
+        # True / False / unmapped (NaN): never more than three keys
+        self.table = FrequencyTable(3)
+
+    def update(self, series: pd.Series) -> None:
+        series = series.dropna()
+        if series.dtype != "bool":
+            series = as_strings(series).str.lower().map(BOOLEAN_MAP)
+        self.table.update(series)
+
+    def merge(self, other: "BooleanAccumulator") -> None:
+        self.table.merge(other.table)
+
+    def result(self, column) -> dict:
+        table = self.table.counts
+        count = self.table.total
+        if table is None or count == 0:
+            return {}
+
+        observed = self.table.observed()
+        true_count = int(observed[observed.index == True].sum())
+        false_count = int(observed[observed.index == False].sum())
+        return {
+            "count": int(count),
+            "true_count": true_count,
+            "false_count": false_count,
+            "true_percentage": float(true_count / count * 100),
+            "false_percentage": float(false_count / count * 100),
+            "missing_values": self.table.missing,
+            "distribution": {str(k): int(v) for k, v in _sorted_desc(table).items()},
+        }
+
+
+class StringAccumulator:
+    """Streaming form of analyzers.analyze_string."""
+
+    def __init__(self, capacity: int):
+        self.lengths = FrequencyTable(capacity)
+        self.examples = _Examples()
+        self.empty_count = 0
+        self.whitespace_count = 0
+
+    def update(self, series: pd.Series) -> None:
+        series = as_strings(series.dropna())
+        self.lengths.update(series.str.len())
+        self.examples.update(series)
+        self.empty_count += int((series == "").sum())
+        self.whitespace_count += int((series.str.strip() == "").sum())
+
+    def merge(self, other: "StringAccumulator") -> None:
+        self.lengths.merge(other.lengths)
+        self.examples.merge(other.examples)
+        self.empty_count += other.empty_count
+        self.whitespace_count += other.whitespace_count
+
+    def result(self, column) -> dict:
+        count = self.lengths.total
+        if count == 0:
+            return {}
+
+        strings = _string_table(column)
+        most_common, most_common_count = _mode(strings)
+        lengths = self.lengths.observed()
+        length_values = lengths.index.to_numpy(dtype=np.float64)
+        order = np.argsort(length_values)
+        length_counts = lengths.to_numpy()
+
+        return _with_error_bounds({
+            "count": int(count),
+            "unique_values": int(column.table.distinct_count() if column.table.truncated else len(strings)),
+            "most_common_value": most_common,
+            "most_common_count": most_common_count,
+            "avg_length": float((length_values * length_counts).sum() / count),
+            "min_length": int(length_values.min()),
+            "max_length": int(length_values.max()),
+            "median_length": weighted_quantile(length_values[order], length_counts[order], 0.5),
+            "empty_string_count": self.empty_count,
+            "whitespace_ratio": float(self.whitespace_count / count),
+            "example_values": self.examples.values,
+        }, _table_error_bounds(column.table, "unique_values", self.lengths))
+
+
+class IdAccumulator:
+    """Streaming form of analyzers.analyze_id."""
+
+    def __init__(self, capacity: int):
+        self.profile = IdProfile()
+        self.numeric_min = np.inf
+        self.numeric_max = -np.inf
+        self.examples = _Examples()
+
+    def update(self, series: pd.Series) -> None:
+        series = as_strings(series.dropna())
+        if series.empty:
+            return
+        self.profile.merge(id_profile(series))
+        if self.profile.is_numeric:
+            nums = pd.to_numeric(series, errors="coerce").dropna()
+            if not nums.empty:
+                self.numeric_min = min(self.numeric_min, float(nums.min()))
+                self.numeric_max = max(self.numeric_max, float(nums.max()))
+        self.examples.update(series)
+
+    def merge(self, other: "IdAccumulator") -> None:
+        self.profile.merge(other.profile)
+        self.numeric_min = min(self.numeric_min, other.numeric_min)
+        self.numeric_max = max(self.numeric_max, other.numeric_max)
+        self.examples.merge(other.examples)
+
+    def result(self, column) -> dict:
+        profile = self.profile
+        if profile.count == 0:
+            return {"error": "Empty series"}
+
+        strings = _string_table(column)
+        unique_count = column.table.distinct_count() if column.table.truncated else len(strings)
+
+        return _with_error_bounds({
+            "count": profile.count,
+            "unique_count": unique_count,
+            "uniqueness_ratio": unique_count / profile.count,
+            "length_min": profile.length_min,
+            "length_max": profile.length_max,
+            "length_mean": profile.length_total / profile.count,
+            "is_numeric": profile.is_numeric,
+            "is_alpha": profile.is_alpha,
+            "is_alphanumeric": profile.is_alnum,
+            "common_prefix": profile.prefix if profile.prefix else None,
+            "common_suffix": profile.suffix if profile.suffix else None,
+            "uuid_like": profile.uuid_matches / profile.count > PATTERN_SHARE,
+            "hex_like": profile.hex_matches / profile.count > PATTERN_SHARE,
+            "sequential": self._sequential(column, strings),
+            "example_values": self.examples.values,
+        }, _table_error_bounds(column.table, "unique_count"))
+
+    def _sequential(self, column, strings: pd.Series) -> bool:
+        if not self.profile.is_numeric or not np.isfinite(self.numeric_min):
+            return False
+        if not column.table.truncated:
+            return is_sequential(pd.to_numeric(strings.index.to_series(), errors="coerce"))
+        # Without the full value set: 1..N with no gaps has exactly max - min + 1 distinct values
+        span = self.numeric_max - self.numeric_min + 1
+        return bool(span > 1 and abs(column.table.distinct_count() - span) <= span * column.table.distinct.relative_error * 3)
+
+
+class DateAccumulator:
+    """
+    Streaming form of analyzers.date_analysis. The format is inferred from
+    the first chunk with dates and reused for the following ones; a column
+    of times of day keeps them as offsets from 1970-01-01.
+    """
+
+    def __init__(self, capacity: int):
+        self.values = FrequencyTable(capacity)
+        self.years = FrequencyTable(capacity)
+        self.months = FrequencyTable(12)
+        self.weekdays = FrequencyTable(7)
+        # Timestamps as float ns, for the median once the value table is truncated
+        self.stamps = KLLSketch()
+        self.count = 0
+        self.min = None
+        self.max = None
+        self.date_format = None
+        self.time_of_day = False
+        self.tz = None
+
+    def update(self, series: pd.Series) -> None:
+        parsed = parse_dates(series, self.date_format)
+        stamps = parsed.stamps
+        if len(stamps) == 0:
+            return
+        if self.count == 0:
+            self.date_format, self.time_of_day, self.tz = parsed.date_format, parsed.time_of_day, parsed.tz
+        if self.time_of_day:
+            stamps = stamps % DAY_NS
+        self.count += len(stamps)
+        self.stamps.add(stamps)
+        self.min = _fold(min, self.min, pd.Timestamp(int(stamps.min())))
+        self.max = _fold(max, self.max, pd.Timestamp(int(stamps.max())))
+        values, counts = runs(np.sort(stamps))
+        self.values.add_counts(pd.Series(counts, index=pd.DatetimeIndex(values.view("datetime64[ns]"))))
+        if not self.time_of_day:
+            day_of_value = values // DAY_NS
+            starts = np.flatnonzero(np.diff(day_of_value, prepend=day_of_value[0] - 1))
+            calendar = calendar_counts(day_of_value[starts], np.add.reduceat(counts, starts))
+            self.years.add_counts(calendar["year"])
+            self.months.add_counts(calendar["month"])
+            self.weekdays.add_counts(calendar["weekday"])
+
+    def merge(self, other: "DateAccumulator") -> None:
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.date_format, self.time_of_day, self.tz = other.date_format, other.time_of_day, other.tz
+        self.count += other.count
+        self.min = _fold(min, self.min, other.min)
+        self.max = _fold(max, self.max, other.max)
+        self.values.merge(other.values)
+        self.stamps.merge(other.stamps)
+        self.years.merge(other.years)
+        self.months.merge(other.months)
+        self.weekdays.merge(other.weekdays)
+
+    def result(self, column) -> dict:
+        if self.count == 0:
+            return {}
+
+        table = self.values.observed()
+        if self.time_of_day:
+            return _with_error_bounds(
+                time_of_day_analysis(*self._sorted(table)),
+                {"most_common_time": {"max_count_overestimate": self.values.floor}} if self.values.truncated else None,
+            )
+        most_common, _ = _mode(table)
+        gaps = self._gaps(table)
+
+        return _with_error_bounds({
+            "min_date": localize(self.min, self.tz),
+            "max_date": localize(self.max, self.tz),
+            "range_days": (self.max - self.min).days,
+            "median_date": localize(self._median(table), self.tz),
+            "most_common_date": localize(most_common, self.tz),
+            "counts_by_year": _sorted_desc(self.years.observed()),
+            "counts_by_month": _sorted_desc(self.months.observed()),
+            "counts_by_weekday": _sorted_desc(self.weekdays.observed()),
+            **gaps,
+        }, self._error_bounds())
+
+    def _error_bounds(self):
+        if not self.values.truncated:
+            return None
+        epsilon = self.stamps.rank_error
+        return {
+            "median_date": {
+                "rank_error": epsilon,
+                "range": [_stamp(self.stamps.quantile(0.5 - epsilon)), _stamp(self.stamps.quantile(0.5 + epsilon))],
+            },
+            "most_common_date": {"max_count_overestimate": self.values.floor},
+        }
+
+    def _sorted(self, table: pd.Series):
+        stamps = table.index.to_numpy(dtype="datetime64[ns]").view(np.int64)
+        order = np.argsort(stamps)
+        return stamps[order], table.to_numpy()[order]
+
+    def _median(self, table: pd.Series):
+        if self.values.truncated:
+            return _stamp(self.stamps.quantile(0.5))
+        stamps, counts = self._sorted(table)
+        return pd.Timestamp(int(weighted_quantile(stamps, counts, 0.5)))
+
+    def _gaps(self, table: pd.Series) -> dict:
+        gaps = {"average_gap_days": None, "min_gap_days": None, "max_gap_days": None, "std_gap_days": None}
+        if self.count < 2:
+            return gaps
+        # Sorted consecutive differences: (max - min) / (n - 1) on average, whatever the order
+        gaps["average_gap_days"] = pd.Timedelta((self.max - self.min).value / (self.count - 1)).days
+        if self.values.truncated:
+            return gaps
+
+        stamps, counts = self._sorted(table)
+        steps = np.diff(stamps).astype(np.float64)
+        repeats = int((counts - 1).sum())  # equal neighbours contribute zero-length gaps
+        all_gaps = np.concatenate([steps, np.zeros(min(repeats, 1))])
+        gaps["min_gap_days"] = pd.Timedelta(all_gaps.min()).days if len(all_gaps) else None
+        gaps["max_gap_days"] = pd.Timedelta(all_gaps.max()).days if len(all_gaps) else None
+
+        n = self.count - 1
+        mean = steps.sum() / n
+        variance = (((steps - mean) ** 2).sum() + repeats * mean ** 2) / (n - 1) if n > 1 else np.nan
+        gaps["std_gap_days"] = pd.Timedelta(np.sqrt(variance)).days if n > 1 else None
+        return gaps
+
+
+def _stamp(value: float) -> pd.Timestamp:
+    return pd.Timestamp(int(value))
+
+
+def _with_error_bounds(result: dict, bounds) -> dict:
+    """Attach approximate-statistics error bounds to an analyzer result, if there are any."""
+    if bounds:
+        result["approximate"] = True
+        result["error_bounds"] = bounds
+    return result
+
+
+def _numeric_error_bounds(values: NumericDistribution):
+    bounds = values.error_bounds(QUARTILES)
+    if bounds is not None:
+        range_error = bounds.pop("range_counts")
+        bounds["outlier_count"] = range_error
+    return bounds
+
+
+def _table_error_bounds(table: FrequencyTable, unique_key: str, *others: FrequencyTable):
+    """Distinct-count error, plus a note when derived tables (e.g. lengths) were truncated."""
+    bounds = {}
+    if table.truncated:
+        bounds[unique_key] = table.distinct_error()
+        bounds["most_common_count"] = {"max_overestimate": table.floor}
+    if any(other.truncated for other in others):
+        bounds["length_statistics"] = {"max_count_overestimate": max(other.floor for other in others)}
+    return bounds or None
+
+
+def _fold(fn, current, value):
+    return value if current is None else fn(current, value)
+
+
+SEMANTIC_ACCUMULATORS = {
+    "date": DateAccumulator,
+    "currency": CurrencyAccumulator,
+    "boolean": BooleanAccumulator,
+    "numeric": NumericAccumulator,
+    "string": StringAccumulator,
+    "id": IdAccumulator,
+}
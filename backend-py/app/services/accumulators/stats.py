@@ -0,0 +1,333 @@
+import numpy as np
+import pandas as pd
+from typing import Optional
+
+from ..profiler import profile_from_counts
+from ..sketches import HyperLogLog, KLLSketch
+
+
+class FrequencyTable:
+    """
+    Mergeable value -> count table, kept in order of first appearance.
+
+    Exact while it holds at most `capacity` distinct values. Past that it is
+    a Space-Saving summary: only the `capacity` most frequent values are
+    retained, a value arriving while the table is full is credited with the
+    current `floor` (so retained counts overestimate by at most `floor`, and
+    any value not retained occurred at most `floor` times), and distinct
+    counts come from a HyperLogLog sketch instead.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: Optional[pd.Series] = None
+        self.total = 0
+        self.missing = 0
+        self.truncated = False
+        self.floor = 0
+        self.distinct = HyperLogLog()
+
+    def update(self, series: pd.Series) -> None:
+        self.add_counts(series.value_counts(dropna=False, sort=False))
+
+    def add_counts(self, counts: pd.Series) -> None:
+        """Add exact counts of a batch of values."""
+        if counts.empty:
+            return
+        self.total += int(counts.sum())
+        self.missing += int(counts[counts.index.isna()].sum())
+        self.distinct.add(counts.index.to_numpy())
+        self._combine(counts, 0)
+
+    def merge(self, other: "FrequencyTable") -> None:
+        if other.counts is not None:
+            self._combine(other.counts, other.floor)
+        self.total += other.total
+        self.missing += other.missing
+        self.distinct.merge(other.distinct)
+        self.truncated = self.truncated or other.truncated
+
+    def _combine(self, counts: pd.Series, other_floor: int) -> None:
+        if self.counts is None:
+            self.counts, self.floor = counts.astype(np.int64), other_floor
+        else:
+            combined = pd.concat([self.counts, counts]).groupby(level=0, sort=False, dropna=False).sum()
+            if self.floor or other_floor:
+                # Space-Saving merge: a value missing from one side may have occurred up to that side's floor times
+                combined = combined + np.where(combined.index.isin(self.counts.index), 0, self.floor) \
+                    + np.where(combined.index.isin(counts.index), 0, other_floor)
+            self.counts = combined.astype(np.int64)
+            self.floor += other_floor
+        self.counts = self._cap(self.counts)
+
+    def _cap(self, counts: pd.Series) -> pd.Series:
+        if len(counts) <= self.capacity:
+            return counts
+        self.truncated = True
+        order = np.argsort(-counts.to_numpy(), kind="stable")
+        self.floor = max(self.floor, int(counts.iloc[order[self.capacity]]))
+        keep = np.sort(order[: self.capacity])
+        return counts.iloc[keep]
+
+    def distinct_count(self, dropna: bool = True) -> int:
+        """Exact number of distinct values, or the sketch estimate once truncated."""
+        if self.counts is None:
+            return 0
+        if not self.truncated:
+            index = self.counts.index
+            return int(np.count_nonzero(~index.isna())) if dropna else len(index)
+        # Can't have more distinct values than rows seen
+        estimate = min(int(round(self.distinct.estimate())), self.total)
+        return max(estimate - int(dropna and self.missing > 0), 0)
+
+    def profile(self, total_rows: int, top_k: Optional[int] = None) -> dict:
+        """duplicate_analysis entry for the column (see profiler.profile_column)."""
+        if self.counts is None:
+            return profile_from_counts(pd.Index([]), np.zeros(0, dtype=np.int64), total_rows, top_k)
+        profile = profile_from_counts(self.counts.index, self.counts.to_numpy(), total_rows, top_k)
+        if self.truncated:
+            # Values dropped from the table belong in the "other" bucket too
+            listed = profile["value_distribution"]
+            profile["value_distribution_other"] = {
+                "distinct_values": max(self.distinct_count(dropna=False) - len(listed), 0),
+                "count": max(total_rows - int(sum(listed.values())), 0),
+            }
+            distinct = self.distinct_count(dropna=False)
+            profile["duplicate_count"] = total_rows - distinct
+            profile["duplicate_percentage"] = (total_rows - distinct) / total_rows * 100 if total_rows else 0
+            profile["unique_count"] = self.distinct_count()
+            profile["missing_values"] = self.missing
+            profile["approximate"] = True
+            profile["error_bounds"] = self.error_bounds()
+        return profile
+
+    def distinct_error(self) -> Optional[dict]:
+        """Error of distinct_count(): HyperLogLog relative standard error and a 95% +/- bound."""
+        if not self.truncated:
+            return None
+        error = self.distinct.relative_error
+        return {"relative_standard_error": error, "error_95": int(np.ceil(2 * error * self.distinct_count(dropna=False)))}
+
+    def error_bounds(self) -> Optional[dict]:
+        """Error bounds for the profile() fields that are estimates once the table is truncated."""
+        if not self.truncated:
+            return None
+        distinct = self.distinct_error()
+        return {
+            "unique_count": distinct,
+            "duplicate_count": {"error_95": distinct["error_95"]},
+            "most_common_count": {"max_overestimate": self.floor},
+            # Listed counts are high by at most `floor`; unlisted values occurred at most `floor` times
+            "value_distribution": {"max_overestimate": self.floor, "max_unlisted_count": self.floor},
+        }
+
+    def observed(self) -> pd.Series:
+        """Counts of the non-null values."""
+        if self.counts is None:
+            return pd.Series(dtype=np.int64)
+        return self.counts[~self.counts.index.isna()]
+
+
+class Moments:
+    """
+    Count, mean and central moments up to the 4th, mergeable across chunks
+    (Pébay's pairwise update, the batch form of Welford's algorithm).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.total = 0.0
+        self.min = np.nan
+        self.max = np.nan
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+        other = Moments()
+        other.count = len(values)
+        other.mean = float(values.mean())
+        deltas = values - other.mean
+        squares = deltas * deltas
+        other.m2 = float(squares.sum())
+        other.m3 = float((squares * deltas).sum())
+        other.m4 = float((squares * squares).sum())
+        other.total = float(values.sum())
+        other.min = float(values.min())
+        other.max = float(values.max())
+        self.merge(other)
+
+    def merge(self, other: "Moments") -> None:
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.__dict__.update(other.__dict__)
+            return
+        na, nb = self.count, other.count
+        n = na + nb
+        delta = other.mean - self.mean
+        delta2 = delta * delta
+
+        m2 = self.m2 + other.m2 + delta2 * na * nb / n
+        m3 = (self.m3 + other.m3
+              + delta * delta2 * na * nb * (na - nb) / n ** 2
+              + 3 * delta * (na * other.m2 - nb * self.m2) / n)
+        m4 = (self.m4 + other.m4
+              + delta2 * delta2 * na * nb * (na * na - na * nb + nb * nb) / n ** 3
+              + 6 * delta2 * (na * na * other.m2 + nb * nb * self.m2) / n ** 2
+              + 4 * delta * (na * other.m3 - nb * self.m3) / n)
+
+        self.count = n
+        self.mean = self.mean + delta * nb / n
+        self.m2, self.m3, self.m4 = m2, m3, m4
+        self.total += other.total
+        self.min = float(np.fmin(self.min, other.min))
+        self.max = float(np.fmax(self.max, other.max))
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.variance))
+
+    @property
+    def skewness(self) -> float:
+        """Bias-corrected sample skewness, as Series.skew()."""
+        n = self.count
+        if n < 3:
+            return np.nan
+        if self.m2 == 0:
+            return 0.0
+        return (n * (n - 1) ** 0.5 / (n - 2)) * (self.m3 / self.m2 ** 1.5)
+
+    @property
+    def kurtosis(self) -> float:
+        """Bias-corrected excess kurtosis, as Series.kurtosis()."""
+        n = self.count
+        if n < 4:
+            return np.nan
+        if self.m2 == 0:
+            return 0.0
+        numerator = n * (n + 1) * (n - 1) * self.m4
+        denominator = (n - 2) * (n - 3) * self.m2 ** 2
+        return numerator / denominator - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+
+
+class NumericDistribution:
+    """
+    Moments plus enough of the value distribution to answer quantile,
+    distinct and range-count questions: an exact value table while it fits,
+    a KLL quantile sketch once it has been truncated.
+
+    Pass `table` to share a value table the caller already maintains; it is
+    then read but not updated here.
+    """
+
+    def __init__(self, capacity: int, table: Optional[FrequencyTable] = None):
+        self.moments = Moments()
+        self.owns_table = table is None
+        self.table = FrequencyTable(capacity) if table is None else table
+        self.sketch = KLLSketch()
+        self.zero_count = 0
+        self.positive_count = 0
+        self.negative_count = 0
+
+    def update(self, values: pd.Series) -> None:
+        """Add a chunk of non-null numeric values."""
+        array = values.to_numpy(dtype=np.float64)
+        self.moments.update(array)
+        if self.owns_table:
+            self.table.update(values)
+        self.sketch.add(array)
+        self.zero_count += int((array == 0).sum())
+        self.positive_count += int((array > 0).sum())
+        self.negative_count += int((array < 0).sum())
+
+    def merge(self, other: "NumericDistribution") -> None:
+        self.moments.merge(other.moments)
+        if self.owns_table:
+            self.table.merge(other.table)
+        self.sketch.merge(other.sketch)
+        self.zero_count += other.zero_count
+        self.positive_count += other.positive_count
+        self.negative_count += other.negative_count
+
+    @property
+    def exact(self) -> bool:
+        return not self.table.truncated
+
+    def _sorted_table(self):
+        table = self.table.observed()
+        values = table.index.to_numpy(dtype=np.float64)
+        order = np.argsort(values, kind="stable")
+        return values[order], table.to_numpy()[order]
+
+    def quantile(self, q: float) -> float:
+        """Linear-interpolated quantile, matching Series.quantile()."""
+        if self.moments.count == 0:
+            return np.nan
+        if not self.exact:
+            return self.sketch.quantile(q)
+        values, counts = self._sorted_table()
+        return weighted_quantile(values, counts, q)
+
+    def quantile_error(self, q: float) -> Optional[dict]:
+        """Error bound of quantile(q): the rank error and the values at q -/+ that error."""
+        if self.exact or self.moments.count == 0:
+            return None
+        epsilon = self.sketch.rank_error
+        return {
+            "rank_error": epsilon,
+            "range": [self.sketch.quantile(max(q - epsilon, 0)), self.sketch.quantile(min(q + epsilon, 1))],
+        }
+
+    def error_bounds(self, quantiles: dict) -> Optional[dict]:
+        """
+        Error bounds for the named quantiles (e.g. {"median": 0.5}), the
+        distinct count and range counts; None while the statistics are exact.
+        """
+        if self.exact or self.moments.count == 0:
+            return None
+        bounds = {name: self.quantile_error(q) for name, q in quantiles.items()}
+        bounds["unique_values"] = self.table.distinct_error()
+        bounds["range_counts"] = {"error_95": int(np.ceil(2 * self.sketch.rank_error * self.sketch.count))}
+        return bounds
+
+    def count_outside(self, lower: float, upper: float) -> int:
+        """Number of values strictly below `lower` or above `upper`."""
+        if self.exact:
+            values, counts = self._sorted_table()
+            return int(counts[(values < lower) | (values > upper)].sum())
+        return self.sketch.rank(lower) + self.sketch.count - self.sketch.rank(upper, inclusive=True)
+
+    def values_outside(self, lower: float, upper: float, limit: int = 5) -> list:
+        """A few values outside [lower, upper], in order of first appearance."""
+        table = self.table.observed()
+        values = table.index.to_numpy(dtype=np.float64)
+        return values[(values < lower) | (values > upper)][:limit].tolist()
+
+    def unique_count(self) -> int:
+        return self.table.distinct_count()
+
+
+def weighted_quantile(values: np.ndarray, counts: np.ndarray, q: float) -> float:
+    """
+    Quantile with linear interpolation over sorted `values` repeated `counts`
+    times, without materializing the repetition.
+    """
+    total = int(counts.sum())
+    if total == 0:
+        return np.nan
+    cumulative = np.cumsum(counts)
+    position = (total - 1) * q
+    lower = int(np.floor(position))
+    upper = int(np.ceil(position))
+    lower_value = values[np.searchsorted(cumulative, lower, side="right")]
+    upper_value = values[np.searchsorted(cumulative, upper, side="right")]
+    return float(lower_value + (position - lower) * (upper_value - lower_value))
@@ -1,10 +1,20 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
-from typing import Dict, Any, Optional
+from functools import partial
+from typing import Callable, Dict, Any, Optional, Sequence, Tuple, Union
+import logging
 import uuid
 
+from ..config import settings
+from .column_context import ColumnContext
 from .field_detector import infer_column_semantic_type
+from .profiler import profile_from_counts
+from .executor import map_columns
+from .grouping import group_columns, group_label, group_summary, largest_groups
+from .instrumentation import AnalysisProfile, StepTimer
+from .row_duplicates import duplicate_rows, duplicated_mask, row_fingerprints
+from .value_store import distinct_values, ColumnValues
 from .analyzers import (
     date_analysis,
     analyze_currency,
@@ -14,149 +24,256 @@ from .analyzers import (
     analyze_id
 )
 
+logger = logging.getLogger(__name__)
 
-def analyze_dataframe(df: pd.DataFrame, group_by_column: Optional[str] = None) -> Dict[str, Any]:
+# Bump whenever analyzer output changes, so cached results are not reused
+ANALYZER_VERSION = "7"
+# Per numeric column and group, in this order
+GROUP_STATS = ["mean", "count", "min", "max"]
+
+
+def analyze_dataframe(
+    df: pd.DataFrame,
+    group_by_column: Optional[Union[str, Sequence[str]]] = None,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    top_k: Optional[int] = None,
+    analysis_id: Optional[str] = None,
+    profile: Optional[AnalysisProfile] = None,
+    max_groups: Optional[int] = None,
+    duplicate_subset: Optional[Sequence[str]] = None,
+    duplicate_normalize: str = "none",
+) -> Dict[str, Any]:
     """
     Comprehensive analysis of DataFrame for duplicates, data quality, and semantic insights.
+
+    Columns are analyzed on the column process pool when `workers`
+    (settings.analysis_workers by default) is greater than 1.
+    `progress(columns_done, columns_total)` is called as columns finish.
+    Value listings are cut to the `top_k` most frequent values
+    (settings.distribution_top_k by default, 0 for all); the full distinct
+    values are kept in the value store under the analysis_id.
+    `group_by_column` may name several columns; group_analysis lists at
+    most `max_groups` groups. row_duplicates clusters rows equal on the
+    `duplicate_subset` columns (all by default), optionally normalized (see
+    row_duplicates.NORMALIZATIONS).
+
+    Values are left as numpy / pandas scalars; encode the result with
+    utils.json_encoding.dumps. Stage and per-column timings go to `profile`
+    (and /metrics).
     """
+    top_k = settings.distribution_top_k if top_k is None else top_k
+    profile = profile or AnalysisProfile()
+    analyze_column = partial(_analyze_column, top_k=top_k, keep_values=distinct_values.enabled)
+    # Index first, then one entry per column
+    memory_usage = df.memory_usage(deep=True)
 
     results = {
-        "analysis_id": str(uuid.uuid4()),
+        "analysis_id": analysis_id or str(uuid.uuid4()),
         "analysis_timestamp": datetime.utcnow().isoformat(),
         "metadata": {
             "total_rows": len(df),
             "total_columns": len(df.columns),
             "columns": list(df.columns),
             "data_types": {col: str(df[col].dtype) for col in df.columns},
-            "memory_usage": f"{df.memory_usage(deep=True).sum() / 1024 / 1024:.2f} MB",
+            "memory_usage": f"{memory_usage.sum() / 1024 / 1024:.2f} MB",
         },
         "duplicate_analysis": {},
         "numerical_analysis": {},
-        "data_quality": {
-            "complete_duplicates_count": df.duplicated().sum(),
-            "total_missing_values": int(df.isnull().sum().sum()),
-            "missing_values_by_column": df.isnull().sum().to_dict(),
-        },
+        "data_quality": {},
         "columns": [],
     }
+    with profile.stage("row_duplicates", rows=len(df)):
+        fingerprints = row_fingerprints(df)
+        duplicated = pd.Series(duplicated_mask(fingerprints), index=df.index)
+        results["data_quality"]["complete_duplicates_count"] = int(duplicated.sum())
+        # The full-row fingerprints serve row_duplicates too unless it compares other keys
+        full_rows = not duplicate_subset and duplicate_normalize == "none"
+        results["row_duplicates"] = duplicate_rows(
+            df, duplicate_subset, duplicate_normalize, fingerprints if full_rows else None
+        )
 
-    for column in df.columns:
-        col_series = df[column]
-        semantic_type = infer_column_semantic_type(col_series)
-
-        # Duplicate + frequency profile
-        results["duplicate_analysis"][column] = {
-            "duplicate_count": df.duplicated(subset=[column]).sum(),
-            "unique_count": col_series.nunique(),
-            "duplicate_percentage": (df.duplicated(subset=[column]).sum() / len(df)) * 100 if len(df) else 0,
-            "most_common_value": _get_most_common_value(col_series),
-            "most_common_count": _get_most_common_count(col_series),
-            "unique_values": col_series.dropna().unique().tolist(),
-            "value_distribution": col_series.value_counts(dropna=False).to_dict(),
-            "missing_values": int(col_series.isnull().sum()),
-        }
-
-        # Run semantic-specific analyzers
-        analyzers = {
-            "date": date_analysis,
-            "currency": analyze_currency,
-            "boolean": analyze_boolean,
-            "numeric": analyze_numeric,
-            "string": analyze_string,
-            "id": analyze_id,
-        }
-        print(f"Analyzing column {column} with semantic type {semantic_type}")
-
-
-        if semantic_type in analyzers:
-            analysis = analyzers[semantic_type](col_series)
+    column_values = {}
+    with profile.stage("columns", rows=len(df), nbytes=int(memory_usage.iloc[1:].sum())):
+        column_results = map_columns(analyze_column, df, workers, progress)
+    for position, (column, column_result) in enumerate(zip(df.columns, column_results)):
+        profile.add_column(
+            str(column),
+            column_result["semantic_type"],
+            rows=len(df),
+            nbytes=int(memory_usage.iloc[position + 1]),
+            timings=column_result["timings"],
+            peak_bytes=column_result["peak_bytes"],
+        )
+        results["duplicate_analysis"][column] = column_result["profile"]
+        if column_result["values"] is not None:
+            column_values[column] = ColumnValues(*column_result["values"])
+        if column_result["analysis"] is not None:
             results["columns"].append(
-                {"name": column, "type": semantic_type, "analysis": analysis}
+                {"name": column, "type": column_result["semantic_type"], "analysis": column_result["analysis"]}
             )
+        if column_result["numeric_summary"] is not None:
+            results["numerical_analysis"][column] = column_result["numeric_summary"]
 
-        # Generic numeric analysis (for true numeric dtype)
-        if pd.api.types.is_numeric_dtype(col_series):
-            results["numerical_analysis"][column] = _summarize_numeric(col_series)
+    missing_by_column = {
+        column: profile["missing_values"] for column, profile in results["duplicate_analysis"].items()
+    }
+    results["data_quality"]["total_missing_values"] = sum(missing_by_column.values())
+    results["data_quality"]["missing_values_by_column"] = missing_by_column
 
     # Optional group-by analysis
-    if group_by_column and group_by_column in df.columns:
-        results["group_analysis"] = _perform_group_analysis(df, group_by_column)
+    group_by = group_columns(group_by_column)
+    if group_by and all(column in df.columns for column in group_by):
+        with profile.stage("group_analysis", rows=len(df)):
+            results["group_analysis"], results["group_analysis_summary"] = _perform_group_analysis(
+                df, group_by, max_groups, duplicated
+            )
+
+    if column_values:
+        distinct_values.put(results["analysis_id"], column_values)
+
+    return results
+
+
+ANALYZERS = {
+    "date": date_analysis,
+    "currency": analyze_currency,
+    "boolean": analyze_boolean,
+    "numeric": analyze_numeric,
+    "string": analyze_string,
+    "id": analyze_id,
+}
+
+
+def _analyze_column(col_series: pd.Series, top_k: Optional[int] = None, keep_values: bool = False) -> Dict[str, Any]:
+    """
+    Everything analyze_dataframe reports about a single column, with the
+    wall time of each step (and the peak traced allocation when tracemalloc
+    is running in this process). All steps share one ColumnContext, so the
+    column is filtered, factorized, coerced and sorted once.
+    """
+    timer = StepTimer()
+    context = ColumnContext(col_series)
+    with timer.step("type_inference"):
+        semantic_type = infer_column_semantic_type(col_series, context=context)
+    logger.debug("Analyzing column %s with semantic type %s", col_series.name, semantic_type)
 
-    return _make_serializable(results)
+    # Run semantic-specific analyzers
+    analysis = None
+    if semantic_type in ANALYZERS:
+        with timer.step(f"analyzer.{semantic_type}"):
+            analysis = ANALYZERS[semantic_type](col_series, context)
 
+    # Duplicate + frequency profile (one factorization per column)
+    with timer.step("value_profile"):
+        uniques, counts = context.value_counts
+        value_profile = profile_from_counts(uniques, counts, len(col_series), top_k)
 
-def _summarize_numeric(series: pd.Series) -> Dict[str, Any]:
-    """Basic stats for numeric columns."""
+    # Generic numeric analysis (for true numeric dtype)
+    numeric_summary = None
+    if pd.api.types.is_numeric_dtype(col_series):
+        with timer.step("numeric_summary"):
+            numeric_summary = _summarize_numeric(col_series, context)
+
+    return {
+        "profile": value_profile,
+        "values": (uniques, counts) if keep_values else None,
+        "semantic_type": semantic_type,
+        "analysis": analysis,
+        "numeric_summary": numeric_summary,
+        "timings": timer.seconds,
+        "peak_bytes": timer.peak_bytes(),
+    }
+
+
+def _summarize_numeric(series: pd.Series, context: Optional[ColumnContext] = None) -> Dict[str, Any]:
+    """Basic stats for numeric columns; order statistics from the context's sorted values."""
     def _safe(val):
         return None if pd.isna(val) or np.isinf(val) else float(val)
 
+    context = context or ColumnContext(series)
+    values = context.sorted_numbers
+    empty = len(values) == 0
+    q1, q3 = context.quantiles([0.25, 0.75]) if not empty else (np.nan, np.nan)
+    zero_values = len(values) - context.count_below(0) - context.count_above(0)
     return {
         "mean": _safe(series.mean()),
-        "median": _safe(series.median()),
-        "min": _safe(series.min()),
-        "max": _safe(series.max()),
+        "median": _safe(context.median() if not empty else np.nan),
+        "min": _safe(values[0] if not empty else np.nan),
+        "max": _safe(values[-1] if not empty else np.nan),
         "std": _safe(series.std()),
-        "q1": _safe(series.quantile(0.25)),
-        "q3": _safe(series.quantile(0.75)),
-        "missing_values": int(series.isnull().sum()),
-        "zero_values": int((series == 0).sum()) if series.dtype != "bool" else 0,
+        "q1": _safe(q1),
+        "q3": _safe(q3),
+        "missing_values": context.missing_count,
+        "zero_values": zero_values if series.dtype != "bool" else 0,
     }
 
 
-def _get_most_common_value(series: pd.Series) -> Any:
-    mode = series.mode()
-    return mode.iloc[0] if not mode.empty else None
+def _perform_group_analysis(
+    df: pd.DataFrame,
+    group_by: Union[str, Sequence[str]],
+    max_groups: Optional[int] = None,
+    duplicated: Optional[pd.Series] = None,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Per-group row count, missing cells, duplicate rows (`duplicated`, the
+    df.duplicated() mask, if already computed) and mean/count/min/max of
+    every numeric column, from one groupby over the whole frame. Numeric
+    keys are binned into quartiles (or five equal-width bins); boolean keys
+    are not numeric here and group by value (False / True). Only the
+    `max_groups` largest groups are listed (settings.group_analysis_max_groups
+    by default, 0 for all); the summary gives the total.
+    """
+    columns = group_columns(group_by)
+    max_groups = settings.group_analysis_max_groups if max_groups is None else max_groups
+    group_results = {}
+    try:
+        keys = [_group_key(df[column]) for column in columns]
+        # A single key lists every bin / category, empty ones included
+        observed = len(keys) > 1
+        numeric = [
+            column for column, dtype in df.dtypes.items()
+            if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype) and column not in columns
+        ]
+        grouped = df.groupby(keys, observed=observed)
+        sizes = grouped.size()
+        counts = pd.DataFrame({
+            "missing_values": df.isna().sum(axis=1),
+            "duplicate_rows": df.duplicated() if duplicated is None else duplicated,
+        }).groupby(keys, observed=observed).sum().reindex(sizes.index, fill_value=0)
+        stats = grouped[numeric].agg(GROUP_STATS) if numeric else None
 
+        positions = largest_groups(sizes, max_groups)
+        summary = group_summary(columns, len(sizes), len(positions))
+        sizes, counts = sizes.iloc[positions], counts.iloc[positions]
+        # groups x (numeric columns x GROUP_STATS)
+        values = stats.iloc[positions].to_numpy(dtype=np.float64, na_value=np.nan) if stats is not None else None
 
-def _get_most_common_count(series: pd.Series) -> int:
-    value_counts = series.value_counts()
-    return int(value_counts.iloc[0]) if not value_counts.empty else 0
+        for i, (key, row_count, (missing, duplicates)) in enumerate(
+            zip(sizes.index, sizes.tolist(), counts.itertuples(index=False))
+        ):
+            numerical_stats = {}
+            for j, column in enumerate(numeric):
+                mean, count, minimum, maximum = values[i, 4 * j:4 * j + 4].tolist()
+                numerical_stats[column] = {"mean": mean, "count": int(count), "min": minimum, "max": maximum}
+            group_results[group_label(key)] = {
+                "row_count": row_count,
+                "missing_values": int(missing),
+                "duplicate_rows": int(duplicates),
+                "numerical_stats": numerical_stats,
+            }
+    except Exception as e:
+        return {"error": f"Group analysis failed: {e}"}, group_summary(columns, 0, 0)
+    return group_results, summary
 
 
-def _perform_group_analysis(df: pd.DataFrame, group_column: str) -> Dict[str, Any]:
-    """Perform group-wise analysis with stats per group."""
-    group_results = {}
+def _group_key(column: pd.Series) -> pd.Series:
+    """Grouping key for one column: numeric columns are binned, without copying the frame."""
+    # Binning a boolean column gave one (-0.001, 1.0] group holding every row
+    if not pd.api.types.is_numeric_dtype(column) or pd.api.types.is_bool_dtype(column):
+        return column
     try:
-        if pd.api.types.is_numeric_dtype(df[group_column]):
-            df_grouped = df.copy()
-            try:
-                df_grouped["group_bin"] = pd.qcut(df_grouped[group_column], q=4, duplicates="drop")
-            except Exception:
-                df_grouped["group_bin"] = pd.cut(df_grouped[group_column], bins=5)
-            groups = df_grouped.groupby("group_bin")
-        else:
-            groups = df.groupby(group_column)
-
-        for group_name, group_data in groups:
-            stats = {}
-            for num_col in group_data.select_dtypes(include=[np.number]).columns.drop(group_column, errors="ignore"):
-                stats[num_col] = {
-                    "mean": float(group_data[num_col].mean()),
-                    "count": int(group_data[num_col].count()),
-                    "min": float(group_data[num_col].min()),
-                    "max": float(group_data[num_col].max()),
-                }
-            group_results[str(group_name)] = {
-                "row_count": len(group_data),
-                "numerical_stats": stats,
-            }
-    except Exception as e:
-        group_results["error"] = f"Group analysis failed: {e}"
-    return group_results
-
-
-def _make_serializable(obj):
-    """Convert numpy/pandas types to JSON serializable."""
-    if isinstance(obj, (np.integer,)):
-        return int(obj)
-    if isinstance(obj, (np.floating,)):
-        return None if pd.isna(obj) or np.isinf(obj) else float(obj)
-    if isinstance(obj, (pd.Timestamp,)):
-        return obj.isoformat()
-    if isinstance(obj, (pd.Interval,)):
-        return str(obj)
-    if isinstance(obj, (np.ndarray, list, tuple)):
-        return [_make_serializable(x) for x in obj]
-    if isinstance(obj, dict):
-        return {k: _make_serializable(v) for k, v in obj.items()}
-    return obj
\ No newline at end of file
+        return pd.qcut(column, q=4, duplicates="drop")
+    except Exception:
+        return pd.cut(column, bins=5)
+
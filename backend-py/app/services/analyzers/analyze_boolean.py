@@ -1,24 +1,36 @@
+from typing import Optional
+
 import pandas as pd
 
+from ..column_context import ColumnContext
+from ..profiler import frequency_order
 
-def analyze_boolean(series: pd.Series) -> dict:
-    series = series.dropna()
-    if series.empty:
-        return {}
+BOOLEAN_VALUES = {"true": True, "false": False, "1": True, "0": False, "yes": True, "no": False}
 
-    # Normalize to True/False
-    if series.dtype != "bool":
-        series = series.astype(str).str.lower().map(
-            {"true": True, "false": False, "1": True, "0": False, "yes": True, "no": False})
 
-    value_counts = series.value_counts(dropna=False).to_dict()
+def analyze_boolean(series: pd.Series, context: Optional[ColumnContext] = None) -> dict:
+    context = context or ColumnContext(series)
+    if context.non_null.empty:
+        return {}
+
+    # Normalize each distinct value to True/False (NaN if unrecognized), then add up their counts
+    if context.non_null.dtype == "bool":
+        keys, counts = context.observed_counts
+    else:
+        uniques, counts = context.string_counts
+        keys = uniques.str.lower().map(BOOLEAN_VALUES)
+    totals = pd.Series(counts, index=keys).groupby(level=0, sort=False, dropna=False).sum()
+    totals = totals.iloc[frequency_order(totals.to_numpy())]
 
+    count = len(context.non_null)
+    true_count = int(totals.get(True, 0))
+    false_count = int(totals.get(False, 0))
     return {
-        "count": int(len(series)),
-        "true_count": int((series == True).sum()),
-        "false_count": int((series == False).sum()),
-        "true_percentage": float((series == True).mean() * 100),
-        "false_percentage": float((series == False).mean() * 100),
-        "missing_values": int(series.isnull().sum()),
-        "distribution": {str(k): int(v) for k, v in value_counts.items()}
-    }
\ No newline at end of file
+        "count": int(count),
+        "true_count": true_count,
+        "false_count": false_count,
+        "true_percentage": float(true_count / count * 100),
+        "false_percentage": float(false_count / count * 100),
+        "missing_values": int(totals[totals.index.isna()].sum()),
+        "distribution": {str(k): int(v) for k, v in totals.items()}
+    }
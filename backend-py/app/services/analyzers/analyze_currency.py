@@ -1,20 +1,33 @@
-import re
+from typing import Optional
+
 import pandas as pd
 
+from ...utils.strings import is_arrow_string
+from ..column_context import ColumnContext
+
+
+def currency_symbols(strings: pd.Series) -> pd.Series:
+    """The first character of each value that is not part of a number (values without one dropped)."""
+    if is_arrow_string(strings):
+        # Arrow's regex extract builds a struct column; dropping the number characters stays in one string buffer
+        return strings.str.replace(r"[0-9\.\-\s]", "", regex=True).str[0].dropna()
+    return strings.str.extract(r"([^0-9\.\-\s])")[0].dropna()
+
 
-def analyze_currency(series: pd.Series) -> dict:
+def analyze_currency(series: pd.Series, context: Optional[ColumnContext] = None) -> dict:
     if series.empty:
         return {"error": "Empty series"}
+    context = context or ColumnContext(series)
 
     # Preserve original for symbol detection + examples
-    original = series.dropna().astype(str)
-    missing_values = int(series.isnull().sum())
+    original = context.strings
+    missing_values = context.missing_count
 
     if original.empty:
         return {"error": "No valid currency values"}
 
     # Detect the most common symbol (e.g., $, €, £)
-    symbols = original.str.extract(r"([^0-9\.\-\s])")[0].dropna()
+    symbols = currency_symbols(original)
     common_symbol = symbols.mode().iloc[0] if not symbols.empty else ""
 
     # Remove symbols, commas, spaces → keep only numeric parts
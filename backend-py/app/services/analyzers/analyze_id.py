@@ -1,71 +1,282 @@
-import re
-import pandas as pd
+import string
+from typing import Iterator, Optional, Tuple
+
 import numpy as np
-from collections import Counter
+import pandas as pd
 
+from ...utils.strings import arrow_strings, as_strings, ascii_mask, is_arrow_string, pa
+from ..column_context import ColumnContext
 
-def analyze_id(series: pd.Series) -> dict:
-    """Analyze ID-like column for patterns"""
-    series = series.dropna().astype(str)
-    if series.empty:
-        return {"error": "Empty series"}
+# Share of values that must match for uuid_like / hex_like
+PATTERN_SHARE = 0.9
+UUID_LENGTH = 36
+# Values checked before the full column in the pandas fallback
+SAMPLE_ROWS = 1_000
+# Values converted to a byte matrix at a time, so the extra memory is one block
+BLOCK_ROWS = 65_536
+# Longer values (free text rather than IDs) are checked with pandas string methods instead
+MAX_BYTE_WIDTH = 64
+
+# Character classes per byte; the zero padding of shorter values belongs to all of them
+DIGIT, ALPHA, ALNUM, HEX, UUID_CHAR = 1, 2, 4, 8, 16
+_CLASSES = np.zeros(256, dtype=np.uint8)
+_CLASSES[0] = 0xFF
+_CLASSES[np.frombuffer(string.digits.encode(), np.uint8)] |= DIGIT | ALNUM | HEX | UUID_CHAR
+_CLASSES[np.frombuffer(string.ascii_letters.encode(), np.uint8)] |= ALPHA | ALNUM
+_CLASSES[np.frombuffer(b"abcdefABCDEF", np.uint8)] |= HEX | UUID_CHAR
+_CLASSES[ord("-")] |= UUID_CHAR
+# Digit counts of integer IDs: 1 + the number of these each value reaches
+_POWERS_OF_TEN = 10 ** np.arange(19, dtype=np.int64)
+
+
+class IdProfile:
+    """
+    Mergeable summary of ID-like values: lengths, character classes (as
+    str.isnumeric / isalpha / isalnum would report them for all values),
+    common prefix and suffix, and UUID / hex pattern matches.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.length_total = 0
+        self.length_min: Optional[int] = None
+        self.length_max: Optional[int] = None
+        self.is_numeric = True
+        self.is_alpha = True
+        self.is_alnum = True
+        # None until a value has been seen
+        self.prefix: Optional[str] = None
+        self.suffix: Optional[str] = None
+        self.uuid_matches = 0
+        self.hex_matches = 0
+
+    def merge(self, other: "IdProfile") -> None:
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.__dict__.update(other.__dict__)
+            return
+        self.count += other.count
+        self.length_total += other.length_total
+        self.length_min = min(self.length_min, other.length_min)
+        self.length_max = max(self.length_max, other.length_max)
+        self.is_numeric = self.is_numeric and other.is_numeric
+        self.is_alpha = self.is_alpha and other.is_alpha
+        self.is_alnum = self.is_alnum and other.is_alnum
+        self.prefix = common_prefix(self.prefix, other.prefix)
+        self.suffix = common_prefix(self.suffix[::-1], other.suffix[::-1])[::-1]
+        self.uuid_matches += other.uuid_matches
+        self.hex_matches += other.hex_matches
+
+
+def common_prefix(first: str, second: str) -> str:
+    for i, c in enumerate(first):
+        if i >= len(second) or c != second[i]:
+            return first[:i]
+    return first
+
+
+def _digit_countable(values: pd.Series) -> bool:
+    """Integers whose decimal form can be profiled arithmetically (non-negative, at most 18 digits)."""
+    return (
+        pd.api.types.is_integer_dtype(values.dtype)
+        and values.min() >= 0
+        and values.max() < _POWERS_OF_TEN[-1]
+    )
+
+
+def id_profile(values: pd.Series) -> IdProfile:
+    """IdProfile of the non-null values of a column, as their str() forms."""
+    values = values.dropna()
+    profile = IdProfile()
+    if values.empty:
+        return profile
+    if _digit_countable(values):
+        return _integer_profile(values.to_numpy(dtype=np.int64))
 
-    lengths = series.str.len()
-    unique_count = series.nunique()
-    total_count = len(series)
+    strings = as_strings(values)
+    lengths = strings.str.len().to_numpy(dtype=np.int64)
+    if lengths.max() > MAX_BYTE_WIDTH:
+        return _text_profile(strings)
+    for start, matrix in _byte_blocks(strings, lengths):
+        if matrix is None:
+            # Non-ASCII: the rest of the column through pandas string methods
+            profile.merge(_text_profile(strings.iloc[start:]))
+            break
+        profile.merge(_bytes_profile(matrix, lengths[start:start + BLOCK_ROWS], profile))
+    return profile
 
-    # Character composition
-    is_numeric = series.str.isnumeric().all()
-    is_alpha = series.str.isalpha().all()
-    is_alnum = series.str.isalnum().all()
 
-    # Common prefix/suffix
-    def longest_common_prefix(strings):
-        if not strings:
-            return ""
-        s1, s2 = min(strings), max(strings)
-        for i, c in enumerate(s1):
-            if c != s2[i]:
-                return s1[:i]
-        return s1
+def _byte_blocks(strings: pd.Series, lengths: np.ndarray) -> Iterator[Tuple[int, Optional[np.ndarray]]]:
+    """
+    (first row, rows x bytes matrix) per block of BLOCK_ROWS values, each
+    value zero-padded to the block's longest; the matrix is None from the
+    first block holding a non-ASCII value. Arrow-backed strings are copied
+    straight out of the Arrow buffers.
+    """
+    if not is_arrow_string(strings):
+        values = strings.to_numpy(dtype=object)
+        for start in range(0, len(values), BLOCK_ROWS):
+            try:
+                block = values[start:start + BLOCK_ROWS]
+                yield start, np.array(block, dtype="S").view(np.uint8).reshape(len(block), -1)
+            except UnicodeEncodeError:
+                yield start, None
+                return
+        return
 
-    def longest_common_suffix(strings):
-        rev = [s[::-1] for s in strings]
-        return longest_common_prefix(rev)[::-1]
+    array = arrow_strings(strings)
+    offset_type = np.int64 if pa.types.is_large_string(array.type) else np.int32
+    offsets = np.frombuffer(array.buffers()[1], dtype=offset_type)[array.offset:array.offset + len(array) + 1]
+    data = np.frombuffer(array.buffers()[2], dtype=np.uint8) if array.buffers()[2] is not None else np.empty(0, np.uint8)
+    for start in range(0, len(array), BLOCK_ROWS):
+        stop = min(start + BLOCK_ROWS, len(array))
+        starts = offsets[start:stop]
+        block_lengths = lengths[start:stop]
+        if data[offsets[start]:offsets[stop]].max(initial=0) >= 0x80:
+            yield start, None
+            return
+        matrix = np.zeros((len(starts), max(int(block_lengths.max()), 1)), dtype=np.uint8)
+        for position in range(int(block_lengths.max())):
+            rows = block_lengths > position
+            matrix[rows, position] = data[starts[rows] + position]
+        yield start, matrix
 
-    prefix = longest_common_prefix(series.tolist())
-    suffix = longest_common_suffix(series.tolist())
 
-    # Detect UUID-like pattern
-    uuid_pattern = re.compile(r"^[0-9a-fA-F\-]{36}$")
-    uuid_like = series.apply(lambda x: bool(uuid_pattern.match(x))).mean() > 0.9
+def _bytes_profile(matrix: np.ndarray, lengths: np.ndarray, so_far: IdProfile) -> IdProfile:
+    """IdProfile of a block of ASCII values as a rows x bytes matrix."""
+    profile = IdProfile()
+    profile.count = len(matrix)
+    profile.length_total = int(lengths.sum())
+    profile.length_min = int(lengths.min())
+    profile.length_max = int(lengths.max())
+    nonempty = lengths > 0
+
+    # Classes every character of a value belongs to
+    classes = np.bitwise_and.reduce(_CLASSES[matrix], axis=1) if matrix.shape[1] else np.full(len(matrix), 0xFF, np.uint8)
+    profile.is_numeric = so_far.is_numeric and bool(np.all((classes & DIGIT).astype(bool) & nonempty))
+    profile.is_alpha = so_far.is_alpha and bool(np.all((classes & ALPHA).astype(bool) & nonempty))
+    profile.is_alnum = so_far.is_alnum and bool(np.all((classes & ALNUM).astype(bool) & nonempty))
+    profile.hex_matches = int(np.count_nonzero((classes & HEX).astype(bool) & nonempty))
+    profile.uuid_matches = int(np.count_nonzero((classes & UUID_CHAR).astype(bool) & (lengths == UUID_LENGTH)))
+
+    # Affixes can only shrink: compare no further than what earlier blocks left, stopping at the first mismatch
+    first = matrix[0, :lengths[0]].tobytes().decode("ascii")
+    prefix_limit = len(first) if so_far.prefix is None else min(len(first), len(so_far.prefix))
+    size = 0
+    while size < prefix_limit and np.all(matrix[:, size] == matrix[0, size]):
+        size += 1
+    profile.prefix = first[:size]
+
+    suffix_limit = min(profile.length_min, len(first) if so_far.suffix is None else len(so_far.suffix))
+    rows = np.arange(len(matrix))
+    size = 0
+    while size < suffix_limit and np.all(matrix[rows, lengths - size - 1] == matrix[0, lengths[0] - size - 1]):
+        size += 1
+    profile.suffix = first[len(first) - size:]
+    return profile
+
+
+def _integer_profile(values: np.ndarray) -> IdProfile:
+    """IdProfile of non-negative integers from their decimal digits, without building strings."""
+    profile = IdProfile()
+    digits = np.searchsorted(_POWERS_OF_TEN[1:], values, side="right") + 1
+    profile.count = len(values)
+    profile.length_total = int(digits.sum())
+    profile.length_min = int(digits.min())
+    profile.length_max = int(digits.max())
+    profile.is_alpha = False
+    profile.hex_matches = len(values)
+
+    first = str(values[0])
+    size = 0
+    while size < min(len(first), profile.length_min):
+        leading = values // _POWERS_OF_TEN[digits - size - 1]
+        if not np.all(leading == int(first[:size + 1])):
+            break
+        size += 1
+    profile.prefix = first[:size]
+
+    size = 0
+    while size < min(len(first), profile.length_min):
+        if not np.all(values % _POWERS_OF_TEN[size + 1] == int(first[len(first) - size - 1:])):
+            break
+        size += 1
+    profile.suffix = first[len(first) - size:]
+    return profile
+
+
+def _text_profile(strings: pd.Series) -> IdProfile:
+    """IdProfile through pandas string methods, for non-ASCII or long values."""
+    profile = IdProfile()
+    lengths = strings.str.len()
+    profile.count = len(strings)
+    profile.length_total = int(lengths.sum())
+    profile.length_min = int(lengths.min())
+    profile.length_max = int(lengths.max())
+    # A sample rules most character classes out without a full pass
+    sample = strings.head(SAMPLE_ROWS)
+    profile.is_numeric = bool(sample.str.isnumeric().all()) and bool(strings.str.isnumeric().all())
+    profile.is_alpha = bool(sample.str.isalpha().all()) and bool(strings.str.isalpha().all())
+    profile.is_alnum = bool(sample.str.isalnum().all()) and bool(strings.str.isalnum().all())
+    # The common prefix of a set of strings is the common prefix of its min and max
+    profile.prefix = common_prefix(strings.min(), strings.max())
+    reversed_strings = strings.str[::-1]
+    profile.suffix = common_prefix(reversed_strings.min(), reversed_strings.max())[::-1]
+    # Only ASCII values can match the patterns
+    ascii_strings = strings[ascii_mask(strings)]
+    profile.uuid_matches = int(ascii_strings.str.fullmatch(r"[0-9a-fA-F\-]{36}").sum())
+    profile.hex_matches = int(ascii_strings.str.fullmatch(r"[0-9a-fA-F]+").sum())
+    return profile
+
+
+def is_sequential(numbers: pd.Series) -> bool:
+    """Sorted distinct values mostly one apart; sorts only when the span alone does not settle it."""
+    unique = pd.unique(numbers.dropna())
+    if len(unique) < 2:
+        return False
+    # Distinct values filling min..max exactly are all one apart
+    if unique.max() - unique.min() == len(unique) - 1:
+        return True
+    return bool(np.median(np.diff(np.sort(unique))) == 1)
+
+
+def analyze_id(series: pd.Series, context: Optional[ColumnContext] = None) -> dict:
+    """Analyze ID-like column for patterns"""
+    context = context or ColumnContext(series)
+    values = context.non_null
+    if values.empty:
+        return {"error": "Empty series"}
 
-    # Detect hex-like pattern
-    hex_pattern = re.compile(r"^[0-9a-fA-F]+$")
-    hex_like = series.apply(lambda x: bool(hex_pattern.match(x))).mean() > 0.9
+    # Integer IDs are profiled from their digits; everything else as strings
+    if _digit_countable(values):
+        unique_count = context.distinct_count
+    else:
+        values = context.strings
+        unique_count = len(context.string_counts[0])
+    profile = id_profile(values)
+    total_count = profile.count
 
     # Sequential detection (if numeric only)
     sequential = False
-    if is_numeric:
-        nums = pd.to_numeric(series, errors="coerce")
-        diffs = np.diff(np.sort(nums.dropna().unique()))
-        if len(diffs) > 0 and (np.all(diffs == 1) or np.median(diffs) == 1):
-            sequential = True
+    if profile.is_numeric:
+        numbers = values if pd.api.types.is_integer_dtype(values.dtype) else pd.to_numeric(values, errors="coerce")
+        sequential = is_sequential(numbers)
 
     return {
         "count": total_count,
         "unique_count": unique_count,
         "uniqueness_ratio": unique_count / total_count,
-        "length_min": int(lengths.min()),
-        "length_max": int(lengths.max()),
-        "length_mean": float(lengths.mean()),
-        "is_numeric": bool(is_numeric),
-        "is_alpha": bool(is_alpha),
-        "is_alphanumeric": bool(is_alnum),
-        "common_prefix": prefix if prefix else None,
-        "common_suffix": suffix if suffix else None,
-        "uuid_like": bool(uuid_like),
-        "hex_like": bool(hex_like),
-        "sequential": bool(sequential),
-        "example_values": series.head(5).tolist(),
-    }
\ No newline at end of file
+        "length_min": profile.length_min,
+        "length_max": profile.length_max,
+        "length_mean": profile.length_total / total_count,
+        "is_numeric": profile.is_numeric,
+        "is_alpha": profile.is_alpha,
+        "is_alphanumeric": profile.is_alnum,
+        "common_prefix": profile.prefix if profile.prefix else None,
+        "common_suffix": profile.suffix if profile.suffix else None,
+        "uuid_like": profile.uuid_matches / total_count > PATTERN_SHARE,
+        "hex_like": profile.hex_matches / total_count > PATTERN_SHARE,
+        "sequential": sequential,
+        "example_values": values.head(5).astype(str).tolist(),
+    }
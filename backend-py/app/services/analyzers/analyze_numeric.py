@@ -1,42 +1,50 @@
-import numpy as np
+from typing import Optional
+
 import pandas as pd
 
+from ..column_context import ColumnContext
+
 
-def analyze_numeric(series: pd.Series) -> dict:
-    series = pd.to_numeric(series, errors='coerce')
-    series = series.dropna()
+def analyze_numeric(series: pd.Series, context: Optional[ColumnContext] = None) -> dict:
+    context = context or ColumnContext(series)
+    series = context.numbers
     if series.empty:
         return {}
 
-    desc = series.describe()
-    q1, q3 = series.quantile([0.25, 0.75])
+    # Order statistics and sign counts come from the shared sorted values
+    values = context.sorted_numbers
+    mean = series.mean()
+    std = series.std()
+    q1, q3 = context.quantiles([0.25, 0.75])
     iqr = q3 - q1
 
     # Outliers (1.5 * IQR rule)
     lower_bound = q1 - 1.5 * iqr
     upper_bound = q3 + 1.5 * iqr
     outliers = series[(series < lower_bound) | (series > upper_bound)]
+    negative_count = context.count_below(0)
+    positive_count = context.count_above(0)
 
     return {
-        "count": int(desc["count"]),
-        "mean": float(desc["mean"]),
-        "median": float(series.median()),
-        "min": float(desc["min"]),
-        "max": float(desc["max"]),
-        "std_dev": float(desc["std"]),
+        "count": int(len(series)),
+        "mean": float(mean),
+        "median": context.median(),
+        "min": float(values[0]),
+        "max": float(values[-1]),
+        "std_dev": float(std),
         "variance": float(series.var()),
         "q1": float(q1),
         "q3": float(q3),
         "iqr": float(iqr),
-        "coefficient_of_variation": float(desc["std"] / desc["mean"]) if desc["mean"] != 0 else None,
+        "coefficient_of_variation": float(std / mean) if mean != 0 else None,
         "skewness": float(series.skew()),
         "kurtosis": float(series.kurtosis()),
-        "missing_values": int(series.isnull().sum()),
-        "unique_values": int(series.nunique()),
-        "zero_count": int((series == 0).sum()),
-        "positive_count": int((series > 0).sum()),
-        "negative_count": int((series < 0).sum()),
+        "missing_values": 0,
+        "unique_values": context.sorted_distinct_count(),
+        "zero_count": len(values) - negative_count - positive_count,
+        "positive_count": positive_count,
+        "negative_count": negative_count,
         "outlier_count": int(len(outliers)),
         "outlier_percentage": float(len(outliers) / len(series) * 100) if len(series) > 0 else 0,
         "outlier_examples": outliers.head(5).tolist()  # just a preview
-    }
\ No newline at end of file
+    }
@@ -1,19 +1,28 @@
+from typing import Optional
+
 import pandas as pd
 
+from ..column_context import ColumnContext
+from ..profiler import most_common_value
+
 
-def analyze_string(series: pd.Series) -> dict:
-    series = series.dropna().astype(str)
+def analyze_string(series: pd.Series, context: Optional[ColumnContext] = None) -> dict:
+    context = context or ColumnContext(series)
+    series = context.strings
     if series.empty:
         return {}
 
     lengths = series.str.len()
     desc = lengths.describe()
+    # Distinct values, mode and its count from one shared value table
+    uniques, counts = context.string_counts
+    most_common_count = int(counts.max())
 
     return {
         "count": int(desc["count"]),
-        "unique_values": int(series.nunique()),
-        "most_common_value": series.mode().iloc[0] if not series.mode().empty else None,
-        "most_common_count": int(series.value_counts().iloc[0]) if not series.value_counts().empty else 0,
+        "unique_values": len(uniques),
+        "most_common_value": most_common_value(uniques, counts, most_common_count),
+        "most_common_count": most_common_count,
         "avg_length": float(desc["mean"]),
         "min_length": int(desc["min"]),
         "max_length": int(desc["max"]),
@@ -21,4 +30,4 @@ def analyze_string(series: pd.Series) -> dict:
         "empty_string_count": int((series == "").sum()),
         "whitespace_ratio": float((series.str.strip() == "").mean()),
         "example_values": series.head(5).tolist()
-    }
\ No newline at end of file
+    }
@@ -1,25 +1,46 @@
+from typing import Optional
+
+import numpy as np
 import pandas as pd
 
+from ..column_context import ColumnContext
+from ..datetimes import DAY_NS, calendar_counts, parse_dates, runs, time_of_day_analysis
+
 
-def date_analysis(series: pd.Series):
-    series = pd.to_datetime(series, errors='coerce').dropna()
-    if series.empty:
+def date_analysis(series: pd.Series, context: Optional[ColumnContext] = None):
+    context = context or ColumnContext(series)
+    # Parsed once; every statistic below reads the same int64 array
+    parsed = parse_dates(context.non_null)
+    if len(parsed.stamps) == 0:
         return {}
+    if parsed.time_of_day:
+        return time_of_day_analysis(*runs(np.sort(parsed.stamps % DAY_NS)))
 
-    series_sorted = series.sort_values()
-    diffs = series_sorted.diff().dropna()
+    stamps = parsed.sorted
+    values, counts = parsed.runs
+    # Rows per distinct day, for the calendar counts
+    day_of_value = values // DAY_NS
+    starts = np.flatnonzero(np.diff(day_of_value, prepend=day_of_value[0] - 1))
+    calendar = calendar_counts(day_of_value[starts], np.add.reduceat(counts, starts))
+    diffs = np.diff(stamps)
+    middle = len(stamps) // 2
+    median = stamps[middle] if len(stamps) % 2 else (stamps[middle - 1] / 2 + stamps[middle] / 2)
 
     return {
-        "min_date": series.min(),
-        "max_date": series.max(),
-        "range_days": (series.max() - series.min()).days,
-        "median_date": series.median(),
-        "most_common_date": series.mode().iloc[0] if not series.mode().empty else None,
-        "counts_by_year": series.dt.year.value_counts().to_dict(),
-        "counts_by_month": series.dt.month.value_counts().to_dict(),
-        "counts_by_weekday": series.dt.day_name().value_counts().to_dict(),
-        "average_gap_days": diffs.mean().days if not diffs.empty else None,
-        "min_gap_days": diffs.min().days if not diffs.empty else None,
-        "max_gap_days": diffs.max().days if not diffs.empty else None,
-        "std_gap_days": diffs.std().days if not diffs.empty else None
-    }
\ No newline at end of file
+        "min_date": parsed.timestamp(stamps[0]),
+        "max_date": parsed.timestamp(stamps[-1]),
+        "range_days": pd.Timedelta(int(stamps[-1] - stamps[0])).days,
+        "median_date": parsed.timestamp(median),
+        "most_common_date": parsed.timestamp(values[np.argmax(counts)]),
+        "counts_by_year": _most_frequent_first(calendar["year"]),
+        "counts_by_month": _most_frequent_first(calendar["month"]),
+        "counts_by_weekday": _most_frequent_first(calendar["weekday"]),
+        "average_gap_days": pd.Timedelta(diffs.mean()).days if len(diffs) else None,
+        "min_gap_days": pd.Timedelta(int(diffs.min())).days if len(diffs) else None,
+        "max_gap_days": pd.Timedelta(int(diffs.max())).days if len(diffs) else None,
+        "std_gap_days": pd.Timedelta(diffs.std(ddof=1)).days if len(diffs) > 1 else None
+    }
+
+
+def _most_frequent_first(counts: pd.Series) -> dict:
+    return counts.sort_values(ascending=False, kind="stable").to_dict()
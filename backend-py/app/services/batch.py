@@ -0,0 +1,138 @@
+"""
+Analysis of many files with the same columns, e.g. the partitions of one
+dataset, in one request. Every file is accumulated chunk by chunk into its
+own DatasetAccumulator and reported on its own; the dataset result is the
+merge of those per-file partial aggregates, so rows of different files are
+never concatenated. Files run on the column process pool, at most
+`workers` at a time, when more than one worker is configured.
+
+The first file that can be read is analyzed before the others and its
+columns' semantic types are pinned for the rest: types are inferred once,
+and every file feeds the same analyzers, whose states then merge.
+"""
+import uuid
+from functools import partial
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence, Tuple, Union
+
+from ..config import settings
+from .accumulators import DatasetAccumulator
+from .executor import get_column_pool, submit_limited
+from .streaming import accumulate_csv, accumulated_result
+
+# A file to analyze: (name, path or open file object, format as in UPLOAD_FORMATS)
+BatchSource = Tuple[str, Union[str, BinaryIO], str]
+# What analyzing one file gives: (accumulator, its result) or an error message
+FileOutcome = Tuple[Optional[DatasetAccumulator], Optional[Dict[str, Any]], Optional[str]]
+
+
+def analyze_batch(
+    sources: Sequence[BatchSource],
+    group_by_column: Optional[Union[str, Sequence[str]]] = None,
+    approx: bool = False,
+    columns: Optional[List[str]] = None,
+    top_k: Optional[int] = None,
+    max_groups: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Per-file results and the merged result of `sources`, each file read as
+    with stream=true (only `columns`, if given). With `workers`
+    (settings.analysis_workers by default) greater than 1 files are analyzed
+    on the column pool and their sources must be paths. A file that cannot
+    be read, or whose columns differ from the first file's, gets an "error"
+    entry and is left out of the merge.
+    """
+    workers = settings.analysis_workers if workers is None else workers
+    options = {
+        "group_by_column": group_by_column,
+        "approx": approx,
+        "columns": columns,
+        "top_k": top_k,
+        "max_groups": max_groups,
+    }
+    entries: List[Optional[Dict[str, Any]]] = [None] * len(sources)
+    merged: Optional[DatasetAccumulator] = None
+    reference = None
+
+    def record(index: int, outcome: FileOutcome) -> None:
+        nonlocal merged
+        accumulator, result, error = outcome
+        name = sources[index][0]
+        if error is None and merged is not None and list(accumulator.columns) != list(merged.columns):
+            error = f"Columns {list(accumulator.columns)} do not match the first file's {list(merged.columns)}"
+        if error is not None:
+            entries[index] = {"filename": name, "error": error}
+            return
+        entries[index] = {"filename": name, "rows": accumulator.rows, "results": result}
+        if merged is None:
+            merged = accumulator
+            # The file's own result keeps its id; the merged analysis gets a new one
+            merged.analysis_id = str(uuid.uuid4())
+        else:
+            merged.merge(accumulator)
+
+    pending = list(range(len(sources)))
+    while pending and merged is None:
+        index = pending.pop(0)
+        _, source, file_format = sources[index]
+        record(index, _analyze_source(source, file_format, **options))
+        reference = sources[index][0]
+    semantic_types = merged.pin_semantic_types() if merged is not None else {}
+
+    if workers > 1 and len(pending) > 1:
+        calls = (
+            (index, partial(_analyze_source, **options), (sources[index][1], sources[index][2], semantic_types))
+            for index in pending
+        )
+        for index, future in submit_limited(get_column_pool(workers), calls, workers):
+            record(index, future.result())
+    else:
+        for index in pending:
+            _, source, file_format = sources[index]
+            record(index, _analyze_source(source, file_format, semantic_types, **options))
+
+    failed = sum("error" in entry for entry in entries)
+    return {
+        "analysis_id": merged.analysis_id if merged is not None else None,
+        "batch": {
+            "files": len(sources),
+            "analyzed": len(sources) - failed,
+            "failed": failed,
+            "reference_file": reference if merged is not None else None,
+            "semantic_types": semantic_types,
+        },
+        "results": accumulated_result(merged, top_k, max_groups) if merged is not None else None,
+        "files": entries,
+    }
+
+
+def _analyze_source(
+    source: Union[str, BinaryIO],
+    file_format: str,
+    semantic_types: Optional[Dict[str, str]] = None,
+    group_by_column: Optional[Union[str, Sequence[str]]] = None,
+    approx: bool = False,
+    columns: Optional[List[str]] = None,
+    top_k: Optional[int] = None,
+    max_groups: Optional[int] = None,
+) -> FileOutcome:
+    """Accumulate one file and take its result; runs on the pool, so failures come back as messages."""
+    if isinstance(source, str):
+        with open(source, "rb") as fileobj:
+            return _analyze_source(
+                fileobj, file_format, semantic_types, group_by_column, approx, columns, top_k, max_groups
+            )
+    try:
+        accumulator = accumulate_csv(
+            source,
+            group_by_column=group_by_column,
+            approx=approx,
+            file_format=file_format,
+            columns=columns,
+            semantic_types=semantic_types,
+        )
+    except Exception as e:
+        return None, None, f"Error reading file: {getattr(e, 'detail', None) or str(e)}"
+    if accumulator.rows == 0:
+        return None, None, "File is empty or could not be parsed"
+    return accumulator, accumulator.result(top_k, max_groups), None
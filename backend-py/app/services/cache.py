@@ -0,0 +1,247 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+
+from ..config import settings
+from ..utils.json_encoding import dumps, loads
+from .analysis_service import ANALYZER_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Read size used when hashing uploads
+_HASH_BLOCK = 1024 * 1024
+# The leading fields of an encoded entry, read without decoding its results
+_ENTRY_HEAD = re.compile(rb'^\{"analysis_id":(?:"([^"]*)"|null),"values_stored":(true|false),')
+
+
+def upload_digest(fileobj: BinaryIO) -> str:
+    """sha256 of a file object's bytes, read in blocks; the file is rewound afterwards."""
+    fileobj.seek(0)
+    digest = hashlib.sha256()
+    for block in iter(lambda: fileobj.read(_HASH_BLOCK), b""):
+        digest.update(block)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def result_key(content_digest: str, **params: Any) -> str:
+    """Cache key for an analysis of `content_digest` with the given request parameters."""
+    material = json.dumps(
+        {"content": content_digest, "version": ANALYZER_VERSION, "params": params},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier cache of analysis results keyed by content hash.
+
+    Results are kept as the JSON bytes of their response body (less the
+    filename), so hits are served without re-encoding: an in-process LRU
+    bounded by `memory_bytes`, and optionally a directory of `<key>.json`
+    files bounded by `disk_bytes` (oldest evicted first). Entries older than `ttl_seconds`
+    are treated as missing in both tiers. A disk hit is promoted to memory.
+    """
+
+    def __init__(
+        self,
+        memory_bytes: int,
+        ttl_seconds: int,
+        disk_dir: Optional[str] = None,
+        disk_bytes: int = 0,
+    ):
+        self.memory_bytes = memory_bytes
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir or None
+        self.disk_bytes = disk_bytes
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        payload = self.get_raw(key)
+        return None if payload is None else loads(payload)["results"]
+
+    def get_raw(self, key: str) -> Optional[bytes]:
+        """The stored `{"analysis_id", "values_stored", "results"}` JSON bytes, not decoded."""
+        payload = self._get_memory(key)
+        if payload is None:
+            payload = self._get_disk(key)
+        if payload is None:
+            with self._lock:
+                self.stats["misses"] += 1
+        return payload
+
+    def put(self, key: str, result: Dict[str, Any], values_stored: bool = False) -> bytes:
+        """
+        Store a result; returns the encoded entry (see get_raw).
+        `values_stored` records whether the analysis' distinct values went
+        to the value store.
+        """
+        payload = dumps({"analysis_id": result.get("analysis_id"), "values_stored": values_stored, "results": result})
+        self._put_memory(key, time.time(), payload)
+        if self.disk_dir:
+            self._put_disk(key, payload)
+        return payload
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+        for path, _, _ in self._disk_files():
+            _remove(path)
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            info = dict(self.stats)
+            info.update({
+                "memory_entries": len(self._entries),
+                "memory_bytes": self._size,
+                "memory_limit_bytes": self.memory_bytes,
+                "ttl_seconds": self.ttl_seconds,
+            })
+        hits = info["memory_hits"] + info["disk_hits"]
+        info["hit_ratio"] = hits / (hits + info["misses"]) if hits + info["misses"] else 0.0
+        if self.disk_dir:
+            files = self._disk_files()
+            info.update({
+                "disk_entries": len(files),
+                "disk_bytes": sum(size for _, size, _ in files),
+                "disk_limit_bytes": self.disk_bytes,
+            })
+        return info
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - stored_at > self.ttl_seconds
+
+    def _get_memory(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, payload = entry
+            if self._expired(stored_at):
+                self._drop(key)
+                self.stats["expired"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return payload
+
+    def _put_memory(self, key: str, stored_at: float, payload: bytes) -> None:
+        if len(payload) > self.memory_bytes:
+            return
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (stored_at, payload)
+            self._size += len(payload)
+            while self._size > self.memory_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.stats["evictions"] += 1
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[1])
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _get_disk(self, key: str) -> Optional[bytes]:
+        if not self.disk_dir:
+            return None
+        path = self._path(key)
+        try:
+            stored_at = os.path.getmtime(path)
+            if self._expired(stored_at):
+                _remove(path)
+                with self._lock:
+                    self.stats["expired"] += 1
+                return None
+            with open(path, "rb") as f:
+                payload = f.read()
+        except OSError:
+            return None
+        with self._lock:
+            self.stats["disk_hits"] += 1
+        self._put_memory(key, stored_at, payload)
+        return payload
+
+    def _put_disk(self, key: str, payload: bytes) -> None:
+        if len(payload) > self.disk_bytes:
+            return
+        path = self._path(key)
+        # Write then rename, so concurrent readers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Result cache: could not write %s: %s", path, e)
+            _remove(tmp_path)
+            return
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        files = sorted(self._disk_files(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in files)
+        for path, size, stored_at in files:
+            if total <= self.disk_bytes and not self._expired(stored_at):
+                continue
+            _remove(path)
+            total -= size
+            with self._lock:
+                self.stats["evictions"] += 1
+
+    def _disk_files(self):
+        """(path, size, mtime) of every cached result file."""
+        if not self.disk_dir:
+            return []
+        files = []
+        with os.scandir(self.disk_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append((entry.path, stat.st_size, stat.st_mtime))
+        return files
+
+
+def entry_head(payload: bytes) -> Tuple[Optional[str], bool]:
+    """(analysis_id, values_stored) of an encoded entry; entries from before values_stored read as not stored."""
+    match = _ENTRY_HEAD.match(payload)
+    if match is None:
+        return None, False
+    analysis_id = match.group(1).decode() if match.group(1) is not None else None
+    return analysis_id, match.group(2) == b"true"
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+result_cache = ResultCache(
+    memory_bytes=settings.cache_memory_mb * 1024 * 1024,
+    ttl_seconds=settings.cache_ttl_seconds,
+    disk_dir=settings.cache_dir,
+    disk_bytes=settings.cache_disk_mb * 1024 * 1024,
+)
@@ -0,0 +1,115 @@
+"""
+Intermediates of one column shared by type detection, the semantic
+analyzers and the generic summaries. Each is computed on first use and
+kept for the rest of the column's analysis, so a column is filtered,
+factorized, coerced and sorted at most once per request.
+"""
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..utils.strings import as_strings
+from .profiler import count_values
+
+
+class ColumnContext:
+    """Lazily computed views of `series`; analyzers given none build their own."""
+
+    def __init__(self, series: pd.Series):
+        self.series = series
+        self._non_null: Optional[pd.Series] = None
+        self._value_counts: Optional[Tuple[pd.Index, np.ndarray]] = None
+        self._strings: Optional[pd.Series] = None
+        self._string_counts: Optional[Tuple[pd.Index, np.ndarray]] = None
+        self._numbers: Optional[pd.Series] = None
+        self._sorted_numbers: Optional[np.ndarray] = None
+
+    @property
+    def non_null(self) -> pd.Series:
+        """series.dropna(), the series itself when nothing is missing."""
+        if self._non_null is None:
+            mask = self.series.notna()
+            self._non_null = self.series if mask.all() else self.series[mask]
+        return self._non_null
+
+    @property
+    def missing_count(self) -> int:
+        return len(self.series) - len(self.non_null)
+
+    @property
+    def value_counts(self) -> Tuple[pd.Index, np.ndarray]:
+        """profiler.count_values of the series: distinct values (missing included) and their counts."""
+        if self._value_counts is None:
+            self._value_counts = count_values(self.series)
+        return self._value_counts
+
+    @property
+    def observed_counts(self) -> Tuple[pd.Index, np.ndarray]:
+        """value_counts without the missing entry and unused categories."""
+        uniques, counts = self.value_counts
+        observed = ~np.asarray(uniques.isna()) & (counts > 0)
+        return uniques[observed], counts[observed]
+
+    @property
+    def distinct_count(self) -> int:
+        """series.nunique()"""
+        return len(self.observed_counts[0])
+
+    @property
+    def strings(self) -> pd.Series:
+        """The non-null values as strings (as_strings)."""
+        if self._strings is None:
+            self._strings = as_strings(self.non_null)
+        return self._strings
+
+    @property
+    def string_counts(self) -> Tuple[pd.Index, np.ndarray]:
+        """Distinct strings and their counts, in order of first appearance."""
+        if self._string_counts is None:
+            if self.strings is self.non_null:
+                # Already strings: the column's own value table serves
+                self._string_counts = self.observed_counts
+            else:
+                self._string_counts = count_values(self.strings)
+        return self._string_counts
+
+    @property
+    def numbers(self) -> pd.Series:
+        """The values pd.to_numeric(errors="coerce") makes numbers of, missing and unparseable ones dropped."""
+        if self._numbers is None:
+            self._numbers = pd.to_numeric(self.non_null, errors="coerce").dropna()
+        return self._numbers
+
+    @property
+    def sorted_numbers(self) -> np.ndarray:
+        """`numbers` sorted ascending (booleans as 0 / 1)."""
+        if self._sorted_numbers is None:
+            values = self.numbers.to_numpy()
+            if values.dtype.kind not in "iuf":
+                values = values.astype(np.float64)
+            self._sorted_numbers = np.sort(values)
+        return self._sorted_numbers
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        """Series.quantile(qs) of `numbers` (linear interpolation), read off the sorted values."""
+        return np.percentile(self.sorted_numbers, np.asarray(qs) * 100)
+
+    def median(self) -> float:
+        """Series.median() of `numbers`: the middle value, or the mean of the middle two."""
+        values = self.sorted_numbers
+        middle = len(values) // 2
+        if len(values) % 2:
+            return float(values[middle])
+        return (float(values[middle - 1]) + float(values[middle])) / 2
+
+    def count_below(self, value: float) -> int:
+        return int(np.searchsorted(self.sorted_numbers, value, side="left"))
+
+    def count_above(self, value: float) -> int:
+        return len(self.sorted_numbers) - int(np.searchsorted(self.sorted_numbers, value, side="right"))
+
+    def sorted_distinct_count(self) -> int:
+        """numbers.nunique(), from the sorted values."""
+        values = self.sorted_numbers
+        return int(np.count_nonzero(values[1:] != values[:-1])) + 1 if len(values) else 0
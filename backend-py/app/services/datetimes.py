@@ -0,0 +1,186 @@
+"""
+Date and time-of-day parsing shared by type detection, date_analysis and
+the streaming DateAccumulator. The format is inferred once from a sample,
+the whole column is parsed with it, and every statistic is computed from
+the resulting int64 nanosecond array.
+"""
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Fixed formats tried (vectorized), in order, before parsing value by value.
+# Month-first comes before day-first, so that a column of ambiguous dates
+# (01/02/2020) is read month-first as pandas does; day-first only wins when it
+# parses more values, i.e. some value has a first field above 12.
+DATE_FORMATS = [
+    "ISO8601",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%m-%d-%Y",
+    "%d-%m-%Y",
+    "%m/%d/%Y %H:%M",
+    "%d/%m/%Y %H:%M",
+    "%H:%M",
+    "%H:%M:%S",
+    "%I:%M %p",
+    "%I:%M:%S %p",
+    "%d %b %Y",
+    "%d %B %Y",
+    "%b %d, %Y",
+    "%B %d, %Y",
+]
+# Formats without a date: such columns are analyzed as times of day
+TIME_FORMATS = ["%H:%M", "%H:%M:%S", "%I:%M %p", "%I:%M:%S %p"]
+# Values the format is inferred from
+FORMAT_SAMPLE_SIZE = 100
+
+MINUTE_NS = 60 * 10**9
+HOUR_NS = 60 * MINUTE_NS
+DAY_NS = 24 * HOUR_NS
+NAT = np.iinfo(np.int64).min
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+# 1970-01-01, day 0 of the epoch, was a Thursday
+EPOCH_WEEKDAY = 3
+
+
+def infer_format(values: pd.Series, sample_size: int = FORMAT_SAMPLE_SIZE) -> Optional[str]:
+    """
+    The DATE_FORMATS entry that parses the most of a sample of the non-null
+    values (None if none does); ties go to the earlier entry, so to
+    month-first.
+    """
+    sample = values.dropna()
+    if len(sample) > sample_size:
+        sample = sample.sample(n=sample_size, random_state=42)
+    text = sample.astype(str).str.strip()
+    best, best_parsed = None, 0
+    for date_format in DATE_FORMATS:
+        parsed = int(pd.to_datetime(text, format=date_format, errors="coerce").notna().sum())
+        if parsed > best_parsed:
+            best, best_parsed = date_format, parsed
+            if parsed == len(text):
+                break
+    return best
+
+
+class ParsedDates:
+    """
+    A column parsed once into int64 nanoseconds (unparseable values dropped).
+    Timezone-aware values are kept as wall-clock time; `timestamp` puts the
+    zone back. The sorted values and their runs are computed on first use
+    and shared by every statistic.
+    """
+
+    def __init__(self, stamps: np.ndarray, date_format: Optional[str] = None, tz=None):
+        self.stamps = stamps
+        self.date_format = date_format
+        self.tz = tz
+        self._sorted: Optional[np.ndarray] = None
+        self._runs: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    @property
+    def time_of_day(self) -> bool:
+        return self.date_format in TIME_FORMATS
+
+    @property
+    def sorted(self) -> np.ndarray:
+        if self._sorted is None:
+            self._sorted = np.sort(self.stamps)
+        return self._sorted
+
+    @property
+    def runs(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Distinct values, ascending, and how often each occurs."""
+        if self._runs is None:
+            self._runs = runs(self.sorted)
+        return self._runs
+
+    def timestamp(self, value) -> pd.Timestamp:
+        return localize(pd.Timestamp(int(value)), self.tz)
+
+
+def parse_dates(series: pd.Series, date_format: Optional[str] = None) -> ParsedDates:
+    """
+    Parse `series` with `date_format` (inferred from a sample if not given).
+    Values the format does not fit are parsed one by one, as pd.to_datetime
+    would without a format.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        converted = series
+    else:
+        date_format = date_format or infer_format(series)
+        if date_format is None:
+            converted = pd.to_datetime(series, errors="coerce")
+        else:
+            converted = pd.to_datetime(series, format=date_format, errors="coerce")
+            leftover = converted.isna().to_numpy() & series.notna().to_numpy()
+            if leftover.any():
+                converted[leftover] = pd.to_datetime(series[leftover], errors="coerce")
+        if not pd.api.types.is_datetime64_any_dtype(converted):
+            # Mixed UTC offsets: compare on UTC
+            converted = pd.to_datetime(converted, errors="coerce", utc=True)
+
+    tz = getattr(converted.dt, "tz", None)
+    if tz is not None:
+        converted = converted.dt.tz_localize(None)
+    stamps = converted.to_numpy(dtype="datetime64[ns]").view(np.int64)
+    return ParsedDates(stamps[stamps != NAT], date_format, tz)
+
+
+def runs(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Distinct values of a sorted array and their counts."""
+    if len(values) == 0:
+        return values, np.empty(0, dtype=np.int64)
+    starts = np.concatenate([[0], np.flatnonzero(values[1:] != values[:-1]) + 1])
+    return values[starts], np.diff(np.append(starts, len(values)))
+
+
+def localize(timestamp: pd.Timestamp, tz) -> pd.Timestamp:
+    if tz is None:
+        return timestamp
+    return timestamp.tz_localize(tz, ambiguous=True, nonexistent="shift_forward")
+
+
+def calendar_counts(days: np.ndarray, counts: np.ndarray) -> Dict[str, pd.Series]:
+    """Rows per year, month and weekday name from distinct epoch days and their row counts, via bincount."""
+    dates = days.astype("datetime64[D]")
+    years = dates.astype("datetime64[Y]").astype(np.int64)
+    months = dates.astype("datetime64[M]").astype(np.int64) % 12
+    weekdays = (days + EPOCH_WEEKDAY) % 7
+    first_year = int(years.min()) if len(years) else 0
+    return {
+        "year": _bincount(years - first_year, counts, lambda code: 1970 + first_year + code),
+        "month": _bincount(months, counts, lambda code: code + 1),
+        "weekday": _bincount(weekdays, counts, lambda code: WEEKDAYS[code]),
+    }
+
+
+def _bincount(codes: np.ndarray, counts: np.ndarray, label) -> pd.Series:
+    totals = np.bincount(codes, weights=counts).astype(np.int64) if len(codes) else np.empty(0, dtype=np.int64)
+    present = np.flatnonzero(totals)
+    return pd.Series(totals[present], index=[label(int(code)) for code in present], dtype=np.int64)
+
+
+def clock(nanoseconds) -> str:
+    """HH:MM:SS of a time of day given in nanoseconds since midnight."""
+    seconds = int(nanoseconds) // 10**9
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def time_of_day_analysis(times: np.ndarray, counts: np.ndarray) -> Dict[str, object]:
+    """Statistics of a time-only column from its distinct times of day (ns since midnight, ascending) and counts."""
+    total = int(counts.sum())
+    cumulative = np.cumsum(counts)
+    lower = times[np.searchsorted(cumulative, (total - 1) // 2, side="right")]
+    upper = times[np.searchsorted(cumulative, total // 2, side="right")]
+    by_hour = _bincount(times // HOUR_NS, counts, int)
+    return {
+        "time_of_day": True,
+        "min_time": clock(times[0]),
+        "max_time": clock(times[-1]),
+        "range_minutes": int((times[-1] - times[0]) // MINUTE_NS),
+        "median_time": clock((int(lower) + int(upper)) // 2),
+        "most_common_time": clock(times[np.argmax(counts)]),
+        "counts_by_hour": by_hour.sort_values(ascending=False, kind="stable").to_dict(),
+    }
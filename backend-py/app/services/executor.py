@@ -0,0 +1,277 @@
+import atexit
+import multiprocessing
+import pickle
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, as_completed, wait
+from itertools import islice
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional: object columns are pickled one by one instead
+    pa = None
+
+from ..config import settings
+from ..utils.strings import arrow_strings, is_arrow_string
+
+# Byte alignment of each column inside the shared numeric segment
+_ALIGNMENT = 64
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def get_column_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Process pool shared by all requests, created on first use with
+    settings.analysis_workers processes, or `workers` if more. Callers cap
+    their own parallelism by how much they submit at once. A call for more
+    processes than the pool has replaces it with a larger one; the old pool
+    still runs everything already submitted to it, then exits.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers < workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool_workers = max(workers, settings.analysis_workers)
+            # spawn, not fork: forking a threaded server process is unsafe
+            _pool = ProcessPoolExecutor(max_workers=_pool_workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def submit_limited(
+    pool: ProcessPoolExecutor, calls: Iterable[Tuple[Any, Callable, tuple]], limit: int
+) -> Iterator[Tuple[Any, Future]]:
+    """
+    Submit each (key, fn, args) of `calls` to `pool`, at most `limit` at a
+    time, so one request does not take over a larger shared pool; yields
+    (key, future) as each finishes.
+    """
+    calls = iter(calls)
+    pending: Dict[Future, Any] = {}
+    while True:
+        for key, fn, args in islice(calls, max(limit - len(pending), 0)):
+            pending[pool.submit(fn, *args)] = key
+        if not pending:
+            return
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield pending.pop(future), future
+
+
+def shutdown_column_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(shutdown_column_pool)
+
+
+def map_columns(
+    fn: Callable[[pd.Series], Any],
+    df: pd.DataFrame,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> List[Any]:
+    """
+    Apply `fn` to every column of `df` on the column process pool.
+
+    Columns are sharded across `workers` processes (settings.analysis_workers
+    by default), one task per shard, so at most `workers` of the shared pool's
+    processes are busy with this frame; the frame itself is never pickled. Fixed-width columns are
+    copied once into a shared memory segment and string columns (object or
+    arrow-backed) are written as one Arrow IPC stream into another; workers
+    attach to both by name.
+    Other columns (mixed objects, extension dtypes) are pickled one by one.
+    Results come back in `df.columns` order. `progress(done, total)` is
+    called as columns (or, on the pool, whole shards) finish.
+    """
+    workers = settings.analysis_workers if workers is None else workers
+    total = len(df.columns)
+    if workers <= 1 or total <= 1:
+        results = []
+        for i in range(total):
+            results.append(fn(df.iloc[:, i]))
+            if progress is not None:
+                progress(i + 1, total)
+        return results
+
+    with SharedFrame(df) as shared:
+        pool = get_column_pool(workers)
+        futures = [
+            pool.submit(_run_shard, fn, shared.segments(), [shared.handles[i] for i in shard])
+            for shard in _shard(df, workers) if shard
+        ]
+        results: Dict[int, Any] = {}
+        for future in as_completed(futures):
+            results.update(future.result())
+            if progress is not None:
+                progress(len(results), total)
+    return [results[i] for i in range(total)]
+
+
+def _shard(df: pd.DataFrame, workers: int) -> List[List[int]]:
+    """Split column positions into `workers` groups of similar size (largest first)."""
+    sizes = df.memory_usage(deep=True, index=False).to_numpy()
+    shards: List[List[int]] = [[] for _ in range(workers)]
+    loads = np.zeros(workers)
+    for position in np.argsort(-sizes, kind="stable"):
+        target = int(np.argmin(loads))
+        shards[target].append(int(position))
+        loads[target] += sizes[position]
+    return shards
+
+
+class SharedFrame:
+    """
+    The columns of a DataFrame placed in shared memory for worker processes.
+
+    `handles[i]` describes how to rebuild column i: ("numpy", i, name, dtype,
+    offset, length), ("arrow", i, name, na_value, dtype) or ("pickle", i,
+    pickled column). `dtype` is the column's string dtype, None for object.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.handles: Dict[int, Tuple] = {}
+        self.numeric: Optional[shared_memory.SharedMemory] = None
+        self.arrow: Optional[shared_memory.SharedMemory] = None
+
+        fixed, strings = [], {}
+        for position in range(len(df.columns)):
+            series = df.iloc[:, position]
+            array = None
+            if is_arrow_string(series):
+                array = arrow_strings(series)
+            elif pa is not None and series.dtype == object:
+                array = _arrow_array(series)
+            if isinstance(series.dtype, np.dtype) and series.dtype.kind in "biufcmM":
+                fixed.append(position)
+            elif array is not None:
+                strings[position] = array
+            else:
+                self.handles[position] = ("pickle", position, pickle.dumps(series, protocol=pickle.HIGHEST_PROTOCOL))
+
+        self._share_fixed(df, fixed)
+        self._share_strings(df, strings)
+
+    def _share_fixed(self, df: pd.DataFrame, positions: List[int]) -> None:
+        if not positions:
+            return
+        offsets, total = [], 0
+        for position in positions:
+            offsets.append(total)
+            nbytes = df.iloc[:, position].to_numpy().nbytes
+            total += -(-nbytes // _ALIGNMENT) * _ALIGNMENT
+        self.numeric = shared_memory.SharedMemory(create=True, size=max(total, 1))
+        for position, offset in zip(positions, offsets):
+            series = df.iloc[:, position]
+            values = series.to_numpy()
+            target = np.ndarray(values.shape, dtype=values.dtype, buffer=self.numeric.buf, offset=offset)
+            target[...] = values
+            del target
+            self.handles[position] = ("numpy", position, series.name, values.dtype.str, offset, len(values))
+
+    def _share_strings(self, df: pd.DataFrame, arrays: Dict[int, Any]) -> None:
+        if not arrays:
+            return
+        batch = pa.record_batch(list(arrays.values()), names=[str(position) for position in arrays])
+
+        sizer = pa.MockOutputStream()
+        with pa.ipc.new_stream(sizer, batch.schema) as writer:
+            writer.write_batch(batch)
+        self.arrow = shared_memory.SharedMemory(create=True, size=max(sizer.size(), 1))
+        sink = pa.FixedSizeBufferWriter(pa.py_buffer(self.arrow.buf))
+        with pa.ipc.new_stream(sink, batch.schema) as writer:
+            writer.write_batch(batch)
+        del sink
+
+        for position in arrays:
+            series = df.iloc[:, position]
+            if is_arrow_string(series):
+                self.handles[position] = ("arrow", position, series.name, None, series.dtype)
+                continue
+            missing = series[series.isna()]
+            na_value = missing.iloc[0] if len(missing) else None
+            self.handles[position] = ("arrow", position, series.name, na_value, None)
+
+    def segments(self) -> Tuple[Optional[str], Optional[str]]:
+        return (
+            self.numeric.name if self.numeric is not None else None,
+            self.arrow.name if self.arrow is not None else None,
+        )
+
+    def close(self) -> None:
+        for segment in (self.numeric, self.arrow):
+            if segment is not None:
+                segment.close()
+                segment.unlink()
+        self.numeric = self.arrow = None
+
+    def __enter__(self) -> "SharedFrame":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _arrow_array(series: pd.Series):
+    """Arrow string array for an object column of strings, None if it has other values."""
+    try:
+        array = pa.array(series, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return None
+    return array if pa.types.is_string(array.type) or pa.types.is_large_string(array.type) else None
+
+
+def _run_shard(fn: Callable[[pd.Series], Any], segments: Tuple[Optional[str], Optional[str]], handles: List[Tuple]):
+    """Worker side: rebuild this shard's columns from shared memory and apply `fn`."""
+    numeric_name, arrow_name = segments
+    numeric = shared_memory.SharedMemory(name=numeric_name) if numeric_name else None
+    arrow = shared_memory.SharedMemory(name=arrow_name) if arrow_name else None
+    try:
+        batch = None
+        if arrow is not None:
+            batch = pa.ipc.open_stream(pa.py_buffer(arrow.buf)).read_next_batch()
+
+        results = {}
+        for handle in handles:
+            series = _rebuild(handle, numeric, batch)
+            results[handle[1]] = fn(series)
+            del series
+        del batch
+        return results
+    finally:
+        for segment in (numeric, arrow):
+            if segment is not None:
+                segment.close()
+
+
+def _rebuild(handle: Tuple, numeric, batch) -> pd.Series:
+    kind, position = handle[0], handle[1]
+    if kind == "numpy":
+        _, _, name, dtype, offset, length = handle
+        # One memcpy out of the segment, so no view outlives it once the shard is done
+        values = np.ndarray((length,), dtype=np.dtype(dtype), buffer=numeric.buf, offset=offset).copy()
+        return pd.Series(values, name=name)
+    if kind == "arrow":
+        _, _, name, na_value, dtype = handle
+        column = batch.column(str(position))
+        if dtype is not None:
+            # One copy out of the segment (concat allocates), so no buffer outlives it once the shard is done
+            return pd.Series(pd.array(pa.concat_arrays([column]), dtype=dtype), name=name)
+        series = column.to_pandas()
+        series.name = name
+        if na_value is not None:
+            # Arrow nulls come back as None; keep the frame's own missing marker (NaN from read_csv)
+            series = series.where(series.notna(), na_value)
+        return series
+    return pickle.loads(handle[2])
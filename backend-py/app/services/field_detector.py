@@ -1,7 +1,44 @@
 import re
-import dateparser
+import numpy as np
 import pandas as pd
 import datetime
+from collections import Counter
+from typing import Optional
+
+from .column_context import ColumnContext
+from .datetimes import DATE_FORMATS
+
+# Sample detections trusted over the column-wide ID heuristic
+TRUSTED_SEMANTIC_TYPES = ["currency", "date", "boolean"]
+# Share of distinct values above which a column is treated as an ID
+ID_UNIQUE_RATIO = 0.95
+
+BOOLEAN_STRINGS = ["true", "false", "yes", "no", "0", "1"]
+# Strings float() accepts that pd.to_numeric coerces to NaN
+FLOAT_SPECIALS = ["nan", "+nan", "-nan", "inf", "+inf", "-inf", "infinity", "+infinity", "-infinity"]
+
+# Pattern checks, in priority order: the first match wins
+PATTERN_TYPES = [
+    # Currency (must have symbol/code, not just digits)
+    ("currency", re.compile(r"^(?:[$€£¥]|USD|EUR|GBP|JPY)\s?-?\d{1,3}(?:,?\d{3})*(?:\.\d+)?$")),
+    # Flight number (e.g., EK721, AA145)
+    ("flight_number", re.compile(r"^[A-Z]{2}\d{2,4}$")),
+    ("email", re.compile(r"^[\w\.-]+@[\w\.-]+\.\w+$")),
+    ("url", re.compile(r"^https?://[^\s/$.?#].[^\s]*$")),
+    # Phone number (basic international + local)
+    ("phone_number", re.compile(r"^\+?\d{7,15}$")),
+]
+
+# Only values that look like a date are handed to the date checks
+DATE_HINT_PATTERN = re.compile(
+    r"[\-/:\s]|(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)", re.I
+)
+# dateparser's language auto-detection is ~15x slower than a fixed language list
+DATEPARSER_LANGUAGES = ["en"]
+
+_dateparser = None
+
+_DATE_CANDIDATE = "date?"
 
 
 def detect_field_type(value: any) -> str:
@@ -12,89 +49,145 @@ def detect_field_type(value: any) -> str:
     if isinstance(value, (datetime.date, datetime.datetime, pd.Timestamp)):
         return "date"
 
-    val_str = str(value).strip()
-
-    # Boolean check
-    if val_str.lower() in ["true", "false", "yes", "no", "0", "1"]:
-        return "boolean"
-
-    # Currency check (must have symbol/code, not just digits)
-    currency_pattern = re.compile(
-        r"^(?:[$€£¥]|USD|EUR|GBP|JPY)\s?-?\d{1,3}(?:,?\d{3})*(?:\.\d+)?$"
-    )
-    if currency_pattern.match(val_str):
-        return "currency"
-
-    # Flight number check (e.g., EK721, AA145)
-    if re.match(r"^[A-Z]{2}\d{2,4}$", val_str):
-        return "flight_number"
-
-    # Email check
-    if re.match(r"^[\w\.-]+@[\w\.-]+\.\w+$", val_str):
-        return "email"
+    return detect_field_types(pd.Series([str(value)], dtype=object)).iloc[0]
+
+
+def detect_field_types(values: pd.Series) -> pd.Series:
+    """
+    Batched detect_field_type: classify every value of a Series of strings
+    with vectorized pattern matches and numeric/date coercion masks.
+    """
+    types = _classify(values)
+    for position in np.flatnonzero(types == _DATE_CANDIDATE):
+        types[position] = _dateparser_type(values.iloc[position])
+    return pd.Series(types, index=values.index, dtype=object)
+
+
+def _classify(values: pd.Series) -> np.ndarray:
+    """
+    Per-value types for a Series of strings. Values that only dateparser could
+    decide are left as _DATE_CANDIDATE so callers can resolve them lazily.
+    """
+    text = values.astype(str).str.strip().to_numpy(dtype=object)
+    types = np.full(len(text), "string", dtype=object)
+    undecided = np.ones(len(text), dtype=bool)
+
+    def check(name, matcher):
+        pending = np.flatnonzero(undecided)
+        if len(pending) == 0:
+            return
+        hits = pending[matcher(pd.Series(text[pending], dtype=object))]
+        types[hits] = name
+        undecided[hits] = False
+
+    check("boolean", lambda s: s.str.lower().isin(BOOLEAN_STRINGS).to_numpy())
+    for name, pattern in PATTERN_TYPES:
+        check(name, lambda s: s.str.match(pattern).to_numpy(dtype=bool))
+    check("numeric", _numeric_mask)
+
+    pending = np.flatnonzero(undecided)
+    if len(pending):
+        hinted = pending[pd.Series(text[pending], dtype=object).str.contains(DATE_HINT_PATTERN).to_numpy(dtype=bool)]
+        if len(hinted):
+            parsed = _fixed_format_mask(pd.Series(text[hinted], dtype=object))
+            types[hinted[parsed]] = "date"
+            types[hinted[~parsed]] = _DATE_CANDIDATE
+    return types
+
+
+def _numeric_mask(text: pd.Series) -> np.ndarray:
+    """Values float(v.replace(",", "")) accepts."""
+    cleaned = text.str.replace(",", "", regex=False)
+    mask = pd.to_numeric(cleaned, errors="coerce").notna().to_numpy()
+    mask |= cleaned.str.lower().isin(FLOAT_SPECIALS).to_numpy()
+    # float() also takes digit separators ("1_000") and non-ASCII digits
+    for position in np.flatnonzero(~mask & cleaned.str.contains(r"\d").to_numpy(dtype=bool)):
+        try:
+            float(cleaned.iloc[position])
+            mask[position] = True
+        except ValueError:
+            pass
+    return mask
+
+
+def _fixed_format_mask(text: pd.Series) -> np.ndarray:
+    parsed = np.zeros(len(text), dtype=bool)
+    for date_format in DATE_FORMATS:
+        pending = np.flatnonzero(~parsed)
+        if len(pending) == 0:
+            break
+        converted = pd.to_datetime(text.iloc[pending], format=date_format, errors="coerce")
+        parsed[pending[converted.notna().to_numpy()]] = True
+    return parsed
+
+
+def _load_dateparser():
+    """
+    The dateparser module, imported on first use: loading its language and
+    timezone data takes about 0.4 s, and most columns are
+    typed without it.
+    """
+    global _dateparser
+    if _dateparser is None:
+        import dateparser
+        _dateparser = dateparser
+    return _dateparser
+
+
+def _dateparser_type(value) -> str:
+    parsed = _load_dateparser().parse(str(value).strip(), languages=DATEPARSER_LANGUAGES)
+    return "date" if parsed else "string"
+
+
+def sample_semantic_type(series: pd.Series, sample_size: int = 100) -> str:
+    """Most common per-value type in a sample of the non-null values"""
+    if series.hasnans:
+        series = series.dropna()
+    if series.empty:
+        return "unknown"
 
-    # URL check
-    if re.match(r"^https?://[^\s/$.?#].[^\s]*$", val_str):
-        return "url"
+    samples = series.sample(n=min(sample_size, len(series)), random_state=42).astype(str)
+    types = _classify(samples)
+    counts = Counter(t for t in types if t != _DATE_CANDIDATE)
 
-    # Phone number check (basic international + local)
-    if re.match(r"^\+?\d{7,15}$", val_str):
-        return "phone_number"
+    # dateparser is slow: only ask it about values that could still change the answer
+    candidates = np.flatnonzero(types == _DATE_CANDIDATE)
+    for i, position in enumerate(candidates):
+        if _winner_decided(counts, unresolved=len(candidates) - i):
+            break
+        counts[_dateparser_type(samples.iloc[position])] += 1
 
-    # Numeric check
-    try:
-        float(val_str.replace(",", ""))
-        return "numeric"
-    except ValueError:
-        pass
+    return max(counts, key=counts.get) if counts else "unknown"
 
-    # Date check (only if it looks like a date)
-    date_pattern = re.compile(
-        r"[\-/:\s]|(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)", re.I
-    )
-    if date_pattern.search(val_str):
-        parsed = dateparser.parse(val_str)
-        if parsed:
-            return "date"
 
-    return "string"
+def _winner_decided(counts: Counter, unresolved: int) -> bool:
+    """True when the most common type is the same whether unresolved values all turn out dates or strings."""
+    if not counts:
+        return False
+    as_dates = counts + Counter({"date": unresolved})
+    as_strings = counts + Counter({"string": unresolved})
+    return max(as_dates, key=as_dates.get) == max(as_strings, key=as_strings.get)
 
 
-def infer_column_semantic_type(series: pd.Series, sample_size: int = 100) -> str:
+def infer_column_semantic_type(
+    series: pd.Series, sample_size: int = 100, context: Optional[ColumnContext] = None
+) -> str:
     """Infer the semantic type of a pandas Series by sampling values"""
-    series = series.dropna()
+    context = context or ColumnContext(series)
+    series = context.non_null
     if series.empty:
         return "unknown"
 
-    samples = series.astype(str).sample(
-        n=min(sample_size, len(series)), random_state=42
-    )
-    detected_types = [detect_field_type(v) for v in samples]
-
-    if not detected_types:
-        return "unknown"
-
-    most_common_type = max(set(detected_types), key=detected_types.count)
+    most_common_type = sample_semantic_type(series, sample_size)
 
     # Trust semantic detections first
-    if most_common_type in ["currency", "date", "boolean"]:
+    if most_common_type in TRUSTED_SEMANTIC_TYPES:
         return most_common_type
 
-    # ID detection
-    unique_ratio = series.nunique() / len(series)
-    if unique_ratio > 0.95:
-        # Check for sequential numeric (like 1..N)
-        try:
-            nums = pd.to_numeric(series, errors="coerce").dropna()
-            if len(nums) == len(series):
-                sorted_nums = sorted(nums)
-                if sorted_nums == list(range(int(min(nums)), int(max(nums)) + 1)):
-                    return "id"
-        except Exception:
-            pass
-
-        # Otherwise, still id-like if unique
+    # ID detection: near-unique columns (sequential 1..N or not) are IDs
+    unique_ratio = context.distinct_count / len(series)
+    if unique_ratio > ID_UNIQUE_RATIO:
         return "id"
 
     # ✅ Otherwise, fallback
-    return most_common_type
\ No newline at end of file
+    return most_common_type
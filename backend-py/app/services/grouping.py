@@ -0,0 +1,40 @@
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+# Joins the key values of a multi-column group into its label
+GROUP_LABEL_SEPARATOR = " | "
+
+
+def group_columns(group_by: Optional[Union[str, Sequence[str]]]) -> List[str]:
+    """Group-by columns as a list, from one column name or several."""
+    if not group_by:
+        return []
+    if isinstance(group_by, str):
+        return [group_by]
+    return list(group_by)
+
+
+def group_label(key: Any) -> str:
+    """Result key of one group: str(key), key values joined for several columns."""
+    if isinstance(key, tuple):
+        return GROUP_LABEL_SEPARATOR.join(str(value) for value in key)
+    return str(key)
+
+
+def largest_groups(sizes: pd.Series, max_groups: int) -> np.ndarray:
+    """Positions in `sizes` of the `max_groups` largest groups (all for 0), in their original order."""
+    if not max_groups or len(sizes) <= max_groups:
+        return np.arange(len(sizes))
+    # Stable sort, so equal-sized groups keep their key order
+    return np.sort(np.argsort(-sizes.to_numpy(), kind="stable")[:max_groups])
+
+
+def group_summary(columns: List[str], total_groups: int, returned_groups: int) -> Dict[str, Any]:
+    return {
+        "group_by": columns,
+        "total_groups": total_groups,
+        "returned_groups": returned_groups,
+        "truncated": returned_groups < total_groups,
+    }
@@ -0,0 +1,167 @@
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from . import metrics
+
+# Requests currently tracing allocations; tracemalloc runs while any does
+_tracing_requests = 0
+_tracing_lock = threading.Lock()
+# Highest traced peak cleared by a nested reset, so an enclosing stage still sees it
+_carried_peak = 0
+
+
+def _reset_peak() -> int:
+    """Start a new peak measurement; returns the current traced size as its baseline."""
+    global _carried_peak
+    current, peak = tracemalloc.get_traced_memory()
+    _carried_peak = max(_carried_peak, peak)
+    tracemalloc.reset_peak()
+    return current
+
+
+def _peak_since(baseline: int) -> int:
+    return max(max(tracemalloc.get_traced_memory()[1], _carried_peak) - baseline, 0)
+
+
+class AnalysisProfile:
+    """
+    Timings of one analysis: wall time, rows, bytes and (when
+    `trace_memory`) peak traced allocation per stage, plus a per-step
+    breakdown per column. Everything recorded is also exported to the
+    /metrics histograms.
+
+    With `trace_memory` tracemalloc runs for as long as the profile is
+    open; peaks of requests traced at the same time overlap.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.columns: List[Dict[str, Any]] = []
+        self._started = time.perf_counter()
+
+    def __enter__(self) -> "AnalysisProfile":
+        global _tracing_requests
+        if self.trace_memory:
+            with _tracing_lock:
+                _tracing_requests += 1
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        global _tracing_requests
+        if self.trace_memory:
+            with _tracing_lock:
+                _tracing_requests -= 1
+                if _tracing_requests == 0:
+                    tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name: str, rows: Optional[int] = None, nbytes: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Time the block as stage `name`. The yielded dict can be updated with
+        "rows" / "bytes" known only once the block has run.
+        """
+        global _carried_peak
+        entry: Dict[str, Any] = {}
+        if rows is not None:
+            entry["rows"] = rows
+        if nbytes is not None:
+            entry["bytes"] = nbytes
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            baseline = _reset_peak()
+            _carried_peak = 0
+        start = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry["seconds"] = round(time.perf_counter() - start, 6)
+            if tracing:
+                entry["peak_bytes"] = _peak_since(baseline)
+            self.record(name, **entry)
+
+    def record(self, name: str, seconds: float, **fields: Any) -> None:
+        """Add a stage timed elsewhere."""
+        self.stages[name] = {"seconds": seconds, **fields}
+        observe_stage(name, seconds, **fields)
+
+    def add_column(
+        self,
+        name: str,
+        semantic_type: Optional[str],
+        rows: int,
+        nbytes: int,
+        timings: Dict[str, float],
+        peak_bytes: Optional[int] = None,
+    ) -> None:
+        entry = {
+            "name": name,
+            "semantic_type": semantic_type,
+            "rows": rows,
+            "bytes": nbytes,
+            "seconds": round(sum(timings.values()), 6),
+            "steps": {step: round(seconds, 6) for step, seconds in timings.items()},
+        }
+        if peak_bytes is not None:
+            entry["peak_bytes"] = peak_bytes
+        self.columns.append(entry)
+        for step, seconds in timings.items():
+            metrics.column_seconds.observe(seconds, step=step, semantic_type=semantic_type or "unknown")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total_seconds": round(time.perf_counter() - self._started, 6),
+            "stages": self.stages,
+            "columns": self.columns,
+        }
+
+
+class StepTimer:
+    """Per-step wall times of one column, and its peak traced allocation if tracemalloc is on."""
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+        self._baseline = _reset_peak() if tracemalloc.is_tracing() else None
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - start
+
+    def peak_bytes(self) -> Optional[int]:
+        if self._baseline is None or not tracemalloc.is_tracing():
+            return None
+        return max(tracemalloc.get_traced_memory()[1] - self._baseline, 0)
+
+
+def observe_stage(name: str, seconds: float, rows: Optional[int] = None, bytes: Optional[int] = None,
+                  peak_bytes: Optional[int] = None) -> None:
+    """Export one stage timing to /metrics."""
+    metrics.stage_seconds.observe(seconds, stage=name)
+    if rows is not None:
+        metrics.rows_processed.inc(rows, stage=name)
+    if bytes is not None:
+        metrics.bytes_processed.inc(bytes, stage=name)
+    if peak_bytes is not None:
+        metrics.stage_peak_bytes.observe(peak_bytes, stage=name)
+
+
+def timed_iter(chunks: Iterator[bytes], stage: str) -> Iterator[bytes]:
+    """Pass `chunks` through, exporting the time spent producing them as `stage`."""
+    elapsed, sent = 0.0, 0
+    start = time.perf_counter()
+    for chunk in chunks:
+        elapsed += time.perf_counter() - start
+        sent += len(chunk)
+        yield chunk
+        start = time.perf_counter()
+    elapsed += time.perf_counter() - start
+    observe_stage(stage, elapsed, bytes=sent)
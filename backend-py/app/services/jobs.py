@@ -0,0 +1,149 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from ..config import settings
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class JobQueueFullError(Exception):
+    """Raised by JobManager.submit when the queue is at its depth limit."""
+
+
+class Job:
+    """One background analysis: its state, progress and eventual result or error."""
+
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.status = QUEUED
+        self.progress: Dict[str, Any] = {}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow().isoformat()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.finished_monotonic: Optional[float] = None
+
+    def update_progress(self, **fields: Any) -> None:
+        self.progress = {**self.progress, **fields}
+
+    @property
+    def done(self) -> bool:
+        return self.status in (COMPLETED, FAILED)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "analysis_id": self.id,
+            "status": self.status,
+            "progress": self.progress,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """
+    Runs analyses on a bounded thread pool, off the event loop.
+
+    At most `workers` jobs run at once and at most `queue_limit` more wait;
+    submitting beyond that raises JobQueueFullError. Finished jobs are kept
+    for `retention_seconds` so their status and result can be polled.
+    """
+
+    def __init__(self, workers: int, queue_limit: int, retention_seconds: int):
+        self.workers = max(workers, 1)
+        self.queue_limit = max(queue_limit, 0)
+        self.retention_seconds = retention_seconds
+        self._jobs: Dict[str, Job] = {}
+        self._active = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def submit(self, work: Callable[[Job], Dict[str, Any]], job_id: Optional[str] = None) -> Job:
+        """Queue `work(job)`; its return value becomes the job's result."""
+        job = Job(job_id or str(uuid.uuid4()))
+        with self._lock:
+            self._prune()
+            if self._active >= self.workers + self.queue_limit:
+                raise JobQueueFullError(
+                    f"Analysis queue is full ({self._active} jobs pending); retry later"
+                )
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="analysis-job")
+            self._active += 1
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, work)
+        return job
+
+    def add_completed(self, result: Dict[str, Any], job_id: str) -> Job:
+        """Register an already available result (e.g. a cache hit) as a finished job."""
+        job = Job(job_id)
+        job.result = result
+        self._finish(job, COMPLETED)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "active": self._active,
+                "tracked": len(self._jobs),
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: Job, work: Callable[[Job], Dict[str, Any]]) -> None:
+        job.status = RUNNING
+        job.started_at = datetime.utcnow().isoformat()
+        try:
+            job.result = work(job)
+            self._finish(job, COMPLETED)
+        except Exception as e:
+            job.error = str(getattr(e, "detail", e))
+            self._finish(job, FAILED)
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    @staticmethod
+    def _finish(job: Job, status: str) -> None:
+        job.finished_at = datetime.utcnow().isoformat()
+        job.finished_monotonic = time.monotonic()
+        job.status = status
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - self.retention_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.done and job.finished_monotonic < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+job_manager = JobManager(
+    workers=settings.job_workers,
+    queue_limit=settings.job_queue_limit,
+    retention_seconds=settings.job_retention_seconds,
+)
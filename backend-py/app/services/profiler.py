@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, Optional, Tuple
+
+
+def profile_column(series: pd.Series, top_k: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Duplicate + frequency profile of a column from a single factorization.
+
+    The column is hashed once into (codes, uniques); every statistic of the
+    profile is then read off the per-code counts instead of rescanning the data.
+    """
+    uniques, counts = count_values(series)
+    return profile_from_counts(uniques, counts, len(series), top_k)
+
+
+def count_values(series: pd.Series) -> Tuple[pd.Index, np.ndarray]:
+    """(distinct values, counts) in order of first appearance, NaN included."""
+    _, uniques, counts = _factorize_with_counts(series)
+    return uniques, counts
+
+
+def profile_from_counts(
+    uniques: pd.Index,
+    counts: np.ndarray,
+    total: int,
+    top_k: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Build the duplicate/frequency profile from a value -> count table.
+
+    `uniques` holds each distinct value (NaN included) in order of first
+    appearance and `counts` the number of occurrences of each.
+
+    With `top_k`, `unique_values` and `value_distribution` only list the
+    `top_k` most frequent values; the rest are summarized in
+    `value_distribution_other` (how many distinct values, how many rows).
+    """
+    na_mask = np.asarray(uniques.isna())
+    missing = int(counts[na_mask].sum())
+    observed_counts = counts[~na_mask]
+    observed = uniques[~na_mask]
+
+    # Every distinct value (NaN included) keeps one occurrence; the rest are duplicates
+    distinct_total = int(np.count_nonzero(counts))
+    duplicate_count = total - distinct_total
+
+    most_common_count = int(observed_counts.max()) if len(observed_counts) and observed_counts.max() > 0 else 0
+
+    order = frequency_order(counts)
+    listed = order[:top_k] if top_k and top_k < len(order) else order
+    in_listing = np.zeros(len(counts), dtype=bool)
+    in_listing[listed] = True
+    listed_observed = in_listing[~na_mask] & (observed_counts > 0)
+
+    profile = {
+        "duplicate_count": duplicate_count,
+        "unique_count": int(np.count_nonzero(observed_counts)),
+        "duplicate_percentage": (duplicate_count / total) * 100 if total else 0,
+        "most_common_value": most_common_value(observed, observed_counts, most_common_count),
+        "most_common_count": most_common_count,
+        "unique_values": observed[listed_observed].tolist(),
+        "value_distribution": pd.Series(counts[listed], index=uniques[listed]).to_dict(),
+        "missing_values": missing,
+    }
+    if len(listed) < len(order):
+        other = order[len(listed):]
+        profile["value_distribution_other"] = {"distinct_values": len(other), "count": int(counts[other].sum())}
+    return profile
+
+
+def frequency_order(counts: np.ndarray) -> np.ndarray:
+    """Positions of `counts` from most to least frequent, tie-broken like Series.value_counts()."""
+    return pd.Series(counts).sort_values(ascending=False).index.to_numpy()
+
+
+def _factorize_with_counts(series: pd.Series):
+    """Return (codes, uniques, counts); NaN is kept as its own unique value."""
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    uniques = pd.Index(uniques)
+    counts = np.bincount(codes, minlength=len(uniques))
+
+    na_positions = np.flatnonzero(uniques.isna())
+    if len(na_positions) and series.dtype == object:
+        # value_counts keeps the original missing marker (None vs NaN) as the key
+        first_missing = int(np.argmax(codes == na_positions[0]))
+        uniques = uniques.astype(object)
+        values = uniques.to_numpy(copy=True)
+        values[na_positions[0]] = series.iloc[first_missing]
+        uniques = pd.Index(values, dtype=object, tupleize_cols=False)
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # value_counts also reports categories that never occur
+        unused = series.cat.categories.difference(uniques.dropna())
+        if len(unused):
+            uniques = uniques.append(pd.Index(unused))
+            counts = np.concatenate([counts, np.zeros(len(unused), dtype=counts.dtype)])
+    return codes, uniques, counts
+
+
+def most_common_value(observed: pd.Index, observed_counts: np.ndarray, top_count: int) -> Any:
+    """The value Series.mode().iloc[0] would return, given the non-null value counts."""
+    if top_count == 0:
+        return None
+    candidates = observed[observed_counts == top_count]
+    # Series.mode() returns ties sorted; fall back to appearance order when unorderable
+    try:
+        candidates = candidates.sort_values()
+    except TypeError:
+        pass
+    return candidates[0]
+
@@ -0,0 +1,134 @@
+"""
+Worker start-up: warm-up and readiness.
+
+A fresh worker pays one-off costs on its first requests: dateparser's
+language and timezone data, pandas' and pyarrow's lazily loaded kernels,
+compiling the detection patterns. warm_up() pays them before traffic by
+analyzing a small built-in CSV, and /health reports the worker ready only
+once it has run.
+"""
+import io
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+from ..config import settings
+from .jobs import job_manager
+from .metrics import stage_seconds
+
+logger = logging.getLogger(__name__)
+
+# One column per semantic type, so every analyzer and detection path runs once
+WARMUP_CSV = (
+    b"id,amount,price,active,signup,seen_at,city,email,flight\n"
+    b"1,10.5,$12.50,true,2024-03-12,12/03/2024 08:15,Nairobi,a@example.com,EK721\n"
+    b"2,7.25,$8.00,false,2024-03-13,13/03/2024 09:30,Mombasa,b@example.com,AA145\n"
+    b"3,3.0,$120.00,true,2024-03-14,14/03/2024 17:45,Nairobi,c@example.com,EK722\n"
+    b"4,,$4.75,false,2024-03-15,15/03/2024 23:05,Kisumu,d@example.com,KQ100\n"
+)
+# Free-form dates only dateparser reads
+WARMUP_DATES = ["12 March 2024", "March 13, 2024 5pm"]
+
+
+class Readiness:
+    """Whether this worker has finished starting up, and what the warm-up cost."""
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.warmed_up = False
+        self.warmup_seconds: Optional[float] = None
+        self.steps: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+
+    def skip_warm_up(self) -> None:
+        self.warmed_up = True
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "ok": self.warmed_up,
+            "seconds": self.warmup_seconds,
+            "steps": dict(self.steps),
+            "errors": dict(self.errors),
+        }
+
+
+readiness = Readiness()
+
+
+def warm_up(state: Readiness = readiness) -> Dict[str, float]:
+    """
+    Run each warm-up step once and mark `state` warmed up; returns seconds
+    per step. A failing step is logged and recorded but does not keep the
+    worker from becoming ready: it only makes a first request slower.
+    """
+    from ..utils import dumps, read_csv_file
+    from .analysis_service import analyze_dataframe
+    from .field_detector import _dateparser_type
+
+    frame = None
+
+    def prime_dateparser():
+        for value in WARMUP_DATES:
+            _dateparser_type(value)
+
+    def parse():
+        nonlocal frame
+        frame = read_csv_file(io.BytesIO(WARMUP_CSV))
+
+    def analyze():
+        dumps(analyze_dataframe(frame, group_by_column="city", workers=0))
+
+    steps = [
+        ("dateparser", prime_dateparser),
+        ("parse", parse),
+        ("analysis", analyze),
+    ]
+    start = time.perf_counter()
+    for name, step in steps:
+        _timed_step(state, name, step)
+    state.warmup_seconds = time.perf_counter() - start
+    state.warmed_up = True
+    logger.info("Warm-up finished in %.2f s: %s", state.warmup_seconds, state.steps)
+    return dict(state.steps)
+
+
+def _timed_step(state: Readiness, name: str, step: Callable[[], Any]) -> None:
+    start = time.perf_counter()
+    try:
+        step()
+    except Exception as e:
+        state.errors[name] = str(e)
+        logger.warning("Warm-up step %s failed: %s", name, e)
+    state.steps[name] = time.perf_counter() - start
+    stage_seconds.observe(state.steps[name], stage=f"warmup_{name}")
+
+
+def health(state: Readiness = readiness) -> Dict[str, Any]:
+    """
+    Readiness report for /health: the worker is ready once it is warmed up,
+    its job queue can take another job and the configured directories are
+    usable.
+    """
+    jobs = job_manager.info()
+    checks = {
+        "warmup": state.info(),
+        "jobs": {**jobs, "ok": jobs["active"] < jobs["workers"] + jobs["queue_limit"]},
+    }
+    if settings.cache_dir:
+        checks["cache_dir"] = {"ok": _writable_directory(settings.cache_dir)}
+    if settings.local_data_dir:
+        checks["local_data_dir"] = {"ok": os.path.isdir(settings.local_data_dir)}
+
+    ready = all(check["ok"] for check in checks.values())
+    return {
+        "status": "ready" if ready else "starting" if not state.warmed_up else "unavailable",
+        "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "uptime_seconds": round(time.monotonic() - state.started_at, 3),
+        "checks": checks,
+    }
+
+
+def _writable_directory(path: str) -> bool:
+    return os.path.isdir(path) and os.access(path, os.W_OK)
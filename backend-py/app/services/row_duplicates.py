@@ -0,0 +1,193 @@
+"""
+Row-level duplicates. Every row gets a 64-bit fingerprint combined from
+per-column hashes (pd.util.hash_pandas_object's, combined as it combines
+a frame's columns); rows sharing a fingerprint form a duplicate cluster.
+Rows are hashed in blocks, so besides the fingerprints (8 bytes per row)
+only one block of column hashes is held at a time.
+
+Values compare as df.duplicated() compares them: -0.0 equals 0.0, NaNs
+are equal, and numbers in object columns compare by value (1, 1.0 and True
+are equal, "1" is not). One exception: all missing values are equal, where
+df.duplicated() keeps None, NaN and NA of an object column apart.
+
+Two distinct rows share a fingerprint with probability about n^2 / 2^65,
+negligible at tens of millions of rows.
+"""
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..config import settings
+
+# Rows hashed at a time
+FINGERPRINT_BLOCK_ROWS = 1 << 20
+# Leading values of a text block used to decide whether hashing its distinct values first pays off
+CATEGORIZE_SAMPLE_ROWS = 10_000
+CATEGORIZE_MAX_RATIO = 0.5
+# Rows of each cluster shown with their values
+CLUSTER_EXAMPLES = 3
+
+# "whitespace": text compared after trimming and collapsing runs of whitespace; "text": also ignoring case
+NORMALIZATIONS = ("none", "whitespace", "text")
+_WHITESPACE_RUN = r"\s+"
+
+# Hash of every missing value, the one hash_pandas_object gives None and NaN in object columns
+_MISSING_HASH = np.uint64(np.iinfo(np.uint64).max)
+# Prefix of the text standing for a non-string value of an object column, keeping it apart from strings
+# (not NUL: strings are hashed up to their first NUL)
+_VALUE_TAG = "\x1f"
+
+# pandas' combine_hash_arrays, as hash_pandas_object(df, index=False) combines the columns
+_HASH_SEED = np.uint64(0x345678)
+_HASH_MULTIPLIER = np.uint64(1000003)
+_HASH_FINAL = np.uint64(97531)
+
+
+def row_fingerprints(
+    df: pd.DataFrame,
+    subset: Optional[Sequence[str]] = None,
+    normalize: str = "none",
+) -> np.ndarray:
+    """uint64 fingerprint per row of `df`, over the `subset` columns (all by default)."""
+    columns = list(subset) if subset else list(df.columns)
+    fingerprints = np.empty(len(df), dtype=np.uint64)
+    for start in range(0, len(df), FINGERPRINT_BLOCK_ROWS):
+        stop = min(start + FINGERPRINT_BLOCK_ROWS, len(df))
+        block = fingerprints[start:stop]
+        block[:] = _HASH_SEED
+        multiplier = _HASH_MULTIPLIER
+        for i, column in enumerate(columns):
+            block ^= _column_hashes(_normalized(df[column].iloc[start:stop], normalize))
+            block *= multiplier
+            inverse = len(columns) - i
+            multiplier += np.uint64(82520 + inverse + inverse)
+        block += _HASH_FINAL
+    return fingerprints
+
+
+def _column_hashes(values: pd.Series) -> np.ndarray:
+    categorize = False
+    if values.dtype == object or isinstance(values.dtype, pd.StringDtype):
+        if values.dtype == object and pd.api.types.infer_dtype(values, skipna=True) not in ("string", "empty"):
+            # hash_pandas_object hashes str() of other values, which would make 1 equal "1"
+            values = values.map(_value_key)
+        # Hashing each distinct string once only pays off when values repeat
+        head = values.iloc[:CATEGORIZE_SAMPLE_ROWS]
+        categorize = head.nunique(dropna=False) < len(head) * CATEGORIZE_MAX_RATIO
+    elif values.dtype.kind == "f":
+        # Floats are hashed by their bits: -0.0 + 0.0 is 0.0
+        values = values + 0.0
+    hashes = pd.util.hash_pandas_object(values, index=False, categorize=categorize).to_numpy()
+    missing = values.isna().to_numpy()
+    if missing.any():
+        # NaNs of either sign, NaT and NA alike
+        hashes[missing] = _MISSING_HASH
+    return hashes
+
+
+def _value_key(value: Any) -> Any:
+    """
+    A value of a mixed object column as text equal to another value's text
+    exactly when the values are equal: strings as they are, numbers by
+    value, anything else by type and str(); missing values stay missing.
+    """
+    if isinstance(value, str) or value is None:
+        return value
+    if isinstance(value, (bool, int, np.bool_, np.integer)):
+        return f"{_VALUE_TAG}number:{int(value)}"
+    if isinstance(value, (float, np.floating)):
+        number = float(value)
+        if number != number:
+            return None
+        return f"{_VALUE_TAG}number:{int(number) if number.is_integer() else repr(number)}"
+    if value is pd.NA or value is pd.NaT:
+        return None
+    return f"{_VALUE_TAG}{type(value).__name__}:{value}"
+
+
+def _normalized(values: pd.Series, normalize: str) -> pd.Series:
+    """Text values trimmed with whitespace runs collapsed (and lowercased for "text"); other values as they are."""
+    if normalize == "none":
+        return values
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype(object)
+    elif not (values.dtype == object or isinstance(values.dtype, pd.StringDtype)):
+        return values
+    normalized = values.str.strip().str.replace(_WHITESPACE_RUN, " ", regex=True)
+    if normalize == "text":
+        normalized = normalized.str.lower()
+    if values.dtype == object:
+        # .str gives NaN for the non-string values of mixed columns: keep those as they were
+        normalized = normalized.where(normalized.notna(), values)
+    return normalized
+
+
+def duplicated_mask(fingerprints: np.ndarray) -> np.ndarray:
+    """Rows repeating an earlier row, as df.duplicated() marks them (see the module docstring for how values compare)."""
+    return pd.Series(fingerprints, copy=False).duplicated(keep="first").to_numpy()
+
+
+def duplicate_rows(
+    df: pd.DataFrame,
+    subset: Optional[Sequence[str]] = None,
+    normalize: str = "none",
+    fingerprints: Optional[np.ndarray] = None,
+    max_clusters: Optional[int] = None,
+    cluster_rows: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Clusters of rows equal on the `subset` columns (all by default), after
+    `normalize` (see NORMALIZATIONS). Lists the `max_clusters` largest
+    clusters (settings.duplicate_max_clusters by default, 0 for all), each
+    with the 0-based positions of its first `cluster_rows` rows
+    (settings.duplicate_cluster_rows, 0 for all) and the key values of its
+    first CLUSTER_EXAMPLES rows. `fingerprints` may be passed when already
+    computed with the same subset and normalization.
+    """
+    columns = list(subset) if subset else list(df.columns)
+    missing = [column for column in columns if column not in df.columns]
+    if missing:
+        return {"error": f"Unknown columns: {', '.join(map(str, missing))}"}
+    if normalize not in NORMALIZATIONS:
+        return {"error": f"Unknown normalization: {normalize}"}
+    max_clusters = settings.duplicate_max_clusters if max_clusters is None else max_clusters
+    cluster_rows = settings.duplicate_cluster_rows if cluster_rows is None else cluster_rows
+    if fingerprints is None:
+        fingerprints = row_fingerprints(df, columns, normalize)
+
+    # Only rows in some cluster are sorted; a stable sort keeps each cluster's rows in file order
+    rows = np.flatnonzero(pd.Series(fingerprints, copy=False).duplicated(keep=False).to_numpy())
+    rows = rows[np.argsort(fingerprints[rows], kind="stable")]
+    keys = fingerprints[rows]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(rows) else np.empty(0, dtype=np.int64)
+    sizes = np.diff(np.r_[starts, len(rows)])
+
+    # Largest first, ties in order of first occurrence
+    order = np.lexsort((rows[starts], -sizes))
+    if max_clusters:
+        order = order[:max_clusters]
+    members = [rows[starts[cluster]:starts[cluster] + sizes[cluster]] for cluster in order]
+    # The example rows of all listed clusters are taken from the frame at once
+    shown = [cluster[:CLUSTER_EXAMPLES] for cluster in members]
+    examples = df.iloc[np.concatenate(shown)][columns].to_dict("records") if shown else []
+    clusters = []
+    offset = 0
+    for cluster, cluster_members, cluster_shown in zip(order, members, shown):
+        clusters.append({
+            "size": int(sizes[cluster]),
+            "rows": (cluster_members[:cluster_rows] if cluster_rows else cluster_members).tolist(),
+            "examples": examples[offset:offset + len(cluster_shown)],
+        })
+        offset += len(cluster_shown)
+
+    return {
+        "columns": columns,
+        "normalize": normalize,
+        "duplicate_count": len(rows) - len(starts),
+        "duplicated_rows": len(rows),
+        "cluster_count": len(starts),
+        "returned_clusters": len(clusters),
+        "truncated": len(clusters) < len(starts),
+        "clusters": clusters,
+    }
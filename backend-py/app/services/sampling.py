@@ -0,0 +1,421 @@
+"""
+Statistically sized row samples. sample_size(margin) rows estimate any
+proportion to within +/- margin at CONFIDENCE; the rows are drawn with a
+reservoir while the file streams past, so a sampled analysis costs one scan
+of the file's bytes plus the analysis of a fixed number of rows, whatever
+the file size.
+
+Plain CSV lines are sampled without being parsed; CSVs with quoted values
+spanning lines, and columnar files, are sampled from parsed chunks. The
+analyzers run on the sample as they would on the whole file and
+confidence_intervals adds intervals for means, per-row percentages and
+quartiles. Counts in the result are counts in the sample.
+
+A duplicate is only seen when both of its rows are sampled, so duplicate and
+distinct-value statistics of a sample are biased, not just noisy, and get no
+interval: duplicate percentages are re-estimated from the sample's
+frequency-of-frequencies, and distinct counts are marked as lower bounds.
+"""
+import io
+import math
+from contextlib import closing
+from statistics import NormalDist
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..config import settings
+from ..utils.file_handlers import COLUMNAR_FORMATS, detect_encoding, iter_table_chunks, open_csv, read_csv_file
+from ..utils.strings import as_strings, compact_strings
+from .column_context import ColumnContext
+from .profiler import count_values
+from .streaming import CHUNK_BUDGET_SHARE
+
+CONFIDENCE = 0.95
+# Bytes of CSV scanned for line breaks at a time
+SCAN_BLOCK_BYTES = 8 * 1024 * 1024
+# Quartiles reported by the numeric analyzers and summaries
+QUARTILES = {"median": 0.5, "q1": 0.25, "q3": 0.75}
+# Distinct-value counts per analysis type; a sample only sees some of the file's values
+DISTINCT_COUNT_FIELDS = {
+    "numeric": ["unique_values"],
+    "currency": ["unique_values"],
+    "string": ["unique_values"],
+    "id": ["unique_count"],
+}
+
+_NEWLINE = ord("\n")
+_QUOTE = ord('"')
+
+
+def sample_size(margin: float, confidence: float = CONFIDENCE) -> int:
+    """Rows for a proportion estimate within +/- `margin` (a fraction) at `confidence`, whatever the proportion."""
+    z = _z(confidence)
+    return math.ceil(z * z * 0.25 / (margin * margin))
+
+
+def _z(confidence: float) -> float:
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+class Reservoir:
+    """
+    Uniform sample of `size` items from a stream of unknown length
+    (Li's Algorithm L). Once the reservoir is full the gap to the next
+    replacement is drawn directly, so the work grows with the number of
+    replacements, about size * log(seen / size), not with the stream.
+    """
+
+    def __init__(self, size: int, seed: Optional[int] = None):
+        self.size = size
+        self.seen = 0
+        self.rng = np.random.default_rng(seed)
+        self._weight = math.exp(math.log(1.0 - self.rng.random()) / size)
+        # Stream index of the next item taken once the reservoir is full
+        self._next = size + int(math.log(1.0 - self.rng.random()) / math.log1p(-self._weight))
+
+    def take(self, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Offer the next `count` items: (positions among them, reservoir slots)
+        of those taken, in stream order. A later item may take the slot of an
+        earlier one in the same call.
+        """
+        start, end = self.seen, self.seen + count
+        filled = max(min(end, self.size) - start, 0)
+        positions = [np.arange(filled, dtype=np.int64)]
+        while self._next < end:
+            nexts, weights = self._replacements(end)
+            # All but the last of a batch falling before `end` are taken, and drawing goes on from there
+            taken = min(int(np.searchsorted(nexts, end)), len(nexts) - 1)
+            positions.append(nexts[:taken] - start)
+            self._next, self._weight = int(nexts[taken]), float(weights[taken])
+        replaced = sum(len(chunk) for chunk in positions) - filled
+        slots = np.concatenate([np.arange(start, start + filled), self.rng.integers(self.size, size=replaced)])
+        self.seen = end
+        return np.concatenate(positions), slots.astype(np.int64)
+
+    def _replacements(self, end: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Stream indices of the coming replacements, the first being
+        self._next, and the weight each one's gap was drawn with: a batch of
+        about as many as fall before `end`. Weights shrink by independent
+        factors, so they and the gaps are drawn as cumulative products and sums.
+        """
+        expected = self.size * math.log(max(end, self._next + 1) / max(self._next, 1))
+        batch = int(min(max(expected * 1.2, 64), 1 << 20))
+        uniforms = 1.0 - self.rng.random((2, batch))
+        weights = self._weight * np.exp(np.cumsum(np.log(uniforms[0]) / self.size))
+        gaps = np.floor(np.log(uniforms[1]) / np.log1p(-weights)).astype(np.int64)
+        nexts = self._next + np.concatenate([[0], np.cumsum(gaps + 1)])
+        return nexts, np.concatenate([[self._weight], weights])
+
+
+class RowSample:
+    """A uniform sample of a file's rows, in file order, with their 0-based positions in the file."""
+
+    def __init__(self, frame: pd.DataFrame, rows: np.ndarray, total_rows: int, margin: float, method: str):
+        self.frame = frame
+        self.rows = rows
+        self.total_rows = total_rows
+        self.margin = margin
+        self.method = method
+
+    @property
+    def complete(self) -> bool:
+        """Whether every row was sampled, so the analysis is exact."""
+        return len(self.frame) >= self.total_rows
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "rows": len(self.frame),
+            "total_rows": self.total_rows,
+            "fraction": len(self.frame) / self.total_rows if self.total_rows else 1.0,
+            "margin": self.margin,
+            "confidence": CONFIDENCE,
+            "method": self.method,
+        }
+
+
+def sample_table(
+    fileobj,
+    margin: float,
+    file_format: str = "csv",
+    columns: Optional[List[str]] = None,
+    seed: Optional[int] = None,
+) -> RowSample:
+    """
+    Reservoir sample of sample_size(margin) rows of a data file object (all
+    of them if the file is smaller), reading only `columns` if given.
+    """
+    size = sample_size(margin)
+    if file_format not in COLUMNAR_FORMATS:
+        reservoir = Reservoir(size, seed)
+        sampled = _sample_lines(open_csv(fileobj, file_format), reservoir)
+        if sampled is not None:
+            body, rows = sampled
+            frame = read_csv_file(io.BytesIO(body), "csv", columns)
+            return RowSample(frame, rows, reservoir.seen, margin, "lines")
+
+    encoding = "utf-8" if file_format in COLUMNAR_FORMATS else detect_encoding(fileobj, file_format=file_format)
+    try:
+        frame, rows, total_rows = _sample_chunks(fileobj, Reservoir(size, seed), encoding, file_format, columns)
+    except UnicodeDecodeError:
+        if encoding == "latin-1":
+            raise
+        frame, rows, total_rows = _sample_chunks(fileobj, Reservoir(size, seed), "latin-1", file_format, columns)
+    return RowSample(frame, rows, total_rows, margin, "chunks")
+
+
+def _sample_lines(stream, reservoir: Reservoir) -> Optional[Tuple[bytes, np.ndarray]]:
+    """
+    Sample the data lines of a CSV byte stream without parsing them:
+    (header and sampled lines in file order, their row positions). None if
+    a quoted value spans lines, so lines are not rows.
+    """
+    header = stream.readline()
+    if header.count(b'"') % 2:
+        return None
+    lines: List[Optional[bytes]] = [None] * reservoir.size
+    rows = np.zeros(reservoir.size, dtype=np.int64)
+
+    def keep(buffer: bytes, starts: np.ndarray, ends: np.ndarray) -> None:
+        first_row = reservoir.seen
+        positions, slots = reservoir.take(len(ends))
+        for position, slot in zip(positions.tolist(), slots.tolist()):
+            lines[slot] = buffer[starts[position]:ends[position]]
+            rows[slot] = first_row + position
+
+    tail = b""
+    for block in iter(lambda: stream.read(SCAN_BLOCK_BYTES), b""):
+        buffer = tail + block if tail else block
+        data = np.frombuffer(buffer, dtype=np.uint8)
+        ends = np.flatnonzero(data == _NEWLINE) + 1
+        if len(ends) == 0:
+            tail = buffer
+            continue
+        if _splits_quotes(buffer, data, ends):
+            return None
+        keep(buffer, np.r_[0, ends[:-1]], ends)
+        tail = buffer[ends[-1]:]
+    if tail.strip():
+        # Last line without a line break
+        if tail.count(b'"') % 2:
+            return None
+        tail += b"\n"
+        keep(tail, np.zeros(1, dtype=np.int64), np.array([len(tail)]))
+
+    taken = min(reservoir.seen, reservoir.size)
+    # Blank lines are not rows to the parser; leave them out so rows stay aligned with the sample
+    order = [slot for slot in np.argsort(rows[:taken], kind="stable").tolist() if lines[slot].strip()]
+    body = b"".join([header if header.endswith(b"\n") else header + b"\n", *(lines[slot] for slot in order)])
+    return body, rows[order]
+
+
+def _splits_quotes(buffer: bytes, data: np.ndarray, ends: np.ndarray) -> bool:
+    """Whether any complete line in `buffer` has an odd number of quotes, i.e. a quoted value continues on the next line."""
+    if buffer.count(b'"', 0, ends[-1]) == 0:
+        return False
+    quotes = np.flatnonzero(data[:ends[-1]] == _QUOTE)
+    # Quotes before each line end, then per line
+    per_line = np.diff(np.searchsorted(quotes, ends), prepend=0)
+    return bool((per_line % 2).any())
+
+
+def _sample_chunks(
+    fileobj,
+    reservoir: Reservoir,
+    encoding: str,
+    file_format: str,
+    columns: Optional[List[str]],
+) -> Tuple[pd.DataFrame, np.ndarray, int]:
+    """Sample parsed rows chunk by chunk: (sample in file order, row positions, total rows)."""
+    chunks: Iterator[pd.DataFrame] = iter_table_chunks(
+        fileobj,
+        chunk_budget_bytes=int(settings.stream_memory_budget_mb * 1024 * 1024 * CHUNK_BUDGET_SHARE),
+        encoding=encoding,
+        probe_rows=settings.stream_probe_rows,
+        file_format=file_format,
+        columns=columns,
+    )
+    # Row position held by each slot; rows taken earlier and since replaced are dropped now and then
+    occupants = np.full(reservoir.size, -1, dtype=np.int64)
+    pieces: List[pd.DataFrame] = []
+    kept = 0
+    with closing(chunks):
+        for chunk in chunks:
+            first_row = reservoir.seen
+            positions, slots = reservoir.take(len(chunk))
+            if len(positions) == 0:
+                continue
+            # Of several items taken into one slot, the last stays
+            _, last = np.unique(slots[::-1], return_index=True)
+            latest = len(slots) - 1 - last
+            positions, slots = positions[latest], slots[latest]
+            occupants[slots] = first_row + positions
+            piece = chunk.iloc[np.sort(positions)]
+            piece.index = first_row + np.sort(positions)
+            pieces.append(piece)
+            kept += len(piece)
+            if kept > 2 * reservoir.size:
+                pieces = [_current(pieces, occupants)]
+                kept = len(pieces[0])
+    if not pieces:
+        return pd.DataFrame(), np.zeros(0, dtype=np.int64), reservoir.seen
+    frame = _current(pieces, occupants)
+    rows = frame.index.to_numpy()
+    return compact_strings(frame.reset_index(drop=True)), rows, reservoir.seen
+
+
+def _current(pieces: List[pd.DataFrame], occupants: np.ndarray) -> pd.DataFrame:
+    frame = pd.concat(pieces) if len(pieces) > 1 else pieces[0]
+    return frame[frame.index.isin(occupants)]
+
+
+def add_sampling(results: Dict[str, Any], sample: RowSample) -> Dict[str, Any]:
+    """
+    Turn analyze_dataframe's result for `sample.frame` into a sampled
+    analysis: the `sampling` block, the file's row count, duplicate rows by
+    their position in the file and, unless every row was sampled, the
+    confidence intervals.
+    """
+    results["sampling"] = sample.describe()
+    results["metadata"]["total_rows"] = sample.total_rows
+    for cluster in results.get("row_duplicates", {}).get("clusters", []):
+        cluster["rows"] = sample.rows[cluster["rows"]].tolist()
+    if not sample.complete:
+        confidence_intervals(results, sample.frame, sample.total_rows)
+    return results
+
+
+def confidence_intervals(results: Dict[str, Any], df: pd.DataFrame, total_rows: int) -> None:
+    """
+    Mark the estimates in an analysis of the sample `df` approximate and give
+    their CONFIDENCE intervals as error_bounds: means from the standard
+    error, per-row percentages as Wilson score intervals, quartiles from the
+    ranks of order statistics. All include the finite population correction
+    for a file of `total_rows` rows.
+
+    Duplicate percentages are replaced by estimate_duplicate_percentage's,
+    without an interval, and distinct counts are listed in
+    sample_lower_bounds.
+    """
+    n = len(df)
+    if n == 0:
+        return
+    # A sample of n rows out of N: the standard errors shrink by sqrt((N - n) / (N - 1))
+    z = _z(CONFIDENCE) * math.sqrt(max(total_rows - n, 0) / max(total_rows - 1, 1))
+
+    for column, profile in results["duplicate_analysis"].items():
+        _, counts = count_values(df[column])
+        estimate = estimate_duplicate_percentage(counts, total_rows)
+        profile["approximate"] = True
+        profile["estimates"] = {"duplicate_percentage": {**estimate, "sample_value": profile["duplicate_percentage"]}}
+        profile["duplicate_percentage"] = estimate["value"]
+        profile["sample_lower_bounds"] = ["unique_count"]
+    results["data_quality"]["sample_lower_bounds"] = ["complete_duplicates_count"]
+
+    for entry in results["columns"]:
+        analysis = entry["analysis"]
+        if not analysis or "error" in analysis:
+            continue
+        bounds = {}
+        if entry["type"] in DISTINCT_COUNT_FIELDS:
+            analysis["sample_lower_bounds"] = DISTINCT_COUNT_FIELDS[entry["type"]]
+        if entry["type"] in ("numeric", "currency"):
+            values = _sorted_values(df[entry["name"]], entry["type"])
+            bounds["mean"] = _mean_interval(analysis["mean"], analysis["std_dev"], analysis["count"], z)
+            bounds.update(_quantile_intervals(values, z))
+            if "outlier_percentage" in analysis:
+                bounds["outlier_percentage"] = _percentage_interval(analysis["outlier_percentage"], analysis["count"], z)
+        elif entry["type"] == "boolean":
+            bounds["true_percentage"] = _percentage_interval(analysis["true_percentage"], analysis["count"], z)
+        _attach(analysis, bounds)
+
+    for column, summary in results["numerical_analysis"].items():
+        values = ColumnContext(df[column]).sorted_numbers
+        if len(values) == 0:
+            continue
+        bounds = {"mean": _mean_interval(summary["mean"], summary["std"], len(values), z)}
+        bounds.update(_quantile_intervals(values, z))
+        _attach(summary, bounds)
+
+
+def estimate_duplicate_percentage(counts: np.ndarray, total_rows: int) -> Dict[str, Any]:
+    """
+    The file's duplicate percentage (rows beyond the first of each value)
+    estimated from the occurrence `counts` of each distinct value in a
+    uniform sample of its `total_rows` rows. The values never sampled are
+    estimated from the values seen once (f1) and twice (f2) with Chao and
+    Lin's (2012) estimator for sampling without replacement, bias-corrected
+    so f2 = 0 is allowed:
+
+        f0 = f1 (f1 - 1) / (2 (f2 + 1) n / (n - 1) + f1 q / (1 - q)),  q = n / N
+
+    and the distinct values d + f0 kept between what the sample allows: at
+    least the d seen, at most N minus the sample's own repeats.
+    """
+    counts = counts[counts > 0]
+    n, d = int(counts.sum()), len(counts)
+    f1, f2 = int(np.count_nonzero(counts == 1)), int(np.count_nonzero(counts == 2))
+    q = n / total_rows
+    if n < 2 or q >= 1:
+        distinct = float(d)
+    else:
+        unseen = f1 * (f1 - 1) / (2 * (f2 + 1) * n / (n - 1) + f1 * q / (1 - q))
+        distinct = min(d + unseen, total_rows - (n - d))
+    return {
+        "value": (total_rows - distinct) / total_rows * 100,
+        "distinct_values": int(round(distinct)),
+        "method": "chao_lin_frequency_of_frequencies",
+    }
+
+
+def _attach(result: dict, bounds: dict) -> None:
+    bounds = {name: bound for name, bound in bounds.items() if bound is not None}
+    if bounds:
+        result["approximate"] = True
+        result.setdefault("error_bounds", {}).update(bounds)
+
+
+def _mean_interval(mean, std, count: int, z: float) -> Optional[dict]:
+    if mean is None or std is None or count < 2 or not np.isfinite(std):
+        return None
+    half = z * float(std) / math.sqrt(count)
+    return {"confidence": CONFIDENCE, "range": [float(mean) - half, float(mean) + half]}
+
+
+def _percentage_interval(percentage: float, count: int, z: float) -> Optional[dict]:
+    """Wilson score interval of a percentage observed over `count` sampled values."""
+    if not count:
+        return None
+    p = float(percentage) / 100
+    z2n = z * z / count
+    center = (p + z2n / 2) / (1 + z2n)
+    half = z / (1 + z2n) * math.sqrt(p * (1 - p) / count + z2n / (4 * count))
+    return {"confidence": CONFIDENCE, "range": [max(center - half, 0.0) * 100, min(center + half, 1.0) * 100]}
+
+
+def _quantile_intervals(values: np.ndarray, z: float) -> dict:
+    """
+    Interval of each of QUARTILES: the sample quantiles at q -/+ rank_error,
+    the rank error of the q-th sample quantile (binomial count below it).
+    """
+    n = len(values)
+    if n == 0:
+        return {}
+    bounds = {}
+    for name, q in QUARTILES.items():
+        rank_error = z * math.sqrt(q * (1 - q) / n)
+        low, high = np.percentile(values, [max(q - rank_error, 0) * 100, min(q + rank_error, 1) * 100])
+        bounds[name] = {"confidence": CONFIDENCE, "rank_error": rank_error, "range": [float(low), float(high)]}
+    return bounds
+
+
+def _sorted_values(series: pd.Series, semantic_type: str) -> np.ndarray:
+    """The sorted numbers the numeric or currency analyzer computed its quartiles from."""
+    context = ColumnContext(series)
+    if semantic_type != "currency":
+        return context.sorted_numbers
+    cleaned = as_strings(context.non_null).str.replace(r"[^\d\.\-]", "", regex=True)
+    return np.sort(pd.to_numeric(cleaned, errors="coerce").dropna().to_numpy(dtype=np.float64))
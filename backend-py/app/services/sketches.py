@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+
+
+def hash_values(values) -> np.ndarray:
+    """64-bit hash per value, stable across processes."""
+    values = np.asarray(values)
+    if values.dtype.kind == "M" or values.dtype.kind == "m":
+        values = values.view(np.int64)
+    return pd.util.hash_array(values)
+
+
+def _bit_length(x: np.ndarray) -> np.ndarray:
+    """Vectorized int.bit_length() for uint64 arrays."""
+    x = x.copy()
+    length = np.zeros(x.shape, dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        mask = x >= (np.uint64(1) << np.uint64(shift))
+        length[mask] += shift
+        x[mask] >>= np.uint64(shift)
+    return length + (x > 0)
+
+
+class HyperLogLog:
+    """
+    Mergeable distinct-count sketch.
+
+    Uses 2**precision one-byte registers (16 KB at the default precision),
+    independent of how many values are added. Relative standard error is
+    about 1.04 / sqrt(2**precision).
+    """
+
+    def __init__(self, precision: int = 14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        if len(hashes) == 0:
+            return
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        value_bits = 64 - self.precision
+        index = (hashes >> np.uint64(value_bits)).astype(np.intp)
+        remainder = hashes & np.uint64((1 << value_bits) - 1)
+        rank = (value_bits - _bit_length(remainder).astype(np.int16) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def add(self, values) -> None:
+        self.add_hashes(hash_values(values))
+
+    def merge(self, other: "HyperLogLog") -> None:
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int32)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Small-range correction: linear counting
+            return float(m * np.log(m / zeros))
+        return float(raw)
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / np.sqrt(len(self.registers))
+
+
+class KLLSketch:
+    """
+    Mergeable quantile sketch (Karnin, Lang & Liberty).
+
+    Values live in a stack of compactors; an item at level h stands for 2**h
+    input values. A full compactor sorts itself and promotes every other
+    item (random offset) one level up. With k=200 it holds roughly 3k
+    values, a few tens of KB, whatever the stream length. The rank error is
+    about `rank_error` (DataSketches' fit for single quantiles at 99% confidence).
+    """
+
+    def __init__(self, k: int = 200, seed: int = 42):
+        self.k = k
+        self.levels = [np.empty(0, dtype=np.float64)]
+        self.count = 0
+        self.min = np.nan
+        self.max = np.nan
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def exact(self) -> bool:
+        """True while nothing has been compacted away."""
+        return len(self.levels) == 1
+
+    @property
+    def rank_error(self) -> float:
+        return 0.0 if self.exact else 2.296 / self.k ** 0.9723
+
+    def add(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.min = float(np.fmin(self.min, values.min()))
+        self.max = float(np.fmax(self.max, values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: "KLLSketch") -> None:
+        if other.count == 0:
+            return
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self.min = float(np.fmin(self.min, other.min))
+        self.max = float(np.fmax(self.max, other.max))
+        self._compress()
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - 1 - level
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self) -> None:
+        while True:
+            full = [level for level in range(len(self.levels)) if len(self.levels[level]) > self._capacity(level)]
+            if not full:
+                return
+            level = full[0]
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0, dtype=np.float64))
+            items = np.sort(self.levels[level])
+            # An odd item out stays behind, so total weight is preserved exactly
+            kept, items = (items[:1], items[1:]) if len(items) % 2 else (items[:0], items)
+            promoted = items[int(self._rng.integers(2))::2]
+            self.levels[level] = kept
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+
+    def _weighted(self):
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 1 << level, dtype=np.int64)
+                                  for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        return values[order], weights[order]
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return np.nan
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        values, weights = self._weighted()
+        if self.exact:
+            position = (len(values) - 1) * q
+            lower = int(np.floor(position))
+            upper = min(lower + 1, len(values) - 1)
+            return float(values[lower] + (position - lower) * (values[upper] - values[lower]))
+        cumulative = np.cumsum(weights)
+        return float(values[min(np.searchsorted(cumulative, q * self.count, side="left"), len(values) - 1)])
+
+    def rank(self, value: float, inclusive: bool = False) -> int:
+        """Estimated number of values below `value` (or at most, when inclusive)."""
+        values, weights = self._weighted()
+        return int(weights[: np.searchsorted(values, value, side="right" if inclusive else "left")].sum())
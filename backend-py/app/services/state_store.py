@@ -0,0 +1,59 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from ..config import settings
+from .accumulators import DatasetAccumulator
+
+
+class AnalysisStateStore:
+    """
+    Mergeable analysis state (DatasetAccumulator) kept per analysis_id so
+    rows can be appended later.
+
+    Holds at most `max_entries` states, least recently used evicted first,
+    and forgets states idle for longer than `ttl_seconds`. Each state has
+    its own lock, returned by `get`; hold it while updating the state.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max(max_entries, 1)
+        self.ttl_seconds = ttl_seconds
+        self._states: "OrderedDict[str, Tuple[float, DatasetAccumulator, threading.Lock]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, analysis_id: str, state: DatasetAccumulator) -> None:
+        with self._lock:
+            self._states.pop(analysis_id, None)
+            self._states[analysis_id] = (time.monotonic(), state, threading.Lock())
+            while len(self._states) > self.max_entries:
+                self._states.popitem(last=False)
+
+    def get(self, analysis_id: str) -> Optional[Tuple[DatasetAccumulator, threading.Lock]]:
+        """The state and its lock, or None if unknown or expired."""
+        with self._lock:
+            entry = self._states.get(analysis_id)
+            if entry is None:
+                return None
+            touched_at, state, lock = entry
+            if self.ttl_seconds > 0 and time.monotonic() - touched_at > self.ttl_seconds:
+                del self._states[analysis_id]
+                return None
+            self._states[analysis_id] = (time.monotonic(), state, lock)
+            self._states.move_to_end(analysis_id)
+            return state, lock
+
+    def discard(self, analysis_id: str) -> None:
+        with self._lock:
+            self._states.pop(analysis_id, None)
+
+    def info(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._states), "max_entries": self.max_entries}
+
+
+analysis_states = AnalysisStateStore(
+    max_entries=settings.state_max_entries,
+    ttl_seconds=settings.state_ttl_seconds,
+)
@@ -0,0 +1,165 @@
+from contextlib import closing
+from typing import BinaryIO, Callable, Dict, Any, List, Optional, Sequence, Union
+
+from ..config import settings
+from ..utils.file_handlers import COLUMNAR_FORMATS, detect_encoding, iter_table_chunks
+from .accumulators import DatasetAccumulator
+from .value_store import distinct_values, ColumnValues
+
+# Share of the memory budget reserved for the chunk currently being parsed
+CHUNK_BUDGET_SHARE = 0.25
+
+
+def analyze_csv_stream(
+    fileobj: BinaryIO,
+    group_by_column: Optional[Union[str, Sequence[str]]] = None,
+    memory_budget_mb: Optional[int] = None,
+    progress: Optional[Callable[[int], None]] = None,
+    approx: bool = False,
+    top_k: Optional[int] = None,
+    file_format: str = "csv",
+    columns: Optional[List[str]] = None,
+    max_groups: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Analyze a CSV file object chunk by chunk with bounded memory.
+
+    Returns the same structure as analyze_dataframe. Statistics are exact
+    while each column's distinct values fit in its share of the budget;
+    columns that overflow are reported from sketches and flagged with
+    "approximate": true in their duplicate_analysis entry.
+    `progress(rows_processed)` is called after every chunk.
+
+    With `approx=True` every column is summarized by fixed-size sketches
+    (HyperLogLog distinct counts, KLL quantiles, Space-Saving heavy hitters)
+    and estimated fields are reported with their "error_bounds".
+    """
+    accumulator = accumulate_csv(fileobj, group_by_column, memory_budget_mb, progress, approx, file_format, columns)
+    return accumulated_result(accumulator, top_k, max_groups)
+
+
+def accumulated_result(
+    accumulator: DatasetAccumulator,
+    top_k: Optional[int] = None,
+    max_groups: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Analysis result of an accumulator's current state. Its value
+    tables go to the value store, as analyze_dataframe does with the full
+    distinct values.
+    """
+    top_k = settings.distribution_top_k if top_k is None else top_k
+    if distinct_values.enabled:
+        distinct_values.put(accumulator.analysis_id, {
+            name: ColumnValues(column.table.counts.index, column.table.counts.to_numpy(),
+                               column.table.truncated, column.table.floor)
+            for name, column in accumulator.columns.items() if column.table.counts is not None
+        })
+    return accumulator.result(top_k, max_groups)
+
+
+def accumulate_csv(
+    fileobj: BinaryIO,
+    group_by_column: Optional[Union[str, Sequence[str]]] = None,
+    memory_budget_mb: Optional[int] = None,
+    progress: Optional[Callable[[int], None]] = None,
+    approx: bool = False,
+    file_format: str = "csv",
+    columns: Optional[List[str]] = None,
+    semantic_types: Optional[Dict[str, str]] = None,
+) -> DatasetAccumulator:
+    """
+    Feed a data file object (CSV unless `file_format` says otherwise, see
+    UPLOAD_FORMATS) into a new DatasetAccumulator, chunk by chunk, reading
+    only `columns` if given. Columns named in `semantic_types` are analyzed
+    as that type rather than one sampled from their values.
+    """
+    budget_bytes = (memory_budget_mb or settings.stream_memory_budget_mb) * 1024 * 1024
+    table_capacity = settings.approx_table_capacity if approx else None
+    encoding = _encoding(fileobj, file_format)
+    try:
+        return _accumulate(
+            fileobj, budget_bytes, encoding, group_by_column, progress, table_capacity, file_format, columns,
+            semantic_types
+        )
+    except UnicodeDecodeError:
+        if encoding == "latin-1":
+            raise
+        # The prefix looked like utf-8 but a later chunk isn't; start over as latin-1
+        return _accumulate(
+            fileobj, budget_bytes, "latin-1", group_by_column, progress, table_capacity, file_format, columns,
+            semantic_types
+        )
+
+
+def append_csv(
+    accumulator: DatasetAccumulator,
+    fileobj: BinaryIO,
+    progress: Optional[Callable[[int], None]] = None,
+    file_format: str = "csv",
+) -> int:
+    """
+    Add the rows of a data file object to an existing accumulator.
+
+    The file must contain the columns already accumulated; other columns are
+    not read. Work is proportional to the new rows only. Returns the number
+    of rows added.
+    If parsing fails part way (accumulator.rows has already grown), the
+    accumulator has absorbed the earlier chunks and should be discarded.
+    """
+    rows_before = accumulator.rows
+    chunks = iter_table_chunks(
+        fileobj,
+        chunk_budget_bytes=int(accumulator.memory_budget_bytes * CHUNK_BUDGET_SHARE),
+        encoding=_encoding(fileobj, file_format),
+        probe_rows=settings.stream_probe_rows,
+        file_format=file_format,
+        # A pruned analysis only reads the same columns from the delta
+        columns=list(accumulator.columns),
+    )
+    # closing(): an early exit must release the parser before the caller closes the file
+    with closing(chunks):
+        for chunk in chunks:
+            if list(chunk.columns) != list(accumulator.columns):
+                raise ValueError(
+                    f"Columns {list(chunk.columns)} do not match the analysis columns {list(accumulator.columns)}"
+                )
+            accumulator.update(chunk)
+            if progress is not None:
+                progress(accumulator.rows - rows_before)
+    return accumulator.rows - rows_before
+
+
+def _accumulate(
+    fileobj: BinaryIO,
+    budget_bytes: int,
+    encoding: str,
+    group_by_column: Optional[Union[str, Sequence[str]]],
+    progress: Optional[Callable[[int], None]] = None,
+    table_capacity: Optional[int] = None,
+    file_format: str = "csv",
+    columns: Optional[List[str]] = None,
+    semantic_types: Optional[Dict[str, str]] = None,
+):
+    accumulator = DatasetAccumulator(
+        budget_bytes, group_by_column=group_by_column, table_capacity=table_capacity, semantic_types=semantic_types
+    )
+    chunks = iter_table_chunks(
+        fileobj,
+        chunk_budget_bytes=int(budget_bytes * CHUNK_BUDGET_SHARE),
+        encoding=encoding,
+        probe_rows=settings.stream_probe_rows,
+        file_format=file_format,
+        columns=columns,
+    )
+    with closing(chunks):
+        for chunk in chunks:
+            accumulator.update(chunk)
+            if progress is not None:
+                progress(accumulator.rows)
+    return accumulator
+
+
+def _encoding(fileobj: BinaryIO, file_format: str) -> str:
+    # Columnar files carry their own (utf-8) string encoding
+    return "utf-8" if file_format in COLUMNAR_FORMATS else detect_encoding(fileobj, file_format=file_format)
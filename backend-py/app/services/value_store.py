@@ -0,0 +1,95 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..config import settings
+from .profiler import frequency_order
+
+
+class ColumnValues:
+    """One column's distinct values and counts, sorted by frequency on first read."""
+
+    def __init__(self, uniques: pd.Index, counts: np.ndarray, approximate: bool = False, max_count_error: int = 0):
+        self.uniques = uniques
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.approximate = approximate
+        self.max_count_error = max_count_error
+        self._order: Optional[np.ndarray] = None
+        self.nbytes = int(uniques.memory_usage(deep=True) + self.counts.nbytes)
+
+    def page(self, offset: int, limit: int) -> Dict[str, Any]:
+        if self._order is None:
+            self._order = frequency_order(self.counts)
+        positions = self._order[offset:offset + limit]
+        values = [
+            {"value": value, "count": int(count)}
+            for value, count in zip(self.uniques[positions].tolist(), self.counts[positions].tolist())
+        ]
+        end = offset + len(positions)
+        page = {
+            "total_distinct": len(self.counts),
+            "offset": offset,
+            "limit": limit,
+            "next_offset": end if end < len(self.counts) else None,
+            "values": values,
+        }
+        if self.approximate:
+            page["approximate"] = True
+            page["error_bounds"] = {"count": {"max_overestimate": self.max_count_error}}
+        return page
+
+
+class DistinctValueStore:
+    """
+    Full distinct values/counts of every analyzed column, kept per
+    analysis_id so they can be paged through instead of being inlined in
+    the analysis response.
+
+    Bounded by `max_bytes`; whole analyses are evicted least recently used
+    first. A `max_bytes` of 0 disables the store.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._analyses: "OrderedDict[str, Dict[str, ColumnValues]]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def put(self, analysis_id: str, columns: Dict[str, ColumnValues]) -> None:
+        size = sum(values.nbytes for values in columns.values())
+        if not self.enabled or size > self.max_bytes:
+            return
+        with self._lock:
+            self._drop(analysis_id)
+            self._analyses[analysis_id] = columns
+            self._sizes[analysis_id] = size
+            self._size += size
+            while self._size > self.max_bytes:
+                self._drop(next(iter(self._analyses)))
+
+    def get(self, analysis_id: str, column: str) -> Optional[ColumnValues]:
+        with self._lock:
+            columns = self._analyses.get(analysis_id)
+            if columns is None:
+                return None
+            self._analyses.move_to_end(analysis_id)
+            return columns.get(column)
+
+    def has(self, analysis_id: str) -> bool:
+        with self._lock:
+            return analysis_id in self._analyses
+
+    def _drop(self, analysis_id: str) -> None:
+        if self._analyses.pop(analysis_id, None) is not None:
+            self._size -= self._sizes.pop(analysis_id)
+
+
+distinct_values = DistinctValueStore(settings.value_store_mb * 1024 * 1024)
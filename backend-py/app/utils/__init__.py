@@ -1,3 +1,11 @@
-from .file_handlers import validate_csv_file, read_csv_from_upload
+from .file_handlers import (
+    validate_csv_file, read_csv_from_upload, read_csv_file, read_table_file, detect_file_format,
+    detect_encoding, iter_csv_chunks, iter_table_chunks, UPLOAD_FORMATS,
+)
+from .json_encoding import dumps, loads, FastJSONResponse, streamed_json_response
 
-__all__ = ['validate_csv_file', 'read_csv_from_upload']
\ No newline at end of file
+__all__ = [
+    'validate_csv_file', 'read_csv_from_upload', 'read_csv_file', 'read_table_file', 'detect_file_format',
+    'detect_encoding', 'iter_csv_chunks', 'iter_table_chunks', 'UPLOAD_FORMATS',
+    'dumps', 'loads', 'FastJSONResponse', 'streamed_json_response',
+]
\ No newline at end of file
@@ -0,0 +1,143 @@
+import io
+import mmap
+import tempfile
+from typing import BinaryIO, Iterator, List, Optional
+
+import pandas as pd
+
+from .strings import arrow_types_mapper
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+except ImportError:  # optional: Parquet, Arrow/Feather and zstd uploads are rejected
+    pa = None
+
+
+def require_pyarrow(what: str) -> None:
+    if pa is None:
+        raise ValueError(f"{what} support requires pyarrow, which is not installed")
+
+
+def columnar_source(fileobj: BinaryIO) -> "pa.BufferReader":
+    """
+    Arrow reader over a file object's bytes. Files backed by a descriptor
+    (uploads spooled to disk, local files) are memory-mapped rather than read,
+    so only the pages actually decoded are touched. The map lives as long as
+    the Arrow buffers read from it.
+    """
+    if in_memory(fileobj):
+        fileobj.seek(0)
+        return pa.BufferReader(fileobj.read())
+    try:
+        mapped = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+        return pa.BufferReader(pa.py_buffer(mapped))
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        fileobj.seek(0)
+        return pa.BufferReader(fileobj.read())
+
+
+def in_memory(fileobj: BinaryIO) -> bool:
+    """
+    Whether a file object's bytes are already in memory: a BytesIO, or an
+    upload's SpooledTemporaryFile that has not rolled over to disk (calling
+    its fileno() to map it would roll it over).
+    """
+    if isinstance(fileobj, tempfile.SpooledTemporaryFile):
+        return not fileobj._rolled
+    return isinstance(fileobj, io.BytesIO)
+
+
+def zstd_stream(fileobj: BinaryIO) -> "pa.CompressedInputStream":
+    """Decompressed view of a zstd file object, for pandas to read from."""
+    require_pyarrow("zstd")
+    return pa.CompressedInputStream(columnar_source(fileobj), "zstd")
+
+
+def read_columnar(fileobj: BinaryIO, file_format: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Read a Parquet or Arrow IPC / Feather file object, decoding only `columns` (in that order)."""
+    require_pyarrow("Parquet and Arrow")
+    source = columnar_source(fileobj)
+    if file_format == "parquet":
+        parquet = pq.ParquetFile(source)
+        _check_columns(parquet.schema_arrow, columns)
+        table = parquet.read(columns=columns)
+    else:
+        schema, batches = _arrow_batches(source, columns)
+        table = pa.Table.from_batches(list(batches), schema=schema)
+    # split_blocks: one block per column, so numeric columns without nulls are not copied again
+    return table.to_pandas(split_blocks=True, types_mapper=arrow_types_mapper())
+
+
+def iter_columnar_batches(
+    fileobj: BinaryIO,
+    file_format: str,
+    batch_rows: int,
+    columns: Optional[List[str]] = None,
+) -> Iterator["pa.RecordBatch"]:
+    """Record batches of at most `batch_rows` rows, decoded one at a time."""
+    require_pyarrow("Parquet and Arrow")
+    source = columnar_source(fileobj)
+    if file_format == "parquet":
+        parquet = pq.ParquetFile(source)
+        _check_columns(parquet.schema_arrow, columns)
+        yield from parquet.iter_batches(batch_size=batch_rows, columns=columns)
+        return
+    _, batches = _arrow_batches(source, columns)
+    for batch in batches:
+        # IPC batches can be arbitrarily large; slices share the batch's buffers
+        for offset in range(0, batch.num_rows, batch_rows):
+            yield batch.slice(offset, batch_rows)
+
+
+def batches_to_frame(batches: List["pa.RecordBatch"]) -> pd.DataFrame:
+    return pa.Table.from_batches(batches).to_pandas(split_blocks=True, types_mapper=arrow_types_mapper())
+
+
+def _arrow_batches(source: "pa.BufferReader", columns: Optional[List[str]]):
+    """
+    (schema, lazy record batches) of an Arrow IPC file, IPC stream or
+    Feather v1 file, with only `columns`, in that order, if given.
+    """
+    try:
+        schema = ipc.open_file(source).schema
+        _check_columns(schema, columns)
+        reader = ipc.open_file(source, options=_read_options(schema, columns))
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        return _select(reader.schema, batches, columns)
+    except pa.ArrowInvalid:
+        pass
+    source.seek(0)
+    try:
+        reader = ipc.open_stream(source)
+        _check_columns(reader.schema, columns)
+        return _select(reader.schema, iter(reader), columns)
+    except pa.ArrowInvalid:
+        pass
+    source.seek(0)
+    table = feather.read_table(source, columns=columns)
+    return table.schema, iter(table.to_batches())
+
+
+def _select(schema: "pa.Schema", batches: Iterator["pa.RecordBatch"], columns: Optional[List[str]]):
+    # included_fields keeps the file's column order; select() reorders without copying
+    if not columns:
+        return schema, batches
+    return pa.schema([schema.field(name) for name in columns]), (batch.select(columns) for batch in batches)
+
+
+def _read_options(schema: "pa.Schema", columns: Optional[List[str]]) -> "ipc.IpcReadOptions":
+    # included_fields prunes at read time: skipped columns are never decompressed
+    if not columns:
+        return ipc.IpcReadOptions()
+    return ipc.IpcReadOptions(included_fields=[schema.get_field_index(name) for name in columns])
+
+
+def _check_columns(schema: "pa.Schema", columns: Optional[List[str]]) -> None:
+    if not columns:
+        return
+    missing = [name for name in columns if schema.get_field_index(name) < 0]
+    if missing:
+        raise ValueError(f"Columns not found in file: {missing}")
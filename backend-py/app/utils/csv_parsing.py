@@ -0,0 +1,162 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import BinaryIO, Dict, List, Optional
+
+import pandas as pd
+
+from ..config import settings
+from . import columnar
+from .strings import compact_strings, string_dtype
+
+ENGINES = ("c", "pyarrow")
+# With compact string storage, the c engine parses this many rows at a time and compacts their strings
+# before reading on, so the file is never held as str objects all at once
+COMPACT_CHUNK_ROWS = 100_000
+
+
+class DtypeHints:
+    """
+    Column dtypes of previously parsed CSVs, keyed by their header line, so
+    a file with the same schema is parsed with `dtype=` instead of inferring
+    every column again. A hinted column keeps the hinted type: a column seen
+    as float64 stays float64 even if a later file only has integers in it.
+    Holds at most `max_entries` schemas, least recently used evicted first;
+    0 disables hints.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._hints: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, header: bytes) -> Optional[Dict[str, str]]:
+        with self._lock:
+            key = _schema_key(header)
+            hints = self._hints.get(key)
+            if hints is not None:
+                self._hints.move_to_end(key)
+            return hints
+
+    def record(self, header: bytes, df: pd.DataFrame) -> None:
+        if not self.enabled:
+            return
+        dtypes = {column: str(dtype) for column, dtype in df.dtypes.items()}
+        with self._lock:
+            key = _schema_key(header)
+            # Keep what is known about columns this parse skipped (usecols)
+            self._hints[key] = {**self._hints.pop(key, {}), **dtypes}
+            while len(self._hints) > self.max_entries:
+                self._hints.popitem(last=False)
+
+
+def _schema_key(header: bytes) -> str:
+    return hashlib.sha256(header.rstrip(b"\r\n")).hexdigest()
+
+
+dtype_hints = DtypeHints(settings.csv_dtype_hints)
+
+
+def parse_csv(
+    buffer: BinaryIO,
+    encoding: str = "utf-8",
+    columns: Optional[List[str]] = None,
+    engine: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Parse a whole CSV buffer (positioned at its start) with the configured
+    engine, dtype hints for a known header, and categorical conversion of
+    low-cardinality string columns; the other string columns are stored as
+    configured (see utils.strings). Only `columns`, in that order, are kept
+    if given. A parse with hints that don't fit the data is redone without
+    them.
+    """
+    engine = engine or settings.csv_engine
+    if engine == "pyarrow" and columnar.pa is None:
+        engine = "c"
+    header = buffer.readline()
+    buffer.seek(0)
+
+    options = {"encoding": encoding, "usecols": columns}
+    if engine != "c":
+        options["engine"] = engine
+    hints = dtype_hints.get(header) if dtype_hints.enabled else None
+    if hints and columns:
+        hints = {column: dtype for column, dtype in hints.items() if column in columns}
+
+    df = None
+    if hints:
+        try:
+            df = _read_csv(buffer, dtype=hints, **options)
+        except (ValueError, TypeError):
+            # e.g. missing values in a column hinted as int64
+            buffer.seek(0)
+    if df is None:
+        df = _read_csv(buffer, **options)
+    if engine == "pyarrow":
+        _check_decoded(df, encoding)
+    if columns and list(df.columns) != list(columns):
+        # usecols keeps the file's column order; columnar formats return them as listed
+        df = df[list(columns)]
+
+    df = compact_strings(categorize(df, settings.csv_categorical_max_unique))
+    dtype_hints.record(header, df)
+    return df
+
+
+def _read_csv(buffer: BinaryIO, **options) -> pd.DataFrame:
+    if options.get("engine", "c") != "c" or string_dtype() is None:
+        return pd.read_csv(buffer, **options)
+    chunks = _read_chunks(buffer, **options)
+    # Each chunk infers its own dtypes: a column numeric in some chunks and text in others
+    # is parsed again as text throughout, so it neither mixes types nor loses leading zeros
+    mixed = _mixed_columns(chunks)
+    if mixed:
+        buffer.seek(0)
+        dtype = {**(options.pop("dtype", None) or {}), **{column: str for column in mixed}}
+        chunks = _read_chunks(buffer, dtype=dtype, **options)
+    return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+
+def _read_chunks(buffer: BinaryIO, **options) -> List[pd.DataFrame]:
+    with pd.read_csv(buffer, chunksize=COMPACT_CHUNK_ROWS, **options) as reader:
+        return [compact_strings(chunk) for chunk in reader]
+
+
+def _mixed_columns(chunks: List[pd.DataFrame]) -> List[str]:
+    """Columns read as numbers in some chunks and as anything else in others."""
+    if len(chunks) < 2:
+        return []
+    mixed = []
+    for column in chunks[0].columns:
+        numeric = [
+            pd.api.types.is_numeric_dtype(chunk[column].dtype) and not pd.api.types.is_bool_dtype(chunk[column].dtype)
+            for chunk in chunks
+            if chunk[column].notna().any()
+        ]
+        if any(numeric) and not all(numeric):
+            mixed.append(column)
+    return mixed
+
+
+def _check_decoded(df: pd.DataFrame, encoding: str) -> None:
+    # pyarrow reads a column that isn't valid in the encoding as bytes instead of raising
+    for column in df.columns[df.dtypes == object]:
+        first = df[column].first_valid_index()
+        if first is not None and isinstance(df[column].at[first], bytes):
+            raise UnicodeDecodeError(encoding, df[column].at[first], 0, 1, f"column {column} is not valid {encoding}")
+
+
+def categorize(df: pd.DataFrame, max_unique: int) -> pd.DataFrame:
+    """Convert string columns with at most `max_unique` distinct values (and repeats) to categorical."""
+    if max_unique <= 0 or df.empty:
+        return df
+    for column in df.columns[[dtype == object or isinstance(dtype, pd.StringDtype) for dtype in df.dtypes]]:
+        distinct = df[column].nunique()
+        if distinct <= max_unique and distinct * 2 <= len(df):
+            df[column] = df[column].astype("category")
+    return df
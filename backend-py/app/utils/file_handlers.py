@@ -1,10 +1,45 @@
 from fastapi import UploadFile, HTTPException, status
+from typing import BinaryIO, Iterator, List, Optional, Tuple
 import pandas as pd
+import codecs
+import gzip
 import io
+import mmap
+import os
+import shutil
+import zipfile
+from .columnar import batches_to_frame, in_memory, iter_columnar_batches, read_columnar, zstd_stream
+from .csv_parsing import parse_csv
+from .strings import compact_strings
+
+# Accepted file name suffixes and the format they are read as
+UPLOAD_FORMATS = {
+    ".csv": "csv",
+    ".csv.gz": "csv.gz",
+    ".csv.zst": "csv.zst",
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+}
+
+# Columnar formats: read through pyarrow rather than the CSV parser
+COLUMNAR_FORMATS = ("parquet", "arrow")
+
+# Archives of data files, accepted by the batch endpoint
+ARCHIVE_SUFFIXES = (".zip",)
+
+def detect_file_format(filename: str) -> Optional[str]:
+    """Format of a file from its name (see UPLOAD_FORMATS), None if unsupported."""
+    name = filename.lower()
+    for suffix in sorted(UPLOAD_FORMATS, key=len, reverse=True):
+        if name.endswith(suffix):
+            return UPLOAD_FORMATS[suffix]
+    return None
 
 def validate_csv_file(file: UploadFile) -> str:
     """
-    Validate uploaded CSV file
+    Validate uploaded data file: CSV (optionally gzip/zstd compressed),
+    Parquet or Arrow IPC / Feather
     
     Returns:
         str: Error message if invalid, empty string if valid
@@ -15,8 +50,8 @@ def validate_csv_file(file: UploadFile) -> str:
     if not file.filename:
         return "Invalid file name"
     
-    if not file.filename.lower().endswith('.csv'):
-        return "Invalid file type. Only CSV files are allowed."
+    if detect_file_format(file.filename) is None:
+        return f"Invalid file type. Supported: {', '.join(UPLOAD_FORMATS)}"
     
     file.file.seek(0, 2)  # Seek to end
     file_size = file.file.tell()
@@ -28,6 +63,36 @@ def validate_csv_file(file: UploadFile) -> str:
     
     return ""
 
+def is_archive(filename: str) -> bool:
+    return filename.lower().endswith(ARCHIVE_SUFFIXES)
+
+def extract_archive(fileobj: BinaryIO, directory: str) -> List[Tuple[str, str]]:
+    """
+    Extract the data files of a zip archive into `directory`: (member name,
+    extracted path) of each, in archive order. Members of unsupported types
+    and macOS resource forks are skipped. Member names are not used as
+    paths, so nothing is written outside `directory`.
+
+    Raises HTTPException (400) if the archive cannot be read.
+    """
+    try:
+        archive = zipfile.ZipFile(fileobj)
+    except zipfile.BadZipFile as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Error reading archive: {str(e)}")
+    extracted = []
+    with archive:
+        for info in archive.infolist():
+            name = info.filename
+            if info.is_dir() or detect_file_format(name) is None:
+                continue
+            if name.startswith("__MACOSX/") or os.path.basename(name).startswith("._"):
+                continue
+            path = os.path.join(directory, f"{len(extracted)}_{os.path.basename(name)}")
+            with archive.open(info) as member, open(path, "wb") as out:
+                shutil.copyfileobj(member, out)
+            extracted.append((name, path))
+    return extracted
+
 def read_csv_from_upload(file: UploadFile) -> pd.DataFrame:
     """
     Read CSV file from UploadFile object
@@ -38,16 +103,52 @@ def read_csv_from_upload(file: UploadFile) -> pd.DataFrame:
     Returns:
         pandas DataFrame
     """
+    try:
+        return read_csv_file(file.file)
+    finally:
+        file.file.close()
+
+def read_table_file(fileobj: BinaryIO, file_format: str = "csv", columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Read a whole data file object of `file_format` into a DataFrame, keeping
+    only `columns` if given. Columnar formats decode only those columns.
+
+    Raises HTTPException (400) if the file cannot be read.
+    """
+    if file_format not in COLUMNAR_FORMATS:
+        return read_csv_file(fileobj, file_format, columns)
+    try:
+        return read_columnar(fileobj, file_format, columns)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error reading {file_format} file: {str(e)}"
+        )
+
+def read_csv_file(fileobj: BinaryIO, file_format: str = "csv", columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Read a whole CSV file object into a DataFrame with parse_csv, in the
+    encoding detected from its first bytes (utf-8 or latin-1).
+
+    Raises HTTPException (400) if the file cannot be read.
+    """
+    buffer = None
     try:
         # Read file content
-        content = file.file.read()
+        content = buffer = _csv_buffer(fileobj, file_format)
+        encoding = detect_encoding(content)
+        if encoding != "utf-8" and isinstance(content, mmap.mmap):
+            # pandas only decodes other encodings from buffered binary files, not a memory map
+            content = io.BytesIO(content.read())
         
-        # Try different encodings if necessary
+        # The prefix can look like utf-8 while a later row isn't
         try:
-            df = pd.read_csv(io.BytesIO(content))
+            df = parse_csv(content, encoding, columns)
         except UnicodeDecodeError:
-            # Try with different encoding
-            df = pd.read_csv(io.BytesIO(content), encoding='latin-1')
+            if encoding == 'latin-1':
+                raise
+            content.seek(0)
+            df = parse_csv(io.BytesIO(content.read()), 'latin-1', columns)
         
         return df
         
@@ -57,4 +158,134 @@ def read_csv_from_upload(file: UploadFile) -> pd.DataFrame:
             detail=f"Error reading CSV file: {str(e)}"
         )
     finally:
-        file.file.close()
\ No newline at end of file
+        if isinstance(buffer, mmap.mmap):
+            buffer.close()
+
+def _csv_buffer(fileobj: BinaryIO, file_format: str):
+    """
+    Seekable CSV bytes to parse: the file object itself when its bytes are
+    already in memory; a read-only memory map when it has a descriptor
+    (local files, uploads spooled to disk), so its contents are not copied
+    into memory first; otherwise the decompressed bytes. A memory map is
+    the caller's to close.
+    """
+    if file_format == "csv":
+        if in_memory(fileobj):
+            fileobj.seek(0)
+            return fileobj
+        try:
+            return mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+            pass
+    return io.BytesIO(open_csv(fileobj, file_format).read())
+
+def open_csv(fileobj: BinaryIO, file_format: str = "csv") -> BinaryIO:
+    """The CSV bytes of a (possibly compressed) file object, from the start."""
+    fileobj.seek(0)
+    if file_format == "csv.gz":
+        return gzip.GzipFile(fileobj=fileobj, mode="rb")
+    if file_format == "csv.zst":
+        return zstd_stream(fileobj)
+    return fileobj
+
+def detect_encoding(fileobj: BinaryIO, sample_size: int = 64 * 1024, file_format: str = "csv") -> str:
+    """
+    Pick the encoding for a CSV from a prefix of the file instead of
+    decoding the whole upload: utf-8 if the prefix decodes, else latin-1.
+    """
+    prefix = open_csv(fileobj, file_format).read(sample_size)
+    fileobj.seek(0)
+    try:
+        # final=False tolerates a multi-byte sequence cut off at the end of the prefix
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "latin-1"
+
+
+def iter_csv_chunks(
+    fileobj: BinaryIO,
+    chunk_budget_bytes: int,
+    encoding: str = "utf-8",
+    probe_rows: int = 10_000,
+    file_format: str = "csv",
+    columns: Optional[List[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Parse a CSV file object incrementally.
+
+    A first chunk of `probe_rows` rows measures the in-memory size of a row;
+    the remaining chunks are sized so each stays within `chunk_budget_bytes`
+    as parsed, before their string columns are compacted. Only one parsed
+    chunk is alive at a time. Chunks hold only `columns`, in that order, if
+    given.
+    """
+    try:
+        reader = pd.read_csv(open_csv(fileobj, file_format), iterator=True, encoding=encoding, usecols=columns)
+    except UnicodeDecodeError:
+        raise
+    except ValueError as e:
+        # e.g. `columns` not in the header
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error reading CSV file: {str(e)}"
+        )
+    with reader:
+        try:
+            chunk = reader.get_chunk(probe_rows)
+        except StopIteration:
+            return
+        chunk_rows = _chunk_rows(chunk, chunk_budget_bytes)
+        # usecols keeps the file's column order; columnar formats return them as listed
+        reorder = bool(columns) and list(chunk.columns) != list(columns)
+
+        while True:
+            yield compact_strings(chunk[list(columns)] if reorder else chunk)
+            try:
+                chunk = reader.get_chunk(chunk_rows)
+            except StopIteration:
+                return
+
+
+def iter_table_chunks(
+    fileobj: BinaryIO,
+    chunk_budget_bytes: int,
+    encoding: str = "utf-8",
+    probe_rows: int = 10_000,
+    file_format: str = "csv",
+    columns: Optional[List[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    iter_csv_chunks for any supported format. Columnar files are decoded
+    record batch by record batch and regrouped into chunks of the same size.
+    """
+    if file_format not in COLUMNAR_FORMATS:
+        yield from iter_csv_chunks(fileobj, chunk_budget_bytes, encoding, probe_rows, file_format, columns)
+        return
+    pending, pending_rows, chunk_rows = [], 0, probe_rows
+    batches = iter_columnar_batches(fileobj, file_format, probe_rows, columns)
+    while True:
+        try:
+            batch = next(batches, None)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Error reading {file_format} file: {str(e)}"
+            )
+        if batch is None or pending_rows >= chunk_rows:
+            if pending:
+                chunk = batches_to_frame(pending)
+                if chunk_rows == probe_rows:
+                    chunk_rows = _chunk_rows(chunk, chunk_budget_bytes)
+                pending, pending_rows = [], 0
+                yield chunk
+            if batch is None:
+                return
+        pending.append(batch)
+        pending_rows += batch.num_rows
+
+
+def _chunk_rows(chunk: pd.DataFrame, chunk_budget_bytes: int) -> int:
+    """Rows per chunk so a chunk shaped like `chunk` stays within the budget."""
+    bytes_per_row = max(chunk.memory_usage(deep=True).sum() / max(len(chunk), 1), 1)
+    return max(int(chunk_budget_bytes // bytes_per_row), 1000)
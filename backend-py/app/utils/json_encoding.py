@@ -0,0 +1,109 @@
+import json
+import math
+from datetime import date, datetime
+from typing import Any, Iterator
+
+import numpy as np
+import pandas as pd
+from fastapi.responses import Response, StreamingResponse
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to converting the tree for the stdlib encoder
+    orjson = None
+
+_ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson is not None else 0
+
+
+def _default(obj: Any) -> Any:
+    """Values orjson does not encode itself."""
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    if isinstance(obj, (pd.Timestamp, datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (pd.Interval, pd.Timedelta)):
+        return str(obj)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Encode an analysis result (numpy scalars and arrays, NaN, NA, Timestamp,
+    Interval included) as JSON bytes in one pass. NaN, NA and infinity become
+    null.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+        except TypeError:
+            # Dict keys orjson can't take (numpy scalars, Timestamps): convert the tree, then encode
+            return orjson.dumps(to_native(obj), option=_ORJSON_OPTIONS)
+    return json.dumps(to_native(obj), allow_nan=False, separators=(",", ":")).encode()
+
+
+def loads(data: bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def to_native(obj: Any) -> Any:
+    """The tree with only JSON-native types, keys included (the slow path)."""
+    if isinstance(obj, dict):
+        return {_native_key(k): to_native(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple, np.ndarray)):
+        return [to_native(x) for x in obj]
+    if isinstance(obj, (float, np.floating)):
+        return None if math.isnan(obj) or math.isinf(obj) else float(obj)
+    if isinstance(obj, (str, int, bool)) or obj is None:
+        return obj
+    return _default(obj)
+
+
+def _native_key(key: Any) -> Any:
+    if isinstance(key, str):
+        return key
+    if key is None or key is pd.NA or key is pd.NaT or (isinstance(key, (float, np.floating)) and math.isnan(key)):
+        return "null"
+    native = to_native(key)
+    return native if isinstance(native, (str, int, float, bool)) else str(native)
+
+
+def iter_json(obj: Any, depth: int = 3) -> Iterator[bytes]:
+    """
+    Encode `obj` as a sequence of JSON fragments: containers down to `depth`
+    levels are opened and closed here, anything deeper is encoded per item,
+    so a large result never needs one contiguous buffer.
+    """
+    if depth <= 0 or not isinstance(obj, (dict, list)):
+        yield dumps(obj)
+        return
+    if isinstance(obj, dict):
+        yield b"{"
+        for i, (key, value) in enumerate(obj.items()):
+            yield (b"," if i else b"") + dumps(str(key) if not isinstance(key, str) else key) + b":"
+            yield from iter_json(value, depth - 1)
+        yield b"}"
+    else:
+        yield b"["
+        for i, value in enumerate(obj):
+            if i:
+                yield b","
+            yield from iter_json(value, depth - 1)
+        yield b"]"
+
+
+class FastJSONResponse(Response):
+    """JSONResponse that encodes numpy / pandas values with `dumps`."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def streamed_json_response(content: Any, status_code: int = 200, headers: dict = None, depth: int = 3) -> StreamingResponse:
+    """Response whose body is produced fragment by fragment by iter_json."""
+    return StreamingResponse(
+        iter_json(content, depth), status_code=status_code, headers=headers, media_type="application/json"
+    )
@@ -0,0 +1,75 @@
+"""
+Storage of string columns. With settings.string_storage "pyarrow" (and
+pyarrow installed), text columns are kept as pandas' arrow-backed "str"
+dtype: one UTF-8 buffer plus offsets per column instead of a Python str
+object per cell, and .str methods run as Arrow kernels. "python" keeps
+object arrays of str.
+"""
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..config import settings
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # optional: strings stay object arrays
+    pa = None
+
+STORAGES = ("pyarrow", "python")
+
+
+def string_dtype(storage: Optional[str] = None) -> Optional[pd.StringDtype]:
+    """The dtype text columns are stored as, None to keep object arrays."""
+    storage = storage or settings.string_storage
+    if storage != "pyarrow" or pa is None:
+        return None
+    # NaN as the missing value, like the object columns read_csv produces
+    return pd.StringDtype("pyarrow", na_value=np.nan)
+
+
+def compact_strings(df: pd.DataFrame, storage: Optional[str] = None) -> pd.DataFrame:
+    """Convert the object columns of `df` that hold only strings (and missing values) to string_dtype."""
+    dtype = string_dtype(storage)
+    if dtype is None:
+        return df
+    for column in df.columns[df.dtypes == object]:
+        if pd.api.types.infer_dtype(df[column], skipna=True) == "string":
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def arrow_types_mapper(storage: Optional[str] = None) -> Optional[Callable]:
+    """types_mapper for Table.to_pandas that maps Arrow strings straight to string_dtype."""
+    dtype = string_dtype(storage)
+    if dtype is None:
+        return None
+    return {pa.string(): dtype, pa.large_string(): dtype}.get
+
+
+def is_arrow_string(series: pd.Series) -> bool:
+    return isinstance(series.dtype, pd.StringDtype) and series.dtype.storage == "pyarrow"
+
+
+def as_strings(series: pd.Series) -> pd.Series:
+    """`series` as strings, copying only when it does not hold strings already (as .astype(str) would)."""
+    if isinstance(series.dtype, pd.StringDtype):
+        return series
+    if series.dtype == object and pd.api.types.infer_dtype(series, skipna=False) == "string":
+        return series
+    return series.astype(str)
+
+
+def arrow_strings(series: pd.Series) -> "pa.Array":
+    """The Arrow array behind an arrow-backed string Series, without copying the values."""
+    array = pa.array(series.array)
+    return array.combine_chunks() if isinstance(array, pa.ChunkedArray) else array
+
+
+def ascii_mask(series: pd.Series) -> np.ndarray:
+    """Which values of a Series of strings are pure ASCII."""
+    if is_arrow_string(series):
+        return pc.string_is_ascii(arrow_strings(series)).to_numpy(zero_copy_only=False)
+    return np.fromiter(map(str.isascii, series), dtype=bool, count=len(series))
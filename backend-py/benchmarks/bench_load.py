@@ -0,0 +1,463 @@
+"""
+Load test the HTTP API: concurrent uploads to /api/v1/analyze mixed with
+/api/v1/analyze/sample and /health requests, at one or more concurrency
+levels, reporting throughput, latency percentiles, error rates, event-loop
+lag and RSS over time, checked against latency / error-rate SLOs.
+
+Run from backend-py/:
+    python -m benchmarks.bench_load --concurrency 1 4 16 --duration 20 --rows 1000 50000
+    python -m benchmarks.bench_load --serve --workers 2 --concurrency 8 --output load.json
+    python -m benchmarks.bench_load --url http://127.0.0.1:8000 --pid 12345 --slo-p99-ms analyze=3000,health=50
+
+By default requests go straight to the ASGI app on this process's event
+loop: no server or HTTP client is needed, and the loop's lag (how late a
+10 ms timer fires) shows how long handlers block it. --url drives a running
+server over HTTP instead, and --serve starts `uvicorn app.main:app` on a
+free port for the run. Over HTTP the latency of /health, which runs on the
+server's event loop, stands in for loop lag.
+
+RSS is sampled from /proc: this process in process, else the server's
+process tree (--serve or --pid), per process, so each uvicorn worker's
+growth shows. Each upload gets one extra row, unique to the request, so the
+result cache does not answer it; --cache sends identical files instead.
+Exits with status 1 if any level misses --slo-p99-ms or --slo-error-rate.
+"""
+import argparse
+import asyncio
+import contextlib
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from benchmarks.bench_pipeline import environment
+from benchmarks.datasets import DEFAULT_MIX, make_dataset, parse_mix
+
+ANALYZE_PATH = "/api/v1/analyze"
+ENDPOINTS = {
+    "analyze": ("POST", ANALYZE_PATH),
+    "sample": ("GET", "/api/v1/analyze/sample"),
+    "health": ("GET", "/health"),
+}
+PERCENTILES = (50, 90, 99)
+# How often the loop-lag probe wakes up, and RSS is sampled
+LAG_INTERVAL = 0.01
+RSS_INTERVAL = 0.5
+
+
+def make_payloads(rows: List[int], columns: int, mix: List[str]) -> Dict[int, bytes]:
+    """CSV bytes per row count, generated once up front."""
+    return {count: make_dataset(count, columns, mix).to_csv(index=False).encode() for count in rows}
+
+
+def multipart(filename: str, content: bytes) -> Tuple[str, bytes]:
+    """(content type, body) of a multipart/form-data upload of `content` as the `file` field."""
+    boundary = uuid.uuid4().hex
+    body = b"".join([
+        f"--{boundary}\r\n".encode(),
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'.encode(),
+        b"Content-Type: text/csv\r\n\r\n",
+        content,
+        f"\r\n--{boundary}--\r\n".encode(),
+    ])
+    return f"multipart/form-data; boundary={boundary}", body
+
+
+def unique_upload(content: bytes, columns: int) -> bytes:
+    """`content` plus one row no other request sends, so its cache key is new."""
+    return content + f"load-{uuid.uuid4().hex}".encode() + b"," * (columns - 1) + b"\n"
+
+
+class AsgiTransport:
+    """Requests handed straight to an ASGI app on the running event loop."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def request(self, method: str, path: str, body: bytes = b"", headers: Tuple = ()) -> Tuple[int, int]:
+        """(status, response body bytes)."""
+        path, _, query = path.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": "2.3"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [(b"host", b"loadtest"), (b"content-length", str(len(body)).encode()),
+                        *((name.lower().encode(), value.encode()) for name, value in headers)],
+            "client": ("127.0.0.1", 0),
+            "server": ("loadtest", 80),
+        }
+        finished = asyncio.Event()
+        response = {"status": 0, "bytes": 0}
+        sent = False
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # Streaming responses listen for a disconnect; only report one once the response is complete
+            await finished.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+                if not message.get("more_body", False):
+                    finished.set()
+
+        await self.app(scope, receive, send)
+        finished.set()
+        return response["status"], response["bytes"]
+
+
+class HttpTransport:
+    """Requests to a server over HTTP/1.1, one connection per request, from a thread per concurrent user."""
+
+    def __init__(self, base_url: str, concurrency: int):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.threads = ThreadPoolExecutor(max_workers=concurrency)
+
+    async def request(self, method: str, path: str, body: bytes = b"", headers: Tuple = ()) -> Tuple[int, int]:
+        return await asyncio.get_running_loop().run_in_executor(self.threads, self._request, method, path, body, headers)
+
+    def _request(self, method: str, path: str, body: bytes, headers: Tuple) -> Tuple[int, int]:
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=600)
+        try:
+            connection.request(method, path, body=body or None, headers=dict(headers))
+            response = connection.getresponse()
+            return response.status, len(response.read())
+        finally:
+            connection.close()
+
+    def close(self) -> None:
+        self.threads.shutdown(wait=False)
+
+
+def rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def process_tree(pid: int) -> List[int]:
+    """`pid` and its descendants (uvicorn workers and their column pool processes)."""
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as stat:
+                # The command name may contain spaces; the fields after it don't
+                parents[int(entry)] = int(stat.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    tree, frontier = [pid], [pid]
+    while frontier:
+        children = [child for child, parent in parents.items() if parent in frontier]
+        tree.extend(children)
+        frontier = children
+    return tree
+
+
+class LoadPlan:
+    """What each simulated user sends: endpoints by weight, upload sizes uniformly."""
+
+    def __init__(self, weights: Dict[str, float], payloads: Dict[int, bytes], columns: int,
+                 analyze_params: str, unique: bool):
+        self.kinds = list(weights)
+        self.weights = [weights[kind] for kind in self.kinds]
+        self.payloads = payloads
+        self.columns = columns
+        self.analyze_params = analyze_params
+        self.unique = unique
+
+    def next_request(self, rng: random.Random) -> Tuple[str, Optional[int], str, str, bytes, Tuple]:
+        """(kind, upload rows, method, path, body, headers)."""
+        kind = rng.choices(self.kinds, self.weights)[0]
+        method, path = ENDPOINTS[kind]
+        if kind != "analyze":
+            return kind, None, method, path, b"", ()
+        rows = rng.choice(list(self.payloads))
+        content = self.payloads[rows]
+        if self.unique:
+            content = unique_upload(content, self.columns)
+        content_type, body = multipart(f"load_{rows}.csv", content)
+        if self.analyze_params:
+            path = f"{path}?{self.analyze_params}"
+        return kind, rows, method, path, body, (("Content-Type", content_type),)
+
+
+async def run_level(transport, plan: LoadPlan, concurrency: int, duration: float,
+                    pids: List[int], measure_lag: bool, seed: int) -> dict:
+    """Keep `concurrency` requests in flight for `duration` seconds; raw samples of everything measured."""
+    samples: List[Tuple[str, Optional[int], Optional[int], float]] = []
+    lags: List[float] = []
+    rss: List[dict] = []
+    started = time.perf_counter()
+    deadline = started + duration
+    running = True
+
+    async def user(number: int):
+        rng = random.Random(seed * 1000 + number)
+        while time.perf_counter() < deadline:
+            kind, rows, method, path, body, headers = plan.next_request(rng)
+            start = time.perf_counter()
+            try:
+                status, _ = await transport.request(method, path, body, headers)
+            except Exception:
+                status = None
+            samples.append((kind, rows, status, time.perf_counter() - start))
+
+    async def lag_probe():
+        while running:
+            start = time.perf_counter()
+            await asyncio.sleep(LAG_INTERVAL)
+            lags.append(max(time.perf_counter() - start - LAG_INTERVAL, 0.0))
+
+    async def rss_sampler():
+        while running:
+            tree = [pid for root in pids for pid in process_tree(root)]
+            rss.append({
+                "t": round(time.perf_counter() - started, 2),
+                "rss_mb": {str(pid): round(value, 1) for pid in tree if (value := rss_mb(pid)) is not None},
+            })
+            await asyncio.sleep(RSS_INTERVAL)
+
+    monitors = [asyncio.create_task(rss_sampler())]
+    if measure_lag:
+        monitors.append(asyncio.create_task(lag_probe()))
+    await asyncio.gather(*(user(number) for number in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    running = False
+    await asyncio.gather(*monitors)
+    return summarize(concurrency, elapsed, samples, lags, rss)
+
+
+def _latency(seconds: List[float]) -> dict:
+    if not seconds:
+        return {}
+    ms = np.asarray(seconds) * 1000
+    stats = {f"p{p}_ms": round(float(np.percentile(ms, p)), 1) for p in PERCENTILES}
+    stats["max_ms"] = round(float(ms.max()), 1)
+    return stats
+
+
+def summarize(concurrency: int, elapsed: float, samples: list, lags: List[float], rss: List[dict]) -> dict:
+    endpoints = {}
+    for kind in sorted({sample[0] for sample in samples}):
+        chosen = [sample for sample in samples if sample[0] == kind]
+        errors = sum(1 for sample in chosen if sample[2] is None or sample[2] >= 400)
+        entry = {
+            "requests": len(chosen),
+            "errors": errors,
+            "error_rate": errors / len(chosen),
+            "rps": round(len(chosen) / elapsed, 2),
+            **_latency([sample[3] for sample in chosen]),
+        }
+        if kind == "analyze":
+            entry["by_rows"] = {
+                str(rows): _latency([sample[3] for sample in chosen if sample[1] == rows])
+                for rows in sorted({sample[1] for sample in chosen})
+            }
+        endpoints[kind] = entry
+    errors = sum(entry["errors"] for entry in endpoints.values())
+    memory = {}
+    for pid in sorted({pid for point in rss for pid in point["rss_mb"]}, key=int):
+        series = [point["rss_mb"][pid] for point in rss if pid in point["rss_mb"]]
+        memory[pid] = {"start_mb": series[0], "peak_mb": max(series), "end_mb": series[-1],
+                       "growth_mb": round(series[-1] - series[0], 1)}
+    return {
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 2),
+        "requests": len(samples),
+        "rps": round(len(samples) / elapsed, 2),
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "endpoints": endpoints,
+        "loop_lag": _latency(lags),
+        "memory": memory,
+        "rss_timeline": rss,
+    }
+
+
+def parse_slo(value: Optional[str]) -> Dict[str, float]:
+    """`2000` (every endpoint) or `analyze=3000,health=50` -> {endpoint or "*": milliseconds}."""
+    if not value:
+        return {}
+    if "=" not in value:
+        return {"*": float(value)}
+    return {name.strip(): float(limit) for name, limit in (item.split("=", 1) for item in value.split(","))}
+
+
+def check_slo(level: dict, p99_ms: Dict[str, float], error_rate: Optional[float]) -> List[str]:
+    """Descriptions of the SLOs `level` misses."""
+    misses = []
+    for kind, entry in level["endpoints"].items():
+        limit = p99_ms.get(kind, p99_ms.get("*"))
+        if limit is not None and entry.get("p99_ms", 0) > limit:
+            misses.append(f"{kind} p99 {entry['p99_ms']:.0f} ms > {limit:.0f} ms")
+        if error_rate is not None and entry["error_rate"] > error_rate:
+            misses.append(f"{kind} error rate {entry['error_rate']:.2%} > {error_rate:.2%}")
+    return misses
+
+
+def print_level(level: dict, misses: List[str]) -> None:
+    print(f"\nconcurrency {level['concurrency']}: {level['requests']} requests in {level['seconds']}s, "
+          f"{level['rps']} req/s, error rate {level['error_rate']:.2%}")
+    print(f"  {'endpoint':18} {'requests':>8} {'req/s':>8} {'errors':>7} "
+          + " ".join(f"{'p' + str(p):>8}" for p in PERCENTILES) + f" {'max':>8}")
+    rows = []
+    for kind, entry in level["endpoints"].items():
+        rows.append((kind, entry))
+        rows.extend((f"  {rows_count} rows", {"requests": "", "rps": "", "errors": "", **stats})
+                    for rows_count, stats in entry.get("by_rows", {}).items())
+    for name, entry in rows:
+        latencies = " ".join(f"{entry.get(f'p{p}_ms', 0):8.0f}" for p in PERCENTILES)
+        print(f"  {name:18} {entry['requests']:>8} {entry['rps']:>8} {entry['errors']:>7} {latencies} "
+              f"{entry.get('max_ms', 0):8.0f}")
+    if level["loop_lag"]:
+        lag = level["loop_lag"]
+        print(f"  event loop lag: p50 {lag['p50_ms']} ms, p99 {lag['p99_ms']} ms, max {lag['max_ms']} ms")
+    for pid, memory in level["memory"].items():
+        print(f"  pid {pid}: RSS {memory['start_mb']:.0f} -> {memory['end_mb']:.0f} MB "
+              f"(peak {memory['peak_mb']:.0f}, growth {memory['growth_mb']:+.0f})")
+    print("  SLO: " + ("met" if not misses else "MISSED - " + "; ".join(misses)))
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def start_server(workers: int) -> Tuple[subprocess.Popen, str]:
+    """uvicorn serving app.main:app on a free local port, once /health answers."""
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/health")
+            if connection.getresponse().status == 200:
+                return server, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("uvicorn did not start within 60 s")
+
+
+def parse_weights(value: str) -> Dict[str, float]:
+    weights = {name.strip(): float(weight) for name, weight in (item.split("=", 1) for item in value.split(","))}
+    unknown = [name for name in weights if name not in ENDPOINTS]
+    if unknown:
+        raise ValueError(f"Unknown endpoints {unknown}; choose from {list(ENDPOINTS)}")
+    return weights
+
+
+async def run(args) -> List[dict]:
+    mix = parse_mix(args.mix) or DEFAULT_MIX
+    plan = LoadPlan(parse_weights(args.endpoints), make_payloads(args.rows, args.columns, mix), args.columns,
+                    args.analyze_params, unique=not args.cache)
+    server = None
+    url = args.url
+    if args.serve:
+        server, url = start_server(args.workers)
+    pids = [server.pid] if server else [args.pid] if args.pid else [] if url else [os.getpid()]
+    lifespan = contextlib.AsyncExitStack()
+    if url is None:
+        from app.main import app
+        transport = AsgiTransport(app)
+    else:
+        transport = HttpTransport(url, max(args.concurrency))
+
+    p99_ms = parse_slo(args.slo_p99_ms)
+    levels = []
+    try:
+        if url is None:
+            # Start (warm up) and stop the app as a server would, so /health is ready
+            await lifespan.enter_async_context(app.router.lifespan_context(app))
+        for concurrency in args.concurrency:
+            # In process, the app's own prints would interleave with the report
+            with open(os.devnull, "w") as devnull, \
+                    contextlib.redirect_stdout(devnull if url is None else sys.stdout):
+                level = await run_level(transport, plan, concurrency, args.duration, pids, url is None, args.seed)
+            level["slo_misses"] = check_slo(level, p99_ms, args.slo_error_rate)
+            print_level(level, level["slo_misses"])
+            levels.append(level)
+    finally:
+        await lifespan.aclose()
+        if url is not None:
+            transport.close()
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+    return levels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="Requests in flight, one level each")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per concurrency level")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 50_000], help="Row counts of the uploaded files")
+    parser.add_argument("--columns", type=int, default=len(DEFAULT_MIX))
+    parser.add_argument("--mix", help="Comma-separated column kinds (see benchmarks.datasets.GENERATORS)")
+    parser.add_argument("--endpoints", default="analyze=8,sample=1,health=1", help="Request mix as endpoint=weight")
+    parser.add_argument("--analyze-params", default="", help="Query string added to every upload, e.g. stream=true")
+    parser.add_argument("--cache", action="store_true", help="Send identical uploads, so the result cache answers repeats")
+    parser.add_argument("--url", help="Base URL of a running server (default: the app in process)")
+    parser.add_argument("--serve", action="store_true", help="Start uvicorn on a free port for the run")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers with --serve")
+    parser.add_argument("--pid", type=int, help="Server process whose tree's RSS is sampled with --url")
+    parser.add_argument("--slo-p99-ms", help="p99 latency limit: milliseconds, or endpoint=ms pairs")
+    parser.add_argument("--slo-error-rate", type=float, help="Largest share of failed requests per endpoint")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args()
+
+    print(f"Uploads: {', '.join(f'{rows:,}' for rows in args.rows)} rows x {args.columns} columns; "
+          f"endpoints {args.endpoints}; {'in process' if not (args.url or args.serve) else 'over HTTP'}")
+    levels = asyncio.run(run(args))
+
+    if args.output:
+        report = {
+            "environment": environment(),
+            "params": {key: value for key, value in vars(args).items() if key != "output"},
+            "levels": levels,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+    if any(level["slo_misses"] for level in levels):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark string column storage on text-heavy data: in-memory frame size,
+and time and peak RSS of parsing and of analyze_dataframe, per storage
+option. Parse RSS is the growth over the imported modules; analyze RSS is
+the process peak during the analysis, frame included.
+
+Run from backend-py/:
+    python -m benchmarks.bench_memory --rows 1000000 --columns 12
+
+Each configuration runs in its own process (settings are read from the
+environment at import), so peak RSS is not shared between them.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.datasets import make_dataset, parse_mix
+
+# Mostly text, like the flight data: codes, names, free text, ids, amounts, dates
+TEXT_MIX = "flight_number,text,low_cardinality,high_cardinality,id,currency,date"
+
+# name -> DATASMITH_* overrides
+CONFIGS = {
+    "python": {"DATASMITH_STRING_STORAGE": "python"},
+    "pyarrow": {"DATASMITH_STRING_STORAGE": "pyarrow"},
+    "python+categorical": {"DATASMITH_STRING_STORAGE": "python", "DATASMITH_CSV_CATEGORICAL_MAX_UNIQUE": "1000"},
+    "pyarrow+categorical": {"DATASMITH_STRING_STORAGE": "pyarrow", "DATASMITH_CSV_CATEGORICAL_MAX_UNIQUE": "1000"},
+}
+
+
+def _peak_rss_mb() -> float:
+    """Peak RSS since the last _reset_peak_rss (or process start)."""
+    # VmHWM, unlike ru_maxrss, is not carried over from the parent across exec
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _reset_peak_rss() -> None:
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+    except OSError:
+        pass
+
+
+def run_child(path: str) -> dict:
+    """Parse `path` and analyze it once, recording the peak RSS of each step."""
+    from app.services.analysis_service import analyze_dataframe
+    from app.utils import read_csv_file
+
+    baseline_rss = _peak_rss_mb()
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        df = read_csv_file(f)
+    parse_seconds = time.perf_counter() - start
+    parse_rss = _peak_rss_mb()
+
+    _reset_peak_rss()
+    start = time.perf_counter()
+    analyze_dataframe(df, workers=0)
+    return {
+        "frame_mb": df.memory_usage(deep=True).sum() / 1024 / 1024,
+        "parse_seconds": parse_seconds,
+        "parse_rss_mb": parse_rss - baseline_rss,
+        "analyze_seconds": time.perf_counter() - start,
+        "analyze_rss_mb": _peak_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--columns", type=int, default=14)
+    parser.add_argument("--mix", default=TEXT_MIX, help="Comma-separated column kinds (see benchmarks.datasets)")
+    parser.add_argument("--configs", default=",".join(CONFIGS), help="Comma-separated subset of: " + ", ".join(CONFIGS))
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.csv")
+        make_dataset(args.rows, args.columns, parse_mix(args.mix)).to_csv(path, index=False)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"CSV: {args.rows:,} rows x {args.columns} columns, {size_mb:.1f} MB")
+        print(
+            f"{'config':22} {'frame':>8} {'x file':>7} {'parse s':>8} {'parse RSS':>10} "
+            f"{'analyze s':>10} {'analyze RSS':>12}"
+        )
+        for name in args.configs.split(","):
+            child = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_memory", "--child", path],
+                env={**os.environ, **CONFIGS[name]},
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            result = json.loads(child.stdout.strip().splitlines()[-1])
+            print(
+                f"{name:22} {result['frame_mb']:6.0f}MB {result['frame_mb'] / size_mb:6.1f}x "
+                f"{result['parse_seconds']:8.2f} {result['parse_rss_mb']:8.0f}MB "
+                f"{result['analyze_seconds']:10.2f} {result['analyze_rss_mb']:10.0f}MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark whole-file CSV parsing per engine and parse option: throughput
+and peak RSS of read_csv_file.
+
+Run from backend-py/:
+    python -m benchmarks.bench_parsing --rows 1000000 --columns 12
+
+Each configuration runs in its own process (settings are read from the
+environment at import), so peak RSS is not shared between them.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_profiler import make_frame
+
+# name -> DATASMITH_* overrides
+CONFIGS = {
+    "c": {"DATASMITH_CSV_ENGINE": "c"},
+    "pyarrow": {"DATASMITH_CSV_ENGINE": "pyarrow"},
+    "c+categorical": {"DATASMITH_CSV_ENGINE": "c", "DATASMITH_CSV_CATEGORICAL_MAX_UNIQUE": "1000"},
+    "c+hints": {"DATASMITH_CSV_ENGINE": "c", "DATASMITH_CSV_DTYPE_HINTS": "8"},
+    "c+hints+categorical": {
+        "DATASMITH_CSV_ENGINE": "c",
+        "DATASMITH_CSV_DTYPE_HINTS": "8",
+        "DATASMITH_CSV_CATEGORICAL_MAX_UNIQUE": "1000",
+    },
+    "pyarrow+hints+categorical": {
+        "DATASMITH_CSV_ENGINE": "pyarrow",
+        "DATASMITH_CSV_DTYPE_HINTS": "8",
+        "DATASMITH_CSV_CATEGORICAL_MAX_UNIQUE": "1000",
+    },
+}
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_child(path: str, repeat: int) -> dict:
+    """Parse `path` once to warm up (and record dtype hints), then `repeat` timed times."""
+    from app.utils import read_csv_file
+
+    baseline_rss = _max_rss_mb()
+    with open(path, "rb") as f:
+        df = read_csv_file(f)
+    best = float("inf")
+    for _ in range(repeat):
+        with open(path, "rb") as f:
+            start = time.perf_counter()
+            df = read_csv_file(f)
+            best = min(best, time.perf_counter() - start)
+    return {
+        "seconds": best,
+        "peak_rss_mb": _max_rss_mb(),
+        "parse_rss_mb": _max_rss_mb() - baseline_rss,
+        "frame_mb": df.memory_usage(deep=True).sum() / 1024 / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--columns", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--configs", default=",".join(CONFIGS), help="Comma-separated subset of: " + ", ".join(CONFIGS))
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.repeat)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.csv")
+        make_frame(args.rows, args.columns).to_csv(path, index=False)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"CSV: {args.rows:,} rows x {args.columns} columns, {size_mb:.1f} MB")
+        print(f"{'config':28} {'seconds':>8} {'MB/s':>8} {'peak RSS':>10} {'parse RSS':>10} {'frame':>8}")
+        for name in args.configs.split(","):
+            child = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_parsing", "--child", path, "--repeat", str(args.repeat)],
+                env={**os.environ, **CONFIGS[name]},
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            result = json.loads(child.stdout.strip().splitlines()[-1])
+            print(
+                f"{name:28} {result['seconds']:8.3f} {size_mb / result['seconds']:8.1f} "
+                f"{result['peak_rss_mb']:8.0f}MB {result['parse_rss_mb']:8.0f}MB {result['frame_mb']:6.0f}MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Benchmark the analysis pipeline stage by stage on synthetic datasets:
+parse, type inference, each analyzer, value profiles, numeric summaries,
+group analysis, serialization, and analyze_dataframe end to end.
+
+Run from backend-py/:
+    python -m benchmarks.bench_pipeline --rows 100000 1000000 --columns 22 --output bench.json
+    python -m benchmarks.bench_pipeline --rows 100000 --compare bench.json
+
+Timings are the best of --repeat runs. Peak memory per stage is measured
+with tracemalloc in a separate pass, so tracing does not skew the timings.
+Results are written as JSON (--output) with the commit and environment;
+--compare prints the ratio against an earlier results file and exits with
+status 1 if any stage got slower than --threshold.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.services.analysis_service import ANALYZERS, _perform_group_analysis, _summarize_numeric, analyze_dataframe
+from app.services.field_detector import infer_column_semantic_type
+from app.services.profiler import count_values, profile_from_counts
+from app.services.row_duplicates import duplicate_rows
+from app.utils import read_csv_file
+from app.utils.json_encoding import dumps
+from benchmarks.datasets import DEFAULT_MIX, make_dataset, parse_mix
+
+
+class StageTimer:
+    """Best wall time and tracemalloc peak per named stage."""
+
+    def __init__(self, trace_memory: bool):
+        self.trace_memory = trace_memory
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.peak_mb: Dict[str, float] = defaultdict(float)
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            start_bytes = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - start
+            if self.trace_memory:
+                peak = (tracemalloc.get_traced_memory()[1] - start_bytes) / 1024 / 1024
+                self.peak_mb[name] = max(self.peak_mb[name], peak)
+
+
+def run_stages(csv_bytes: bytes, group_by: Optional[str], timer: StageTimer) -> Dict[str, int]:
+    """One pass over every stage; returns the semantic type count."""
+    with timer.stage("parse"):
+        df = read_csv_file(io.BytesIO(csv_bytes))
+
+    types = {}
+    with timer.stage("type_inference"):
+        for column in df.columns:
+            types[column] = infer_column_semantic_type(df[column])
+
+    for column, semantic_type in types.items():
+        if semantic_type in ANALYZERS:
+            with timer.stage(f"analyzer.{semantic_type}"):
+                ANALYZERS[semantic_type](df[column])
+
+    with timer.stage("value_profiles"):
+        for column in df.columns:
+            uniques, counts = count_values(df[column])
+            profile_from_counts(uniques, counts, len(df))
+
+    with timer.stage("row_duplicates"):
+        duplicate_rows(df)
+
+    with timer.stage("numeric_summaries"):
+        for column in df.columns:
+            if pd.api.types.is_numeric_dtype(df[column]):
+                _summarize_numeric(df[column])
+
+    if group_by:
+        with timer.stage("group_analysis"):
+            _perform_group_analysis(df, group_by)
+
+    with timer.stage("analyze_dataframe"):
+        result = analyze_dataframe(df, group_by_column=group_by)
+
+    with timer.stage("serialization"):
+        dumps(result)
+
+    counts = defaultdict(int)
+    for semantic_type in types.values():
+        counts[semantic_type] += 1
+    return dict(counts)
+
+
+def bench_dataset(rows: int, columns: int, mix: List[str], missing: float, repeat: int, trace_memory: bool) -> dict:
+    df = make_dataset(rows, columns, mix, missing)
+    csv_bytes = df.to_csv(index=False).encode()
+    # Group by the first low-cardinality column, as a dashboard would
+    group_by = next((column for column in df.columns if column.startswith("low_cardinality")), None)
+    del df
+
+    best: Dict[str, float] = {}
+    semantic_types = {}
+    for _ in range(repeat):
+        timer = StageTimer(trace_memory=False)
+        semantic_types = run_stages(csv_bytes, group_by, timer)
+        for name, seconds in timer.seconds.items():
+            best[name] = min(best.get(name, float("inf")), seconds)
+
+    peak_mb: Dict[str, float] = {}
+    if trace_memory:
+        timer = StageTimer(trace_memory=True)
+        tracemalloc.start()
+        try:
+            run_stages(csv_bytes, group_by, timer)
+        finally:
+            tracemalloc.stop()
+        peak_mb = dict(timer.peak_mb)
+
+    return {
+        "dataset": f"{rows}x{columns}",
+        "rows": rows,
+        "columns": columns,
+        "csv_mb": round(len(csv_bytes) / 1024 / 1024, 2),
+        "group_by": group_by,
+        "semantic_types": semantic_types,
+        "stages": {
+            name: {"seconds": round(seconds, 4), **({"peak_mb": round(peak_mb[name], 1)} if name in peak_mb else {})}
+            for name, seconds in best.items()
+        },
+    }
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(results: List[dict], baseline_path: str, threshold: float) -> bool:
+    """Print current / baseline time per stage; True if no stage exceeds `threshold`."""
+    with open(baseline_path) as f:
+        baseline = {entry["dataset"]: entry for entry in json.load(f)["results"]}
+    ok = True
+    for entry in results:
+        before = baseline.get(entry["dataset"])
+        if before is None:
+            print(f"{entry['dataset']}: not in {baseline_path}")
+            continue
+        print(f"{entry['dataset']} vs {baseline_path}:")
+        for name, stage in entry["stages"].items():
+            if name not in before["stages"]:
+                continue
+            ratio = stage["seconds"] / max(before["stages"][name]["seconds"], 1e-9)
+            flag = "  REGRESSION" if ratio > threshold else ""
+            ok = ok and not flag
+            print(f"  {name:24} {before['stages'][name]['seconds']:9.4f}s -> {stage['seconds']:9.4f}s  {ratio:5.2f}x{flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000])
+    parser.add_argument("--columns", type=int, nargs="+", default=[len(DEFAULT_MIX)])
+    parser.add_argument("--mix", help="Comma-separated column kinds (see benchmarks.datasets.GENERATORS)")
+    parser.add_argument("--missing", type=float, default=0.02)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Earlier --output file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Slowdown ratio flagged by --compare")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix) or DEFAULT_MIX
+    results = []
+    for rows in args.rows:
+        for columns in args.columns:
+            entry = bench_dataset(rows, columns, mix, args.missing, args.repeat, not args.no_memory)
+            results.append(entry)
+            print(f"{entry['dataset']} ({entry['csv_mb']} MB CSV, types {entry['semantic_types']}):")
+            for name, stage in entry["stages"].items():
+                memory = f"  peak {stage['peak_mb']:8.1f} MB" if "peak_mb" in stage else ""
+                print(f"  {name:24} {stage['seconds']:9.4f}s{memory}")
+
+    report = {
+        "environment": environment(),
+        "params": {"mix": mix, "missing": args.missing, "repeat": args.repeat},
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+    if args.compare and not compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
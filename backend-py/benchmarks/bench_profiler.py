@@ -0,0 +1,78 @@
+"""
+Benchmark the single-pass column profiler against the previous per-column
+pandas calls in analyze_dataframe.
+
+Run from backend-py/:
+    python -m benchmarks.bench_profiler --rows 2000000 --columns 20
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.services.profiler import profile_column
+
+
+def legacy_profile(df: pd.DataFrame, column: str) -> dict:
+    """The duplicate_analysis block as it was computed before profile_column."""
+    col_series = df[column]
+    mode = col_series.mode()
+    value_counts = col_series.value_counts()
+    return {
+        "duplicate_count": df.duplicated(subset=[column]).sum(),
+        "unique_count": col_series.nunique(),
+        "duplicate_percentage": (df.duplicated(subset=[column]).sum() / len(df)) * 100 if len(df) else 0,
+        "most_common_value": mode.iloc[0] if not mode.empty else None,
+        "most_common_count": int(value_counts.iloc[0]) if not value_counts.empty else 0,
+        "unique_values": col_series.dropna().unique().tolist(),
+        "value_distribution": col_series.value_counts(dropna=False).to_dict(),
+        "missing_values": int(col_series.isnull().sum()),
+    }
+
+
+def make_frame(rows: int, columns: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(columns):
+        kind = i % 4
+        if kind == 0:
+            data[f"int_{i}"] = rng.integers(0, 1000, rows)
+        elif kind == 1:
+            values = rng.normal(100, 15, rows).round(1)
+            values[rng.random(rows) < 0.05] = np.nan
+            data[f"float_{i}"] = values
+        elif kind == 2:
+            data[f"category_{i}"] = rng.choice(["HR", "IT", "Finance", "Sales", None], rows)
+        else:
+            data[f"text_{i}"] = pd.Series(rng.integers(0, rows // 10 + 1, rows)).map("user_{}".format)
+    return pd.DataFrame(data)
+
+
+def _time(fn, df: pd.DataFrame) -> float:
+    start = time.perf_counter()
+    for column in df.columns:
+        fn(df, column)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--columns", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows, args.columns)
+    print(f"Frame: {args.rows:,} rows x {args.columns} columns")
+
+    legacy = min(_time(legacy_profile, df) for _ in range(args.repeat))
+    single_pass = min(_time(lambda frame, column: profile_column(frame[column]), df) for _ in range(args.repeat))
+
+    print(f"legacy per-column calls : {legacy:8.3f} s")
+    print(f"profile_column          : {single_pass:8.3f} s")
+    print(f"speedup                 : {legacy / single_pass:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
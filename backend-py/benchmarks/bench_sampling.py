@@ -0,0 +1,85 @@
+"""
+Benchmark sampled analysis (sample=) against the full analysis as files
+grow: wall time of each, and whether the full file's means fall inside the
+sampled confidence intervals.
+
+Run from backend-py/:
+    python -m benchmarks.bench_sampling --rows 100000 1000000 5000000 --margin 0.01
+
+The full analysis is skipped above --full-max-rows. Sampled time should
+stay nearly flat: only the byte scan of the file grows with its size.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from app.services.analysis_service import analyze_dataframe
+from app.services.sampling import add_sampling, sample_size, sample_table
+from app.utils import read_csv_file
+from benchmarks.datasets import make_dataset, parse_mix
+
+# Numeric and boolean columns, so there are means and percentages to check
+SAMPLING_MIX = "float,integer,boolean,currency,low_cardinality,text"
+
+
+def time_full(path: str) -> tuple:
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        df = read_csv_file(f)
+    results = analyze_dataframe(df)
+    return time.perf_counter() - start, results
+
+
+def time_sampled(path: str, margin: float) -> tuple:
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        sample = sample_table(f, margin)
+    results = add_sampling(analyze_dataframe(sample.frame), sample)
+    return time.perf_counter() - start, results
+
+
+def covered(full: dict, sampled: dict) -> tuple:
+    """(means inside their sampled interval, means with an interval) over numerical_analysis."""
+    inside = total = 0
+    for column, summary in sampled["numerical_analysis"].items():
+        bound = summary.get("error_bounds", {}).get("mean")
+        if bound is None or full["numerical_analysis"][column]["mean"] is None:
+            continue
+        low, high = bound["range"]
+        inside += low <= full["numerical_analysis"][column]["mean"] <= high
+        total += 1
+    return inside, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--columns", type=int, default=12)
+    parser.add_argument("--mix", default=SAMPLING_MIX, help="Comma-separated column kinds (see benchmarks.datasets)")
+    parser.add_argument("--margin", type=float, default=0.01)
+    parser.add_argument("--full-max-rows", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    print(f"margin {args.margin}: {sample_size(args.margin):,} sampled rows")
+    print(f"{'rows':>12} {'MB':>8} {'full s':>8} {'sampled s':>10} {'speedup':>8} {'means in CI':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            path = os.path.join(tmp, f"bench_{rows}.csv")
+            make_dataset(rows, args.columns, parse_mix(args.mix)).to_csv(path, index=False)
+            size_mb = os.path.getsize(path) / 1024 / 1024
+            sampled_seconds, sampled = time_sampled(path, args.margin)
+            if rows <= args.full_max_rows:
+                full_seconds, full = time_full(path)
+                inside, total = covered(full, sampled)
+                print(
+                    f"{rows:12,} {size_mb:8.1f} {full_seconds:8.2f} {sampled_seconds:10.2f} "
+                    f"{full_seconds / sampled_seconds:7.1f}x {inside:>6}/{total}"
+                )
+            else:
+                print(f"{rows:12,} {size_mb:8.1f} {'-':>8} {sampled_seconds:10.2f} {'-':>8} {'-':>12}")
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark encoding analysis results to JSON: the previous recursive
+_make_serializable + stdlib json against utils.json_encoding.
+
+Run from backend-py/:
+    python -m benchmarks.bench_serialization --rows 200000 --columns 200
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.services.analysis_service import analyze_dataframe
+from app.utils.json_encoding import dumps, iter_json
+from benchmarks.bench_profiler import make_frame
+
+
+def legacy_make_serializable(obj):
+    """analysis_service._make_serializable as it was before json_encoding."""
+    if isinstance(obj, (np.integer,)):
+        return int(obj)
+    if isinstance(obj, (np.floating,)):
+        return None if pd.isna(obj) or np.isinf(obj) else float(obj)
+    if isinstance(obj, (pd.Timestamp,)):
+        return obj.isoformat()
+    if isinstance(obj, (pd.Interval,)):
+        return str(obj)
+    if isinstance(obj, (np.ndarray, list, tuple)):
+        return [legacy_make_serializable(x) for x in obj]
+    if isinstance(obj, dict):
+        return {k: legacy_make_serializable(v) for k, v in obj.items()}
+    return obj
+
+
+def legacy_encode(result: dict) -> bytes:
+    # JSONResponse's encoding; allow_nan stays on because NaN keys
+    # (missing values in value_distribution) made the strict encoder fail
+    return json.dumps(legacy_make_serializable(result), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _time(fn, result: dict, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(result)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _report(label: str, df: pd.DataFrame, top_k: int, repeat: int) -> None:
+    result = analyze_dataframe(df, top_k=top_k)
+    size = len(dumps(result))
+    legacy = _time(legacy_encode, result, repeat)
+    fast = _time(dumps, result, repeat)
+    streamed = _time(lambda r: sum(len(piece) for piece in iter_json(r)), result, repeat)
+
+    print(f"{label}: {len(df):,} rows x {len(df.columns)} columns, top_k={top_k}, {size / 1024 / 1024:.1f} MB of JSON")
+    print(f"  legacy _make_serializable + json : {legacy:8.3f} s")
+    print(f"  dumps                            : {fast:8.3f} s  ({legacy / fast:.1f}x)")
+    print(f"  iter_json (streamed body)        : {streamed:8.3f} s  ({legacy / streamed:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--columns", type=int, default=120)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # Wide: many columns, default value listing
+    _report("wide", make_frame(args.rows // 10, args.columns), top_k=100, repeat=args.repeat)
+    # High-cardinality: every distinct value listed
+    _report("high-cardinality", make_frame(args.rows, 8), top_k=0, repeat=args.repeat)
+
+
+if __name__ == "__main__":
+    main()
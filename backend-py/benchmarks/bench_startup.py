@@ -0,0 +1,125 @@
+"""
+Benchmark worker cold start: how long `import app.main` takes and which
+packages it spends that on (python -X importtime), how long the startup
+warm-up takes, and the latency of the first and second /api/v1/analyze
+requests with and without the warm-up (DATASMITH_WARMUP).
+
+Run from backend-py/:
+    python -m benchmarks.bench_startup --runs 5 --top 15
+    python -m benchmarks.bench_startup --max-import-ms 1500 --output startup.json
+
+Every measurement runs in a fresh interpreter, so nothing is already
+imported or cached. Exits with status 1 if the median import time exceeds
+--max-import-ms.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from benchmarks.bench_pipeline import environment
+
+# Runs in the fresh interpreter: startup (lifespan, hence warm-up) and two uploads
+COLD_REQUEST_SCRIPT = """
+import contextlib, io, json, sys, time
+start = time.perf_counter()
+from fastapi.testclient import TestClient
+from app.main import app
+timings = {"import": time.perf_counter() - start}
+from benchmarks.datasets import make_dataset, parse_mix
+data = make_dataset(int(sys.argv[1]), 8, parse_mix(sys.argv[2])).to_csv(index=False).encode()
+start = time.perf_counter()
+with TestClient(app) as client:
+    timings["startup"] = time.perf_counter() - start
+    for name in ("first_request", "second_request"):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            # A distinct extra row per request, so the result cache does not answer the second
+            response = client.post("/api/v1/analyze", files={"file": (name + ".csv", data + name.encode() + b"\\n", "text/csv")})
+        response.raise_for_status()
+        timings[name] = time.perf_counter() - start
+print(json.dumps(timings))
+"""
+# Date-like columns included, so the first request needs dateparser and the date checks
+COLD_REQUEST_MIX = "date,timestamp,currency,float,integer,boolean,low_cardinality,text"
+
+
+def import_times(module: str) -> Tuple[float, Dict[str, float]]:
+    """(cumulative seconds to import `module`, self seconds per top-level package) from one fresh interpreter."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    total = 0.0
+    packages: Dict[str, float] = defaultdict(float)
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        packages[name.split(".")[0]] += int(self_us) / 1e6
+        if name == module:
+            total = int(cumulative_us) / 1e6
+    return total, dict(packages)
+
+
+def cold_requests(rows: int, warmup: bool) -> Dict[str, float]:
+    env = {**os.environ, "DATASMITH_WARMUP": "1" if warmup else "0"}
+    completed = subprocess.run(
+        [sys.executable, "-c", COLD_REQUEST_SCRIPT, str(rows), COLD_REQUEST_MIX],
+        capture_output=True, text=True, check=True, env=env,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _median_by_key(runs: List[Dict[str, float]]) -> Dict[str, float]:
+    return {key: statistics.median(run.get(key, 0.0) for run in runs) for key in runs[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="app.main", help="Module whose import is timed")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per measurement; medians are reported")
+    parser.add_argument("--top", type=int, default=10, help="Packages listed by import time")
+    parser.add_argument("--rows", type=int, default=5000, help="Rows of the uploads timed after startup")
+    parser.add_argument("--max-import-ms", type=float, help="Fail if the median import time exceeds this")
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args()
+
+    imports = [import_times(args.module) for _ in range(args.runs)]
+    import_seconds = statistics.median(total for total, _ in imports)
+    packages = _median_by_key([per_package for _, per_package in imports])
+    print(f"import {args.module}: {import_seconds * 1000:.0f} ms (median of {args.runs})")
+    print(f"  {'package':<24} {'self ms':>8}")
+    for name, seconds in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<24} {seconds * 1000:8.1f}")
+
+    cold = {}
+    print(f"\n{'warm-up':<8} {'import ms':>10} {'startup ms':>11} {'1st request ms':>15} {'2nd request ms':>15}")
+    for warmup in (False, True):
+        timings = _median_by_key([cold_requests(args.rows, warmup) for _ in range(args.runs)])
+        cold["warmup" if warmup else "no_warmup"] = timings
+        print(f"{'on' if warmup else 'off':<8} {timings['import'] * 1000:10.0f} {timings['startup'] * 1000:11.0f} "
+              f"{timings['first_request'] * 1000:15.0f} {timings['second_request'] * 1000:15.0f}")
+
+    if args.output:
+        report = {
+            "environment": environment(),
+            "params": {key: value for key, value in vars(args).items() if key != "output"},
+            "import_seconds": import_seconds,
+            "package_import_seconds": packages,
+            "cold_requests": cold,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+    if args.max_import_ms is not None and import_seconds * 1000 > args.max_import_ms:
+        print(f"Import time {import_seconds * 1000:.0f} ms exceeds --max-import-ms {args.max_import_ms:.0f}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
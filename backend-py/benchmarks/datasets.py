@@ -0,0 +1,153 @@
+"""
+Synthetic datasets for the benchmarks: any number of rows and columns,
+with columns cycling through a mix of semantic types.
+
+Run from backend-py/ to write one out:
+    python -m benchmarks.datasets --rows 1000000 --columns 24 --out /tmp/data.csv
+"""
+import argparse
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+AIRLINES = np.array(["EK", "AA", "BA", "LH", "AF", "QR", "KL", "UA", "DL", "SQ"])
+LABELS = np.array(["HR", "IT", "Finance", "Sales", "Ops", "Legal", "R&D", "Support"])
+WORDS = np.array(
+    "the quick brown fox jumps over lazy dog data quality report flight delayed "
+    "on time gate crew cabin meal seat window aisle baggage lounge transfer".split()
+)
+
+
+def _strings(*parts: np.ndarray) -> np.ndarray:
+    result = parts[0].astype(str)
+    for part in parts[1:]:
+        result = np.char.add(result, part.astype(str))
+    return result.astype(object)
+
+
+def flight_numbers(rng: np.random.Generator, rows: int) -> np.ndarray:
+    """EK721-style codes, a few thousand distinct values."""
+    return _strings(rng.choice(AIRLINES, rows), rng.integers(10, 1000, rows))
+
+
+def currency(rng: np.random.Generator, rows: int) -> np.ndarray:
+    """$1,234.56-style amounts."""
+    amounts = rng.gamma(2.0, 400.0, rows).round(2)
+    return np.array([f"${amount:,.2f}" for amount in amounts], dtype=object)
+
+
+def dates(rng: np.random.Generator, rows: int) -> np.ndarray:
+    """ISO dates over ten years."""
+    days = pd.Timestamp("2015-01-01") + pd.to_timedelta(rng.integers(0, 3650, rows), unit="D")
+    return days.strftime("%Y-%m-%d").to_numpy(dtype=object)
+
+
+def timestamps(rng: np.random.Generator, rows: int) -> np.ndarray:
+    """Day/month/year hour:minute timestamps, as in cpp-mod/data.csv."""
+    moments = pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 5 * 365 * 24 * 60, rows), unit="min")
+    return moments.strftime("%d/%m/%Y %H:%M").to_numpy(dtype=object)
+
+
+def ids(rng: np.random.Generator, rows: int) -> np.ndarray:
+    """Unique, shuffled record ids."""
+    return np.char.add("REC-", rng.permutation(rows).astype(str)).astype(object)
+
+
+def booleans(rng: np.random.Generator, rows: int) -> np.ndarray:
+    return rng.choice(np.array(["true", "false"], dtype=object), rows)
+
+
+def free_text(rng: np.random.Generator, rows: int) -> np.ndarray:
+    """Short sentences: high cardinality, variable length."""
+    lengths = rng.integers(3, 9, rows)
+    words = rng.choice(WORDS, int(lengths.sum()))
+    ends = np.cumsum(lengths)
+    return np.array([" ".join(words[end - length:end]) for end, length in zip(ends, lengths)], dtype=object)
+
+
+def low_cardinality(rng: np.random.Generator, rows: int) -> np.ndarray:
+    return rng.choice(LABELS.astype(object), rows)
+
+
+def high_cardinality(rng: np.random.Generator, rows: int) -> np.ndarray:
+    """Strings with about rows / 3 distinct values."""
+    return np.char.add("user_", rng.integers(0, max(rows // 3, 1), rows).astype(str)).astype(object)
+
+
+def floats(rng: np.random.Generator, rows: int) -> np.ndarray:
+    return rng.normal(100, 15, rows).round(2)
+
+
+def integers(rng: np.random.Generator, rows: int) -> np.ndarray:
+    return rng.integers(0, 1000, rows)
+
+
+GENERATORS: Dict[str, Callable[[np.random.Generator, int], np.ndarray]] = {
+    "flight_number": flight_numbers,
+    "currency": currency,
+    "date": dates,
+    "timestamp": timestamps,
+    "id": ids,
+    "boolean": booleans,
+    "text": free_text,
+    "low_cardinality": low_cardinality,
+    "high_cardinality": high_cardinality,
+    "float": floats,
+    "integer": integers,
+}
+
+DEFAULT_MIX = list(GENERATORS)
+
+
+def make_dataset(
+    rows: int,
+    columns: int,
+    mix: Optional[Sequence[str]] = None,
+    missing: float = 0.0,
+    seed: int = 42,
+) -> pd.DataFrame:
+    """
+    `rows` x `columns` frame whose columns cycle through the `mix` of
+    GENERATORS kinds (all of them by default). A `missing` share of each
+    column's values is blanked out.
+    """
+    mix = list(mix or DEFAULT_MIX)
+    unknown = [kind for kind in mix if kind not in GENERATORS]
+    if unknown:
+        raise ValueError(f"Unknown column kinds {unknown}; choose from {list(GENERATORS)}")
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(columns):
+        kind = mix[i % len(mix)]
+        values = GENERATORS[kind](rng, rows)
+        if missing > 0:
+            values = pd.Series(values).mask(rng.random(rows) < missing).to_numpy()
+        data[f"{kind}_{i}"] = values
+    return pd.DataFrame(data)
+
+
+def parse_mix(mix: Optional[str]) -> Optional[List[str]]:
+    return [kind.strip() for kind in mix.split(",") if kind.strip()] if mix else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--columns", type=int, default=len(DEFAULT_MIX))
+    parser.add_argument("--mix", help="Comma-separated column kinds: " + ", ".join(GENERATORS))
+    parser.add_argument("--missing", type=float, default=0.0, help="Share of missing values per column")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", required=True, help="Output file (.csv, .csv.gz or .parquet)")
+    args = parser.parse_args()
+
+    df = make_dataset(args.rows, args.columns, parse_mix(args.mix), args.missing, args.seed)
+    if args.out.endswith(".parquet"):
+        df.to_parquet(args.out, index=False)
+    else:
+        df.to_csv(args.out, index=False)
+    print(f"Wrote {args.rows:,} rows x {args.columns} columns to {args.out}")
+
+
+if __name__ == "__main__":
+    main()